@@ -0,0 +1,88 @@
+"""Time table repaints and row resizing with and without the layout cache.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_delegate_paint.py --rows 100 --text-kb 20
+
+Each configuration resizes all rows once and then repaints the viewport
+--repaints times, which is what scrolling back and forth over the same
+rows costs.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+from PyQt5.QtWidgets import QApplication, QTableView
+from PyQt5.QtGui import QPixmap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+
+def make_frame(rows, text_kb):
+    rng = random.Random(0)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'prompt', 'completion', 'token', 'model']
+    def text():
+        out = []
+        size = 0
+        while size < text_kb * 1024:
+            word = rng.choice(words)
+            out.append(word)
+            size += len(word) + 1
+        return ' '.join(out)
+    return pd.DataFrame({'id': range(rows), 'prompt': [text() for _ in range(rows)],
+                         'completion': [text() for _ in range(rows)]})
+
+
+def measure(app, df, cache_size, max_chars, repaints):
+    view = QTableView()
+    view.resize(1400, 900)
+    view.setWordWrap(True)
+    delegate = main.MultiLineDelegate(view, cache_size=cache_size)
+    view.setItemDelegate(delegate)
+    model = main.DataFrameModel(df)
+    model.max_chars = max_chars
+    view.setModel(model)
+    view.setColumnWidth(1, 500)
+    view.setColumnWidth(2, 500)
+    view.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    view.resizeRowsToContents()
+    resize_s = time.perf_counter() - start
+
+    pixmap = QPixmap(view.viewport().size())
+    start = time.perf_counter()
+    for _ in range(repaints):
+        view.viewport().render(pixmap)
+    paint_s = (time.perf_counter() - start) / repaints
+    view.close()
+    return resize_s, paint_s
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--text-kb', type=int, default=20)
+    parser.add_argument('--repaints', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    df = make_frame(args.rows, args.text_kb)
+    print(f"rows={args.rows} text={args.text_kb} KB per cell")
+    print(f"{'configuration':<32} {'resize rows s':>14} {'repaint ms':>11}")
+    configs = [
+        ('no cache, no cut-off', 0, 0),
+        ('cache, no cut-off', main.LAYOUT_CACHE_SIZE, 0),
+        ('no cache, cut-off', 0, main.MAX_CELL_CHARS),
+        ('cache, cut-off (default)', main.LAYOUT_CACHE_SIZE, main.MAX_CELL_CHARS),
+    ]
+    for name, cache_size, max_chars in configs:
+        resize_s, paint_s = measure(app, df, cache_size, max_chars, args.repaints)
+        print(f"{name:<32} {resize_s:>14.3f} {paint_s * 1000:>11.1f}")
+
+
+if __name__ == '__main__':
+    run()
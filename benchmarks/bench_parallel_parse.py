@@ -0,0 +1,84 @@
+"""Compare pd.read_json(lines=True) with the multi-process loader.
+
+    python benchmarks/bench_parallel_parse.py --sizes 100MB,1GB,5GB
+
+Synthetic files are written to --dir (default: a temp dir) and reused
+across runs if they already exist.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import jsonl_core  # noqa: E402
+
+UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def generate(path, size):
+    rng = random.Random(0)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        i = 0
+        while written < size:
+            record = {
+                'id': i,
+                'score': rng.random(),
+                'label': rng.choice(['train', 'valid', 'test']),
+                'text': ''.join(rng.choice('abcdefghij ') for _ in range(rng.randint(20, 400))),
+                'meta': {'source': rng.choice(['web', 'books', 'code']), 'tokens': rng.randint(1, 4096)},
+            }
+            line = json.dumps(record, ensure_ascii=False) + '\n'
+            f.write(line)
+            written += len(line)
+            i += 1
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100MB', help='comma separated file sizes, e.g. 100MB,1GB,5GB')
+    parser.add_argument('--dir', default=tempfile.gettempdir())
+    parser.add_argument('--skip-pandas', action='store_true', help='skip the pd.read_json baseline (slow on big files)')
+    args = parser.parse_args()
+
+    print(f"workers={jsonl_core.PARSE_WORKERS} orjson={'yes' if jsonl_core.orjson is not None else 'no'}")
+    print(f"{'size':>8} {'rows':>10} {'read_json s':>12} {'parallel s':>11} {'speedup':>8}")
+    for size_text in args.sizes.split(','):
+        size = parse_size(size_text)
+        path = os.path.join(args.dir, f"bench_{size_text.strip()}.jsonl")
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            generate(path, size)
+        # 프로세스 풀 기동 시간은 측정에서 제외
+        jsonl_core.parse_pool().submit(int).result()
+        parallel_s, df = timed(lambda: jsonl_core.parallel_read_jsonl(path))
+        if args.skip_pandas:
+            baseline_s = float('nan')
+        else:
+            baseline_s, baseline = timed(lambda: pd.read_json(path, lines=True))
+            assert len(baseline) == len(df)
+        print(f"{size_text.strip():>8} {len(df):>10} {baseline_s:>12.2f} {parallel_s:>11.2f} {baseline_s / parallel_s:>7.1f}x")
+    jsonl_core.shutdown_parse_pool()
+
+
+if __name__ == '__main__':
+    run()
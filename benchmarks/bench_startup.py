@@ -0,0 +1,62 @@
+"""Time viewer startup: until the window is shown and until data is ready.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_startup.py --runs 5
+
+Each run starts a fresh `python main.py --startup-probe` process. A cold
+run first deletes the repo's __pycache__ so every module is recompiled
+(the OS page cache is not dropped); warm runs reuse the bytecode. Use
+--json to append the medians to a file and compare releases.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIELDS = ('imports', 'window_shown', 'data_ready')
+
+
+def probe(cold):
+    if cold:
+        shutil.rmtree(os.path.join(ROOT, '__pycache__'), ignore_errors=True)
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), '--startup-probe'],
+                         env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - start
+    # Qt가 stdout에 다른 줄을 쓸 수 있으므로 마지막 JSON 줄만 사용
+    times = json.loads([line for line in out.splitlines() if line.startswith('{')][-1])
+    times['wall'] = wall
+    return times
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='runs per mode (cold and warm)')
+    parser.add_argument('--json', help='append {"cold": ..., "warm": ...} medians as one line to this file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'mode':>5} {'imports s':>10} {'shown s':>8} {'ready s':>8} {'wall s':>7}  preloaded")
+    for mode in ('cold', 'warm'):
+        if mode == 'warm':
+            # 바이트코드 캐시를 만들기 위한 한 번은 측정에서 제외
+            probe(cold=False)
+        runs = [probe(cold=mode == 'cold') for _ in range(args.runs)]
+        medians = {field: statistics.median(r[field] for r in runs) for field in FIELDS + ('wall',)}
+        preloaded = sorted({name for r in runs for name in r['preloaded']})
+        results[mode] = dict(medians, preloaded=preloaded)
+        print(f"{mode:>5} {medians['imports']:>10.3f} {medians['window_shown']:>8.3f} "
+              f"{medians['data_ready']:>8.3f} {medians['wall']:>7.3f}  {', '.join(preloaded) or '-'}")
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(results, python=sys.version.split()[0], time=time.time())) + '\n')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,300 @@
+"""Benchmark suite: loading, paging, columns, pandas commands, painting and remote reads.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_suite.py --sizes 1,10 --output after.json
+    python benchmarks/bench_suite.py --compare before.json after.json
+
+Synthetic JSONL files of every --shapes (flat, wide, deeply nested, long
+text) at every --sizes (MB) are generated once into --data-dir. Each case
+drives a real JSONLViewer in this process the way its buttons do and
+records the median of --repeat runs in seconds. Sidecar caches (line
+index, Parquet, history) are deleted before every load, so loads are
+always cold. Remote cases read through a local SFTP stand-in
+(sftp_standin.py, needs paramiko) with the remote file cache turned off.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from PyQt5.QtWidgets import QApplication, QMessageBox
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QT_VERSION_STR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import main  # noqa: E402
+import jsonl_core  # noqa: E402
+
+SHAPES = ('flat', 'wide', 'nested', 'longtext')
+WIDE_COLUMNS = 200
+NESTED_DEPTH = 8
+LONGTEXT_WORDS = 1500
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'prompt', 'completion', 'token', 'model', 'dataset', 'viewer']
+PANDAS_COMMAND = 'df.iloc[::2]'
+# --compare에서 이 비율을 넘으면 표시
+COMPARE_THRESHOLD = 0.10
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def make_record(shape, i, rng):
+    if shape == 'flat':
+        return {'id': i, 'score': rng.random(), 'label': rng.choice(('valid', 'invalid', 'unknown')),
+                'flag': rng.random() < 0.5, 'text': words(rng, 15)}
+    if shape == 'wide':
+        record = {'id': i}
+        for j in range(WIDE_COLUMNS):
+            record[f'c{j:03d}'] = rng.randint(0, 1000) if j % 2 else rng.choice(WORDS)
+        return record
+    if shape == 'nested':
+        node = {'value': i}
+        for depth in range(NESTED_DEPTH):
+            node = {'level': depth, 'tags': [rng.choice(WORDS) for _ in range(2)], 'child': node}
+        return {'id': i, 'meta': {'source': rng.choice(WORDS), 'score': rng.random()}, 'tree': node,
+                'items': [{'key': rng.choice(WORDS), 'value': rng.randint(0, 100)} for _ in range(3)]}
+    return {'id': i, 'prompt': words(rng, LONGTEXT_WORDS), 'completion': words(rng, LONGTEXT_WORDS)}
+
+
+def make_file(data_dir, shape, size_mb):
+    # 같은 이름의 파일이 있으면 재사용 (시드가 고정이라 내용이 같음)
+    path = os.path.join(data_dir, f'{shape}_{size_mb:g}mb.jsonl')
+    if os.path.exists(path):
+        return path
+    rng = random.Random(0)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path + '.part', 'w', encoding='utf-8') as f:
+        i = 0
+        while written < target:
+            line = json.dumps(make_record(shape, i, rng)) + '\n'
+            f.write(line)
+            written += len(line)
+            i += 1
+    os.replace(path + '.part', path)
+    return path
+
+
+def clean_caches(path):
+    # 로컬 sidecar와 (원격 인덱스/기록이 들어가는) 캐시 디렉터리를 지워 매번 처음 여는 것처럼 측정
+    for sidecar in glob.glob(glob.escape(path) + '.*'):
+        os.remove(sidecar)
+    shutil.rmtree(jsonl_core.CACHE_DIR, ignore_errors=True)
+
+
+class Bench(object):
+    def __init__(self, app, repeat, page_steps):
+        self.app = app
+        self.repeat = repeat
+        self.page_steps = page_steps
+        self.messages = []
+        # 메시지 상자가 열리면 측정이 멈추므로 내용만 모아서 해당 케이스를 실패로 기록
+        for name in ('warning', 'critical', 'information'):
+            setattr(QMessageBox, name, staticmethod(lambda parent, title, text, *args: self.messages.append(text)))
+        self.viewer = main.JSONLViewer()
+        self.viewer.resize(1400, 900)
+        self.viewer.show()
+        self.wait(lambda: not self.viewer.data_ready)
+
+    def wait(self, busy):
+        while busy():
+            self.app.processEvents()
+            time.sleep(0.001)
+        self.app.processEvents()
+
+    def timed(self, action, busy=None):
+        start = time.perf_counter()
+        action()
+        if busy is not None:
+            self.wait(busy)
+        return time.perf_counter() - start
+
+    def load(self, path, lazy=False, arrow=False, creds=None):
+        viewer = self.viewer
+        viewer.lazy_load_checkbox.setChecked(lazy)
+        viewer.remote_lazy_checkbox.setChecked(lazy)
+        viewer.remote_cache_checkbox.setChecked(False)
+        viewer.arrow_checkbox.setChecked(arrow)
+        clean_caches(path)
+        return self.timed(lambda: viewer.load_file(path, local=creds is None, creds=creds),
+                          busy=lambda: viewer.loading)
+
+    def page(self):
+        # 1페이지에서 시작해 다음 페이지로 넘기는 시간 (마지막 페이지에 닿으면 처음으로)
+        viewer = self.viewer
+        times = []
+        viewer.current_page = 1
+        viewer.show_page()
+        for _ in range(self.page_steps):
+            if viewer.current_page >= viewer.total_pages:
+                viewer.current_page = 1
+                viewer.show_page()
+            times.append(self.timed(viewer.next_page))
+        return times
+
+    def paint(self, cold):
+        view = self.viewer.table_view
+        pixmap = QPixmap(view.viewport().size())
+        if cold:
+            self.viewer.delegate.clear_cache()
+        return self.timed(lambda: view.viewport().render(pixmap))
+
+    def apply_columns(self):
+        viewer = self.viewer
+        items = [viewer.columns_list.item(i) for i in range(viewer.columns_list.count())]
+        for i, item in enumerate(items):
+            item.setSelected(i < max(1, len(items) // 2))
+        elapsed = self.timed(viewer.apply_columns)
+        viewer.undo()
+        return elapsed
+
+    def apply_pandas(self):
+        viewer = self.viewer
+        viewer.pandas_text.setPlainText(PANDAS_COMMAND)
+        elapsed = self.timed(viewer.apply_pandas_commands)
+        viewer.undo()
+        return elapsed
+
+    def case(self, results, key, measure):
+        # measure는 초 단위 시간 목록을 반환
+        del self.messages[:]
+        runs = []
+        try:
+            for _ in range(self.repeat):
+                runs.extend(measure())
+                if self.messages:
+                    raise RuntimeError(self.messages[0])
+        except Exception as e:
+            results[key] = {'error': str(e)}
+            print(f"{key:<44} failed: {e}")
+            return
+        results[key] = {'median': statistics.median(runs), 'min': min(runs), 'runs': len(runs),
+                        'rows': self.viewer.total_rows()}
+        print(f"{key:<44} {results[key]['median']:>10.4f} {results[key]['min']:>10.4f} {len(runs):>5}")
+
+    def run_file(self, results, prefix, path, creds=None):
+        # 전체 로딩 뒤의 화면 조작은 같은 파일을 한 번만 불러 놓고 반복
+        remote = creds is not None
+        kind = 'remote_' if remote else ''
+        self.case(results, f'{prefix}/{kind}load_eager', lambda: [self.load(path, creds=creds)])
+        if not remote:
+            self.case(results, f'{prefix}/page_eager', self.page)
+            self.case(results, f'{prefix}/paint_cold', lambda: [self.paint(cold=True)])
+            self.case(results, f'{prefix}/paint_warm', lambda: [self.paint(cold=False)])
+            self.case(results, f'{prefix}/apply_columns', lambda: [self.apply_columns()])
+            self.case(results, f'{prefix}/apply_pandas', lambda: [self.apply_pandas()])
+        self.case(results, f'{prefix}/{kind}load_lazy', lambda: [self.load(path, lazy=True, creds=creds)])
+        self.case(results, f'{prefix}/{kind}page_lazy', self.page)
+        if not remote:
+            self.case(results, f'{prefix}/apply_columns_lazy', lambda: [self.apply_columns()])
+            if jsonl_core.pa is not None:
+                self.case(results, f'{prefix}/load_arrow', lambda: [self.load(path, arrow=True)])
+                self.case(results, f'{prefix}/page_arrow', self.page)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    versions = {'python': sys.version.split()[0], 'qt': QT_VERSION_STR}
+    for name in main.DEBUG_REPORT_MODULES:
+        if name in sys.modules:
+            versions[name] = getattr(sys.modules[name], '__version__', None)
+    return {'platform': platform.platform(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'versions': versions, 'commit': git_commit(), 'time': time.time()}
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)['results']
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['results']
+    print(f"{'case':<44} {'old s':>10} {'new s':>10} {'new/old':>8}")
+    for key in sorted(set(old) & set(new)):
+        if 'median' not in old[key] or 'median' not in new[key]:
+            continue
+        ratio = new[key]['median'] / old[key]['median'] if old[key]['median'] else float('inf')
+        mark = 'slower' if ratio > 1 + COMPARE_THRESHOLD else 'faster' if ratio < 1 - COMPARE_THRESHOLD else ''
+        print(f"{key:<44} {old[key]['median']:>10.4f} {new[key]['median']:>10.4f} {ratio:>8.2f}  {mark}")
+    for key in sorted(set(old) ^ set(new)):
+        print(f"{key:<44} only in {'old' if key in old else 'new'}")
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1,10', help='comma separated file sizes in MB')
+    parser.add_argument('--shapes', default=','.join(SHAPES), help='comma separated subset of ' + ', '.join(SHAPES))
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case (the median is reported)')
+    parser.add_argument('--page-steps', type=int, default=10, help='page turns timed per run')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'jsonl_viewer_bench'),
+                        help='where generated files (and the caches used while measuring) are kept')
+    parser.add_argument('--no-remote', action='store_true', help='skip the SFTP cases')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay the SFTP stand-in adds to every read')
+    parser.add_argument('--output', help='write results and environment as JSON to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two --output files and exit')
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    shapes = [shape.strip() for shape in args.shapes.split(',') if shape.strip()]
+    unknown = [shape for shape in shapes if shape not in SHAPES]
+    if unknown:
+        parser.error(f"unknown shapes: {', '.join(unknown)}")
+    sizes = [float(size) for size in args.sizes.split(',') if size.strip()]
+    os.makedirs(args.data_dir, exist_ok=True)
+    # 원격 인덱스/기록이 사용자 캐시(~/.cache)에 쌓이지 않도록 측정용 디렉터리로 돌림
+    jsonl_core.CACHE_DIR = os.path.join(args.data_dir, 'cache')
+
+    creds = None
+    if not args.no_remote:
+        try:
+            import sftp_standin
+        except ImportError as e:
+            print(f"Skipping remote cases: {e}", file=sys.stderr)
+        else:
+            port = sftp_standin.serve(args.latency_ms)
+            creds = {'hostname': '127.0.0.1', 'port': port, 'username': 'bench',
+                     'password': sftp_standin.PASSWORD}
+
+    app = QApplication(sys.argv)
+    bench = Bench(app, args.repeat, args.page_steps)
+    results = {}
+    print(f"{'case':<44} {'median s':>10} {'min s':>10} {'runs':>5}")
+    for shape in shapes:
+        for size in sizes:
+            path = make_file(args.data_dir, shape, size)
+            prefix = f'{shape}/{size:g}mb'
+            bench.run_file(results, prefix, path)
+            if creds is not None:
+                bench.run_file(results, prefix, path, creds)
+            clean_caches(path)
+    bench.viewer.close()
+    jsonl_core.ssh_pool.close_all()
+
+    if args.output:
+        env = environment()
+        env['peak_rss'] = main.peak_rss()
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': env, 'settings': {'sizes': sizes, 'shapes': shapes, 'repeat': args.repeat,
+                                                        'page_steps': args.page_steps,
+                                                        'latency_ms': args.latency_ms if creds else None},
+                       'results': results}, f, indent=1)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,116 @@
+"""Read-only SFTP server on 127.0.0.1 for benchmarking remote loading.
+
+    python benchmarks/sftp_standin.py --latency-ms 20
+
+Serves the local filesystem (absolute paths) to any user with the
+password `bench`. --latency-ms delays every read request so that page
+fetches and index builds behave more like a real network. bench_suite.py
+imports serve() and runs it on a background thread.
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+
+import paramiko
+from paramiko import (
+    AUTH_FAILED, AUTH_SUCCESSFUL, OPEN_SUCCEEDED, ServerInterface, SFTPAttributes, SFTPHandle, SFTPServer,
+    SFTPServerInterface
+)
+
+PASSWORD = 'bench'
+
+
+class StandinServer(ServerInterface):
+    def check_auth_password(self, username, password):
+        return AUTH_SUCCESSFUL if password == PASSWORD else AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        return OPEN_SUCCEEDED
+
+
+class StandinHandle(SFTPHandle):
+    latency = 0.0
+
+    def stat(self):
+        return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+    def read(self, offset, length):
+        if self.latency:
+            time.sleep(self.latency)
+        return super(StandinHandle, self).read(offset, length)
+
+
+class StandinSFTP(SFTPServerInterface):
+    def open(self, path, flags, attr):
+        # 읽기 전용
+        try:
+            f = open(path, 'rb')
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        handle = StandinHandle(flags)
+        handle.readfile = f
+        handle.filename = path
+        return handle
+
+    def stat(self, path):
+        try:
+            return SFTPAttributes.from_stat(os.stat(path))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def list_folder(self, path):
+        try:
+            entries = []
+            for name in os.listdir(path):
+                attr = SFTPAttributes.from_stat(os.stat(os.path.join(path, name)))
+                attr.filename = name
+                entries.append(attr)
+            return entries
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+
+def serve(latency_ms=0, port=0):
+    # 백그라운드 스레드에서 접속을 받고 포트 번호를 반환
+    StandinHandle.latency = latency_ms / 1000
+    host_key = paramiko.RSAKey.generate(2048)
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', port))
+    sock.listen(16)
+
+    def accept():
+        while True:
+            conn, _ = sock.accept()
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(host_key)
+            transport.set_subsystem_handler('sftp', SFTPServer, StandinSFTP)
+            transport.start_server(server=StandinServer())
+
+    threading.Thread(target=accept, daemon=True).start()
+    return sock.getsockname()[1]
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=0, help='port to listen on (default: any free port)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every read request')
+    args = parser.parse_args()
+    port = serve(args.latency_ms, args.port)
+    print(f"Listening on 127.0.0.1:{port} (password: {PASSWORD}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    run()
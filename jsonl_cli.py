@@ -0,0 +1,213 @@
+# 뷰어 없이 JSONL 파일을 잘라보고 내보내는 명령줄 도구 (jsonl_core의 로더/쿼리/내보내기 사용)
+#
+#   python jsonl_cli.py head data.jsonl.gz -n 5
+#   python jsonl_cli.py sample ssh://user@host/data/train.jsonl -n 100 --seed 0
+#   python jsonl_cli.py filter data.jsonl 'score > 0.5 and label == "valid"' -c id,meta.source
+#   python jsonl_cli.py export ssh://user@host:22/data/train.jsonl train.parquet -w 'select id, text limit 1000'
+import sys
+import os
+import re
+import argparse
+import getpass
+import itertools
+
+import jsonl_core
+from jsonl_core import (
+    JSONLWriter, TableQuery, export_format, iter_matching_lines, iter_source_lines, json_loads,
+    open_writer, preview_lines, sample_lines
+)
+
+# 출력 배치 크기 (Parquet은 배치 하나가 row group 하나)
+WRITE_BATCH_LINES = 50000
+REMOTE_SOURCE = re.compile(r'^(?:ssh|sftp)://(?:([^@/]+)@)?([^/:]+)(?::(\d+))?(/.*)$')
+
+
+def parse_source(text, password=None):
+    # 로컬 경로 또는 ssh://user@host[:port]/path -> (경로, 접속 정보 또는 None)
+    match = REMOTE_SOURCE.match(text)
+    if match is None:
+        return text, None
+    username, hostname, port, path = match.groups()
+    if password is None:
+        password = os.environ.get('JSONL_VIEWER_PASSWORD')
+    if password is None:
+        password = getpass.getpass(f"Password for {username or getpass.getuser()}@{hostname}: ")
+    creds = {'hostname': hostname, 'port': int(port or 22), 'username': username or getpass.getuser(),
+             'password': password}
+    return path, creds
+
+
+def parse_query(text):
+    # 조건만 적은 경우 where 절로 취급
+    first = text.split(None, 1)[0].lower() if text.strip() else ''
+    if first not in ('select', 'where', 'order', 'limit'):
+        text = 'where ' + text
+    return TableQuery(text)
+
+
+def parse_columns(text, query=None):
+    # --columns가 없으면 쿼리의 select 절
+    if text:
+        return [column.strip() for column in text.split(',') if column.strip()]
+    return list(query.columns) if query is not None and query.columns else None
+
+
+def batched(lines, size=WRITE_BATCH_LINES):
+    lines = iter(lines)
+    while True:
+        batch = list(itertools.islice(lines, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_lines(writer, lines):
+    # 컬럼을 고르지 않은 JSONL 출력은 원본 줄을 그대로 씀
+    for batch in batched(lines):
+        if isinstance(writer, JSONLWriter) and writer.columns is None:
+            writer.write_lines(batch)
+        else:
+            writer.write_records([json_loads(line) for line in batch])
+
+
+def all_lines(path, creds):
+    return itertools.chain.from_iterable(iter_source_lines(path, creds))
+
+
+# 각 명령은 (출력할 줄, 컬럼)을 반환하거나 직접 출력하고 None을 반환
+def run_head(args, path, creds):
+    return itertools.islice(all_lines(path, creds), args.lines), parse_columns(args.columns)
+
+
+def run_tail(args, path, creds):
+    return preview_lines(path, creds, 'tail', args.lines), parse_columns(args.columns)
+
+
+def run_sample(args, path, creds):
+    if args.scan:
+        sample = sample_lines(iter_source_lines(path, creds), args.lines, args.seed)
+        return [line for _, line in sample], parse_columns(args.columns)
+    # 큰 파일은 임의 위치의 줄만 읽음 (원격도 전체를 내려받지 않음)
+    return preview_lines(path, creds, 'random', args.lines, args.seed), parse_columns(args.columns)
+
+
+def run_filter(args, path, creds):
+    query = parse_query(args.query)
+    return iter_matching_lines(iter_source_lines(path, creds), query), parse_columns(args.columns, query)
+
+
+def run_select(args, path, creds):
+    return all_lines(path, creds), parse_columns(args.select_columns)
+
+
+def run_count(args, path, creds):
+    query = parse_query(args.where) if args.where else None
+    total = 0
+    start = 0
+    for lines in iter_source_lines(path, creds):
+        total += len(query.match_lines(lines, start)[0]) if query is not None else len(lines)
+        start += len(lines)
+    print(total)
+
+
+def run_export(args, path, creds):
+    fmt = args.format or export_format(args.output)
+    if fmt is None:
+        raise ValueError(f"Cannot tell the format of {args.output}; use --format")
+    query = parse_query(args.where) if args.where else None
+    if query is not None:
+        lines = iter_matching_lines(iter_source_lines(path, creds), query)
+    else:
+        lines = all_lines(path, creds)
+    if args.limit is not None:
+        lines = itertools.islice(lines, args.limit)
+    writer, f = open_writer(args.output, fmt, parse_columns(args.columns, query))
+    try:
+        write_lines(writer, lines)
+        writer.close()
+    finally:
+        if f is not None:
+            f.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Slice, filter and export JSONL files without the viewer. "
+                                                 "FILE is a local path (optionally .gz/.bz2/.zst), a folder or "
+                                                 "glob of shards (quote it), or ssh://user@host[:port]/path.")
+    parser.add_argument('--password', help="SSH password (default: $JSONL_VIEWER_PASSWORD or a prompt)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    head = commands.add_parser('head', help="print the first rows")
+    head.add_argument('file')
+    head.add_argument('-n', '--lines', type=int, default=10)
+    head.add_argument('-c', '--columns', help="comma separated columns or nested paths (a, b.c, d[0])")
+
+    tail = commands.add_parser('tail', help="print the last rows")
+    tail.add_argument('file')
+    tail.add_argument('-n', '--lines', type=int, default=10)
+    tail.add_argument('-c', '--columns')
+
+    sample = commands.add_parser('sample', help="print a random sample of rows (in file order)")
+    sample.add_argument('file')
+    sample.add_argument('-n', '--lines', type=int, default=10)
+    sample.add_argument('--seed', type=int)
+    sample.add_argument('--scan', action='store_true',
+                        help="read the whole file once (exact reservoir sampling) instead of jumping to random offsets")
+    sample.add_argument('-c', '--columns')
+
+    filter_ = commands.add_parser('filter', help="print rows matching a query")
+    filter_.add_argument('file')
+    filter_.add_argument('query', help='condition or full query: [select a, b.c] [where ...] '
+                                       '[order by x [desc]] [limit n]')
+    filter_.add_argument('-c', '--columns')
+
+    select = commands.add_parser('select', help="print only the given columns of every row")
+    select.add_argument('file')
+    select.add_argument('select_columns', metavar='columns')
+
+    count = commands.add_parser('count', help="count rows (optionally only matching ones)")
+    count.add_argument('file')
+    count.add_argument('-w', '--where')
+
+    export = commands.add_parser('export', help="write rows to JSONL, CSV or Parquet")
+    export.add_argument('file')
+    export.add_argument('output')
+    export.add_argument('-f', '--format', choices=('jsonl', 'csv', 'parquet'))
+    export.add_argument('-c', '--columns')
+    export.add_argument('-w', '--where', help="condition or full query")
+    export.add_argument('-n', '--limit', type=int)
+    return parser
+
+
+COMMANDS = {'head': run_head, 'tail': run_tail, 'sample': run_sample, 'filter': run_filter, 'select': run_select,
+            'count': run_count, 'export': run_export}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        path, creds = parse_source(args.file, args.password)
+        result = COMMANDS[args.command](args, path, creds)
+        if result is not None:
+            lines, columns = result
+            writer, _ = open_writer(None, 'jsonl', columns)
+            write_lines(writer, lines)
+            writer.close()
+    except BrokenPipeError:
+        # head 등으로 파이프가 먼저 닫힌 경우. 종료 시 flush 오류가 나지 않도록 출력을 버림
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, SyntaxError, re.error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        # 파일/SSH 오류
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        jsonl_core.ssh_pool.close_all()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
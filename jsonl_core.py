@@ -0,0 +1,2875 @@
+# JSONL 로딩, 인덱스, 검색/쿼리, 통계, 내보내기 (Qt 없이 CLI와 뷰어에서 공통으로 사용)
+import sys
+import os
+import copy
+import re
+import json
+import mmap
+import time
+import zlib
+import bz2
+import bisect
+import ast
+import heapq
+import hashlib
+import operator
+import functools
+import collections
+import posixpath
+import glob
+import fnmatch
+import stat as stat_module
+import threading
+import multiprocessing
+import concurrent.futures
+import numpy as np
+import pandas as pd
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_json = pq = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+INDEX_SCAN_CHUNK = 64 * 1024 * 1024
+SCHEMA_SAMPLE_ROWS = 1000
+# 스키마 추론 시 배열에서 살펴보는 앞쪽 원소 수
+SCHEMA_LIST_ITEMS = 3
+PATH_TOKEN = re.compile(r'\[(\d+)\]|\.?([^.\[\]]+)')
+# 백그라운드 로딩 시 한 번에 파싱해서 모델로 보내는 청크 크기
+LOAD_CHUNK_BYTES = 4 * 1024 * 1024
+FIRST_CHUNK_BYTES = 256 * 1024
+LOCAL_READ_BLOCK = 1024 * 1024
+# SFTP 읽기: REMOTE_READ_BLOCK 단위 요청을 REMOTE_READ_WINDOW 만큼 파이프라이닝
+REMOTE_READ_BLOCK = 256 * 1024
+REMOTE_READ_WINDOW = 16 * 1024 * 1024
+# 임의 위치의 행들을 읽을 때 사이 간격이 이 이하인 바이트 구간은 한 구간으로 합쳐서 읽음
+TAKE_MERGE_GAP_BYTES = 4096
+# 이 크기 이상의 로컬 파일은 여러 프로세스에서 나눠서 파싱
+PARALLEL_PARSE_THRESHOLD = 64 * 1024 * 1024
+PARALLEL_CHUNK_BYTES = 32 * 1024 * 1024
+PARSE_WORKERS = os.cpu_count() or 1
+PARQUET_SOURCE_KEY = b'jsonl_viewer_source'
+# 검색 인덱스: SEARCH_BLOCK_ROWS 행마다 2**SEARCH_INDEX_BITS 비트 트라이그램 비트맵
+SEARCH_BLOCK_ROWS = 1024
+SEARCH_INDEX_BITS = 16
+# 인덱스에 넣는 내용이 바뀌면 올림 (예전 사이드카는 다시 만듦)
+SEARCH_INDEX_VERSION = 2
+SEARCH_SCAN_ROWS = 20000
+# 쿼리 스캔 단위 (단일 스레드 / 프로세스 풀 작업 하나당 행 수)
+QUERY_SCAN_ROWS = 20000
+QUERY_CHUNK_ROWS = 200000
+# 컬럼 통계: 배치 행 수, HyperLogLog 레지스터 비트 수(2^14개, 오차 약 0.8%),
+# 상위 값 후보 상한, 히스토그램/문자열 길이용 reservoir 샘플 크기, 히스토그램 구간 수
+STATS_BATCH_ROWS = 50000
+STATS_HLL_PRECISION = 14
+STATS_TOP_VALUES = 10
+STATS_TOP_CAPACITY = 1000
+STATS_SAMPLE_SIZE = 10000
+STATS_HISTOGRAM_BINS = 16
+# 통계 캐시가 같은 파일의 것인지 확인할 때 비교하는 앞부분 바이트 수
+STATS_SIGNATURE_BYTES = 4096
+# 압축 파일: 확장자별 형식, 임의 접근용 체크포인트 간격(압축 해제 기준), 압축 데이터 읽기 단위
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.gzip': 'gzip', '.bz2': 'bz2', '.zst': 'zstd', '.zstd': 'zstd'}
+COMPRESSED_CHECKPOINT_BYTES = 4 * 1024 * 1024
+COMPRESSED_READ_BLOCK = 256 * 1024
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jsonl_viewer")
+# 원격 파일 로컬 캐시 크기 상한 (LRU로 삭제)
+REMOTE_CACHE_MAX_BYTES = 50 * 1024 * 1024 * 1024
+CACHE_VERIFY_BYTES = 64 * 1024
+# 뷰 내보내기/복사: 한 번에 읽어서 쓰는 행 수 (메모리에는 이 배치 하나만 유지)
+EXPORT_BATCH_ROWS = 20000
+# 여러 파일(디렉터리/glob) 데이터셋: shard로 인식하는 확장자, 동시에 열어두는 shard 수,
+# 처음 열 때 행 수를 세는 스레드 수 (원격은 SSH 세션 하나를 공유하므로 적게)
+SHARD_EXTENSIONS = ('.jsonl', '.ndjson', '.json')
+SHARD_OPEN_FILES = 64
+SHARD_INDEX_WORKERS = PARSE_WORKERS
+REMOTE_SHARD_INDEX_WORKERS = 4
+GLOB_CHARS = re.compile(r'[*?[]')
+# 미리보기: 파일 전체를 읽지 않고 앞/뒤/임의 N행만 가져옴. 앞/뒤는 PREVIEW_BLOCK_BYTES부터 두 배씩 늘려 읽음
+PREVIEW_MODES = ('head', 'tail', 'random')
+PREVIEW_ROWS = 1000
+PREVIEW_BLOCK_BYTES = 256 * 1024
+# 임의 샘플은 바이트 위치를 뽑아 그 위치가 속한 줄을 읽음 (위치 주변 PREVIEW_PROBE_BYTES부터, 줄이 더 길면 넓혀서 다시)
+# 긴 줄일수록 잘 뽑히므로 (가장 짧은 줄 길이 / 줄 길이)의 확률로만 받아들임. 한 번에 N * PREVIEW_OVERSAMPLE개 위치를
+# 뽑고, PREVIEW_PROBE_ROUNDS번 뽑아도 N줄이 모자라면 파일 전체를 읽어 샘플링
+PREVIEW_PROBE_BYTES = 4096
+PREVIEW_OVERSAMPLE = 4
+PREVIEW_PROBE_ROUNDS = 8
+
+
+json_loads = orjson.loads if orjson is not None else json.loads
+_parse_pool = None
+
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and value != value) or value is pd.NA
+
+
+def json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def to_text(value):
+    if is_missing(value):
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=json_default)
+
+
+def cell_text(value, max_chars=0):
+    if isinstance(value, str):
+        text = value
+    elif isinstance(value, (dict, list, np.ndarray)):
+        text = to_text(value)
+    else:
+        text = str(value)
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars] + f" … [{len(text):,} chars]"
+    return text
+
+
+def detail_text(value):
+    if isinstance(value, (dict, list, np.ndarray)):
+        return json.dumps(value, ensure_ascii=False, indent=2, default=json_default)
+    return str(value)
+
+
+def type_name(value):
+    if is_missing(value):
+        return 'null'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, (list, np.ndarray)):
+        return 'array'
+    return type(value).__name__
+
+
+def infer_schema(records, max_list_items=SCHEMA_LIST_ITEMS):
+    # 샘플 레코드들의 모든 경로(meta.source, messages[0].content ...)와 타입의 합집합
+    schema = {}
+
+    def visit(value, path):
+        schema.setdefault(path, set()).add(type_name(value))
+        if isinstance(value, dict):
+            for key, child in value.items():
+                visit(child, f"{path}.{key}")
+        elif isinstance(value, (list, np.ndarray)):
+            for i, child in enumerate(value[:max_list_items]):
+                visit(child, f"{path}[{i}]")
+
+    for record in records:
+        if isinstance(record, dict):
+            for key, value in record.items():
+                visit(value, str(key))
+    return schema
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_path(path):
+    return tuple(int(index) if index else key for index, key in PATH_TOKEN.findall(path))
+
+
+def extract_path(record, path):
+    # 최상위 키가 그대로 있으면 우선 사용 (키에 '.'이 들어간 경우)
+    if isinstance(record, dict) and path in record:
+        return record[path]
+    value = record
+    for token in parse_path(path):
+        if isinstance(token, int):
+            if not isinstance(value, (list, np.ndarray)) or token >= len(value):
+                return None
+        elif not isinstance(value, dict) or token not in value:
+            return None
+        value = value[token]
+    return value
+
+
+def records_frame(records, columns):
+    if all('.' not in col and '[' not in col for col in columns):
+        return pd.DataFrame(records, columns=columns)
+    # 중첩 경로는 이 레코드들에서만 꺼냄
+    rows = [[extract_path(record, col) for col in columns] for record in records]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def project_frame(df, paths):
+    # 선택한 경로만 꺼낸 DataFrame. 중첩 경로는 이 df의 행에서만 추출
+    if all(path in df.columns for path in paths):
+        return df[list(paths)]
+    data = {}
+    for path in paths:
+        if path in df.columns:
+            data[path] = df[path]
+            continue
+        root = parse_path(path)[0] if parse_path(path) else path
+        if root in df.columns:
+            rest = path[len(str(root)):].lstrip('.')
+            data[path] = df[root].map(lambda value: extract_path(value, rest) if rest else value)
+        else:
+            data[path] = pd.Series([None] * len(df.index), index=df.index, dtype=object)
+    return pd.DataFrame(data, index=df.index, columns=list(paths))
+
+
+def root_columns(paths, available):
+    roots = {}
+    for path in paths:
+        if path in available:
+            roots.setdefault(path, None)
+        elif parse_path(path) and parse_path(path)[0] in available:
+            roots.setdefault(parse_path(path)[0], None)
+    return list(roots)
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def iter_file_chunks(f, block_size=LOCAL_READ_BLOCK, limit=None):
+    remaining = limit
+    while remaining is None or remaining > 0:
+        data = f.read(block_size if remaining is None else min(block_size, remaining))
+        if not data:
+            return
+        if remaining is not None:
+            remaining -= len(data)
+        yield data
+
+
+def iter_sftp_chunks(remote_file, start, end, block_size=REMOTE_READ_BLOCK, window=REMOTE_READ_WINDOW):
+    # readv로 window 크기만큼 요청을 한 번에 보내고 순서대로 받음 (메모리는 window 크기로 제한)
+    for window_start in range(start, end, window):
+        window_end = min(window_start + window, end)
+        ranges = [(offset, min(block_size, window_end - offset))
+                  for offset in range(window_start, window_end, block_size)]
+        for data in remote_file.readv(ranges):
+            yield data
+
+
+def iter_line_batches(chunks, batch_bytes=LOAD_CHUNK_BYTES):
+    # 바이트 청크 스트림을 줄 단위로 잘라 (비어있지 않은 줄 목록, 읽은 바이트 수)로 묶어서 반환
+    # 첫 페이지가 빨리 보이도록 작은 청크부터 시작해서 batch_bytes까지 키움
+    limit = min(FIRST_CHUNK_BYTES, batch_bytes)
+    blocks = []
+    nbytes = 0
+    tail = b''
+    for chunk in chunks:
+        data = tail + chunk if tail else chunk
+        cut = data.rfind(b'\n') + 1
+        tail = data[cut:]
+        if cut:
+            blocks.append(data[:cut])
+            nbytes += cut
+        if nbytes >= limit:
+            yield split_lines(b''.join(blocks)), nbytes
+            blocks = []
+            nbytes = 0
+            limit = min(limit * 2, batch_bytes)
+    if tail:
+        blocks.append(tail)
+        nbytes += len(tail)
+    if nbytes:
+        yield split_lines(b''.join(blocks)), nbytes
+
+
+def split_lines(data):
+    return [line for line in data.splitlines() if line.strip()]
+
+
+def parse_lines(lines):
+    return pd.DataFrame([json_loads(line) for line in lines])
+
+
+def complete_lines_size(f, size, block_size=64 * 1024):
+    # 마지막 개행까지의 바이트 수. 아직 쓰는 중인 마지막 줄은 제외 (follow 모드용)
+    end = size
+    while end > 0:
+        start = max(0, end - block_size)
+        f.seek(start)
+        pos = f.read(end - start).rfind(b'\n')
+        if pos >= 0:
+            return start + pos + 1
+        end = start
+    return 0
+
+
+def split_byte_ranges(path, chunk_bytes=PARALLEL_CHUNK_BYTES, first_chunk_bytes=FIRST_CHUNK_BYTES, size=None):
+    # 파일을 줄 경계에 맞춘 바이트 구간들로 나눔 (첫 구간은 첫 페이지용으로 작게)
+    if size is None:
+        size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        target = first_chunk_bytes
+        while target < size:
+            f.seek(target)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+            target = pos + chunk_bytes
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def parse_byte_range(path, start, end):
+    # 프로세스 풀에서 실행됨
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_lines(split_lines(data))
+
+
+def parse_pool():
+    global _parse_pool
+    if _parse_pool is None:
+        # Qt 스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+        _parse_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+def iter_parallel_chunks(path, chunk_bytes=PARALLEL_CHUNK_BYTES, size=None):
+    # 구간별로 프로세스 풀에서 파싱하고 결과는 파일 순서대로 (DataFrame, 구간 끝 오프셋)으로 반환
+    ranges = split_byte_ranges(path, chunk_bytes, size=size)
+    start, end = ranges[0]
+    yield parse_byte_range(path, start, end), end
+    futures = [parse_pool().submit(parse_byte_range, path, start, end) for start, end in ranges[1:]]
+    try:
+        for (start, end), future in zip(ranges[1:], futures):
+            yield future.result(), end
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def parallel_read_jsonl(path, chunk_bytes=PARALLEL_CHUNK_BYTES):
+    frames = [df for df, _ in iter_parallel_chunks(path, chunk_bytes)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def remote_cache_key(creds, path):
+    raw = f"{creds['username']}@{creds['hostname']}:{creds['port']}{path}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def cache_key(creds, path):
+    # 캐시 디렉터리에 두는 사이드카 이름 (로컬 데이터셋은 옆에 둘 파일 이름이 없음)
+    if creds is not None:
+        return remote_cache_key(creds, path)
+    return hashlib.sha1(f"local:{os.path.abspath(path)}".encode('utf-8')).hexdigest()
+
+
+def is_dataset_path(path):
+    # 로컬 디렉터리나 glob 패턴은 여러 shard로 된 데이터셋 (원격 디렉터리는 stat으로 판별)
+    return bool(GLOB_CHARS.search(path)) or os.path.isdir(path)
+
+
+def is_shard_name(name):
+    name = name.lower()
+    if compression_of(name):
+        name = os.path.splitext(name)[0]
+    return name.endswith(SHARD_EXTENSIONS)
+
+
+class SSHConnectionPool:
+    # (hostname, port, username) 별로 SSH/SFTP 세션을 재사용
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    @staticmethod
+    def key(creds):
+        return (creds['hostname'], creds['port'], creds['username'])
+
+    def sftp(self, creds):
+        key = self.key(creds)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                ssh, sftp = session
+                transport = ssh.get_transport()
+                if transport is not None and transport.is_active():
+                    return sftp
+                self._close(session)
+                del self._sessions[key]
+            # paramiko(암호화 모듈 포함)는 원격 파일을 처음 열 때 불러옴
+            import paramiko
+            ssh = paramiko.SSHClient()
+            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            ssh.connect(creds['hostname'], port=creds['port'],
+                        username=creds['username'], password=creds['password'])
+            try:
+                sftp = ssh.open_sftp()
+            except Exception:
+                ssh.close()
+                raise
+            self._sessions[key] = (ssh, sftp)
+            return sftp
+
+    def open_sftp(self, creds):
+        # 같은 SSH 연결에 SFTP 채널을 하나 더 엶. paramiko의 SFTPClient 하나를 여러 스레드가 동시에 쓰면
+        # 응답이 엇갈리므로 병렬 작업은 각자 채널을 씀 (호출한 쪽에서 닫음)
+        self.sftp(creds)
+        with self._lock:
+            ssh, _ = self._sessions[self.key(creds)]
+        return ssh.open_sftp()
+
+    def discard(self, creds):
+        with self._lock:
+            session = self._sessions.pop(self.key(creds), None)
+        if session is not None:
+            self._close(session)
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._close(session)
+
+    @staticmethod
+    def _close(session):
+        ssh, sftp = session
+        try:
+            sftp.close()
+        finally:
+            ssh.close()
+
+
+ssh_pool = SSHConnectionPool()
+
+
+class RemoteFileCache:
+    # 원격 파일의 로컬 복사본. (size, mtime)이 같으면 재사용하고, 뒤에 추가만 된 경우 꼬리만 받음
+    def __init__(self, directory, max_bytes=REMOTE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self._lock = threading.Lock()
+        self._manifest = None
+        self.hits = 0
+        self.misses = 0
+        self.appends = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+
+    def manifest(self):
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def local_path(self, creds, path):
+        name = remote_cache_key(creds, path) + "-" + posixpath.basename(path)
+        return os.path.join(self.directory, name)
+
+    def reusable_bytes(self, sftp, creds, path, stat):
+        # 캐시에서 그대로 쓸 수 있는 앞부분 바이트 수 (0이면 전체 다운로드)
+        local_path = self.local_path(creds, path)
+        with self._lock:
+            entry = self.manifest().get(remote_cache_key(creds, path))
+        if entry is None or not os.path.exists(local_path) or os.path.getsize(local_path) != entry['size']:
+            return 0
+        if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return stat.st_size
+        if 0 < entry['size'] < stat.st_size and self.prefix_matches(sftp, path, local_path, entry['size']):
+            return entry['size']
+        return 0
+
+    @staticmethod
+    def prefix_matches(sftp, path, local_path, size):
+        # append-only 로그인지 확인: 캐시 끝부분과 원격 같은 구간 비교
+        start = max(0, size - CACHE_VERIFY_BYTES)
+        with open(local_path, 'rb') as f:
+            f.seek(start)
+            local_tail = f.read()
+        with sftp.open(path, 'rb') as remote_file:
+            remote_file.seek(start)
+            return remote_file.read(size - start) == local_tail
+
+    def fetch(self, sftp, creds, path, stat, reusable, size=None):
+        # 캐시에 없는 부분을 내려받으면서 받은 청크를 그대로 yield
+        # size를 주면 앞 size 바이트까지만 캐시에 둠 (follow 모드에서 아직 쓰는 중인 마지막 줄은 빼고)
+        key = remote_cache_key(creds, path)
+        local_path = self.local_path(creds, path)
+        os.makedirs(self.directory, exist_ok=True)
+        size = stat.st_size if size is None else size
+        reusable = min(reusable, size)
+        if reusable == size:
+            self.hits += 1
+        elif reusable:
+            self.appends += 1
+        else:
+            self.misses += 1
+        self.bytes_saved += reusable
+        target = local_path if reusable else local_path + ".part"
+        completed = False
+        try:
+            if reusable < size:
+                with open(target, 'r+b' if reusable else 'wb') as f, sftp.open(path, 'rb') as remote_file:
+                    f.truncate(reusable)
+                    f.seek(reusable)
+                    for data in iter_sftp_chunks(remote_file, reusable, size):
+                        f.write(data)
+                        self.bytes_downloaded += len(data)
+                        yield data
+                if not reusable:
+                    os.replace(target, local_path)
+            elif reusable and os.path.getsize(local_path) > size:
+                with open(local_path, 'r+b') as f:
+                    f.truncate(size)
+            completed = True
+        finally:
+            if not completed:
+                # 중단된 경우 부분 파일은 버리고, 이어받기 중이었다면 원래 크기로 되돌림
+                if reusable:
+                    with open(target, 'r+b') as f:
+                        f.truncate(reusable)
+                elif os.path.exists(target):
+                    os.remove(target)
+        with self._lock:
+            self.manifest()[key] = {
+                'file': os.path.basename(local_path),
+                'size': size,
+                'mtime': stat.st_mtime,
+                'last_used': time.time(),
+            }
+            self.evict(keep=key)
+            self.save_manifest()
+
+    def append(self, creds, path, data, mtime):
+        # follow 모드에서 원격 파일 끝에 추가된 바이트를 캐시 사본에도 이어 붙임
+        key = remote_cache_key(creds, path)
+        local_path = self.local_path(creds, path)
+        with self._lock:
+            entry = self.manifest().get(key)
+            if entry is None or not os.path.exists(local_path) or os.path.getsize(local_path) != entry['size']:
+                return False
+            with open(local_path, 'ab') as f:
+                f.write(data)
+            entry['size'] += len(data)
+            entry['mtime'] = mtime
+            entry['last_used'] = time.time()
+            self.save_manifest()
+        return True
+
+    def evict(self, keep=None):
+        # 오래 사용하지 않은 항목부터 max_bytes 이하가 될 때까지 삭제
+        manifest = self.manifest()
+        total = sum(entry['size'] for entry in manifest.values())
+        for key, entry in sorted(manifest.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            local_path = os.path.join(self.directory, entry['file'])
+            for name in (local_path, LineIndex.sidecar_path(local_path), ArrowFrame.parquet_path(local_path)):
+                if os.path.exists(name):
+                    os.remove(name)
+            del manifest[key]
+            total -= entry['size']
+
+    def summary(self):
+        return (f"Cache: {self.hits} hits, {self.appends} appends, {self.misses} misses, "
+                f"{format_bytes(self.bytes_saved)} saved")
+
+
+remote_cache = RemoteFileCache(os.path.join(CACHE_DIR, "files"))
+
+
+# split_lines가 줄 양끝에서 지우는 공백 바이트 (bytes.strip과 같은 기준)
+SPACE_BYTES = np.zeros(256, dtype=bool)
+SPACE_BYTES[list(b' \t\n\r\x0b\x0c')] = True
+
+
+def lines_with_content(buf, begins, ends):
+    # [begins, ends) 구간마다 공백이 아닌 바이트가 있는지. 대부분의 줄은 첫 바이트로 판별되므로
+    # 공백으로 시작하는 줄만 끝까지 확인
+    has = np.zeros(len(begins), dtype=bool)
+    nonempty = np.flatnonzero(ends > begins)
+    has[nonempty] = ~SPACE_BYTES[buf[begins[nonempty]]]
+    check = nonempty[~has[nonempty]]
+    if len(check):
+        low = begins[check[0]]
+        content = ~SPACE_BYTES[buf[low:ends[check[-1]]]]
+        # [b0, e0, b1, e1, ..., bk] 로 reduceat하면 짝수 번째 결과가 각 구간의 any
+        bounds = np.empty(2 * len(check) - 1, dtype=np.int64)
+        bounds[0::2] = begins[check] - low
+        bounds[1::2] = ends[check[:-1]] - low
+        has[check] = np.logical_or.reduceat(content, bounds)[0::2]
+    return has
+
+
+class LineIndex:
+    # JSONL 파일의 줄 시작 바이트 오프셋 인덱스 (공백뿐인 줄 제외, split_lines와 같은 기준)
+    def __init__(self, starts, file_size, mtime_ns):
+        self.starts = starts
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self):
+        return len(self.starts)
+
+    @staticmethod
+    def sidecar_path(path):
+        return path + ".idx.npz"
+
+    @staticmethod
+    def remote_sidecar_path(creds, path):
+        return os.path.join(CACHE_DIR, "index", remote_cache_key(creds, path) + ".idx.npz")
+
+    @classmethod
+    def from_chunks(cls, chunks, file_size, mtime_ns, progress=None):
+        # 청크마다 개행 위치를 numpy로 찾아 줄 시작 오프셋을 만듦
+        newline_parts = []
+        content_parts = []
+        pos = 0
+        # 청크 끝에서 아직 개행이 나오지 않은 줄에 공백이 아닌 바이트가 있었는지
+        pending = False
+        for chunk in chunks:
+            buf = np.frombuffer(chunk, dtype=np.uint8)
+            if len(buf) == 0:
+                continue
+            newlines = np.flatnonzero(buf == 10)
+            begins = np.concatenate([np.zeros(1, dtype=np.int64), newlines + 1])
+            ends = np.concatenate([newlines, np.array([len(buf)], dtype=np.int64)])
+            has = lines_with_content(buf, begins, ends)
+            has[0] |= pending
+            newline_parts.append(newlines.astype(np.uint64) + np.uint64(pos))
+            content_parts.append(has[:-1])
+            pending = bool(has[-1])
+            pos += len(buf)
+            if progress is not None:
+                progress(pos, file_size)
+        newlines = np.concatenate(newline_parts) if newline_parts else np.zeros(0, dtype=np.uint64)
+        has = np.concatenate(content_parts + [np.array([pending])])
+        starts = np.concatenate([np.zeros(1, dtype=np.uint64), newlines + np.uint64(1)])
+        # 빈 줄과 공백뿐인 줄은 레코드로 세지 않음
+        return cls(starts[has], pos, mtime_ns)
+
+    @classmethod
+    def build(cls, path, progress=None):
+        stat = os.stat(path)
+        size = stat.st_size
+        if size == 0:
+            return cls(np.zeros(0, dtype=np.uint64), 0, stat.st_mtime_ns)
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                view = memoryview(mm)
+                chunks = (view[pos:pos + INDEX_SCAN_CHUNK] for pos in range(0, size, INDEX_SCAN_CHUNK))
+                index = cls.from_chunks(chunks, size, stat.st_mtime_ns, progress)
+                del chunks
+                view.release()
+            finally:
+                mm.close()
+        return index
+
+    @classmethod
+    def load(cls, sidecar, file_size, mtime_ns):
+        if not os.path.exists(sidecar):
+            return None
+        try:
+            with np.load(sidecar) as data:
+                size, saved_mtime_ns = (int(v) for v in data['meta'])
+                if size != file_size or saved_mtime_ns != mtime_ns:
+                    return None
+                return cls(data['starts'], size, mtime_ns)
+        except Exception as e:
+            print(f"Ignoring unreadable index {sidecar}: {e}", file=sys.stderr)
+            return None
+
+    def save(self, sidecar):
+        try:
+            os.makedirs(os.path.dirname(sidecar) or ".", exist_ok=True)
+            # np.savez는 확장자가 .npz가 아니면 덧붙이므로 파일 객체로 저장
+            with open(sidecar, 'wb') as f:
+                np.savez(f, starts=self.starts,
+                         meta=np.array([self.file_size, self.mtime_ns], dtype=np.int64))
+        except OSError as e:
+            print(f"Could not save index {sidecar}: {e}", file=sys.stderr)
+
+    @classmethod
+    def load_or_build(cls, path, progress=None):
+        stat = os.stat(path)
+        sidecar = cls.sidecar_path(path)
+        index = cls.load(sidecar, stat.st_size, stat.st_mtime_ns)
+        if index is None:
+            index = cls.build(path, progress)
+            index.save(sidecar)
+        return index
+
+    def extend(self, starts, file_size, mtime_ns=None):
+        # follow 모드에서 뒤에 추가된 줄만 인덱스에 덧붙임
+        self.starts = np.concatenate([self.starts, starts.astype(np.uint64)])
+        self.file_size = file_size
+        if mtime_ns is not None:
+            self.mtime_ns = mtime_ns
+
+    def byte_range(self, start, stop):
+        # [start, stop) 행이 차지하는 바이트 구간
+        begin = int(self.starts[start])
+        end = int(self.starts[stop]) if stop < len(self.starts) else self.file_size
+        return begin, end
+
+    def row_ranges(self, rows):
+        # 각 행이 차지하는 바이트 구간의 (시작 배열, 끝 배열)
+        rows = np.asarray(rows, dtype=np.int64)
+        begins = self.starts[rows].astype(np.int64)
+        following = rows + 1
+        ends = np.full(len(rows), self.file_size, dtype=np.int64)
+        inside = following < len(self.starts)
+        ends[inside] = self.starts[following[inside]]
+        return begins, ends
+
+
+def compression_of(path):
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def new_decompressor(kind):
+    if kind == 'gzip':
+        return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    if kind == 'bz2':
+        return bz2.BZ2Decompressor()
+    if zstandard is None:
+        raise ImportError("Reading .zst files requires the zstandard package")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+class DecompressStream:
+    # 압축 해제 위치(upos)와 압축 위치(cpos)를 함께 추적
+    # 여러 멤버/프레임/스트림이 이어 붙은 파일(pigz, pbzip2, pzstd 등)도 끝까지 풂
+    def __init__(self, kind, cpos=0, upos=0, state=None):
+        self.kind = kind
+        self.cpos = cpos
+        self.upos = upos
+        # 체크포인트의 압축 해제기는 여러 번 재사용하도록 복사해서 씀
+        self.decompressor = state.copy() if state is not None else new_decompressor(kind)
+        # 이번 feed에서 만난 멤버 시작점 (upos, cpos)
+        self.boundaries = []
+
+    def feed(self, data):
+        # data는 self.cpos부터 이어지는 압축 바이트
+        end = self.cpos + len(data)
+        out = []
+        upos = self.upos
+        self.boundaries = []
+        while data:
+            if self.decompressor.eof:
+                if not data.strip(b'\0'):
+                    # gzip 끝의 0 패딩
+                    break
+                self.decompressor = new_decompressor(self.kind)
+                self.boundaries.append((upos, end - len(data)))
+            chunk = self.decompressor.decompress(data)
+            out.append(chunk)
+            upos += len(chunk)
+            data = self.decompressor.unused_data if self.decompressor.eof else b''
+        self.cpos = end
+        self.upos = upos
+        return b''.join(out)
+
+    def finish(self):
+        # 입력이 끝났는데 마지막 멤버/프레임이 닫히지 않았으면 파일이 잘린 것
+        if self.cpos and not self.decompressor.eof:
+            raise ValueError(f"Compressed file is truncated: the {self.kind} stream ends "
+                             f"unexpectedly after {self.cpos:,} bytes")
+
+    def checkpoint(self):
+        # 현재 위치에서 다시 시작할 수 있는 상태. zlib만 압축 해제기 복사를 지원
+        if self.kind == 'gzip' and not self.decompressor.eof:
+            return (self.upos, self.cpos, self.decompressor.copy())
+        return None
+
+
+def iter_decompressed(chunks, kind, stream=None, checkpoints=None, checkpoint_bytes=COMPRESSED_CHECKPOINT_BYTES):
+    # 압축된 청크 스트림을 풀어서 yield. checkpoints 리스트가 주어지면 임의 접근용 재개 지점을 기록
+    stream = stream or DecompressStream(kind)
+    if checkpoints is not None:
+        checkpoints.append((0, 0, None))
+    last = 0
+    for chunk in chunks:
+        data = stream.feed(chunk)
+        if checkpoints is not None:
+            # 멤버 경계는 압축 해제기 상태 없이 바로 시작할 수 있음
+            for upos, cpos in stream.boundaries:
+                checkpoints.append((upos, cpos, None))
+                last = upos
+            if stream.upos - last >= checkpoint_bytes:
+                checkpoint = stream.checkpoint()
+                if checkpoint is not None:
+                    checkpoints.append(checkpoint)
+                    last = stream.upos
+        if data:
+            yield data
+    stream.finish()
+
+
+class CompressedReader:
+    # 압축 파일에서 압축 해제 기준 [begin, end) 구간을 가장 가까운 체크포인트부터 풀어서 읽음
+    # 직전에 읽은 위치를 기억해서 다음 페이지처럼 이어지는 읽기는 처음부터 다시 풀지 않음
+    def __init__(self, raw, path, kind, checkpoints, lock=None):
+        self.path = path
+        self.kind = kind
+        self.checkpoints = checkpoints
+        self._positions = [upos for upos, _, _ in checkpoints]
+        self._raw = raw
+        # 원격 shard들은 SFTP 세션 하나를 공유하므로 같은 lock을 씀
+        self._lock = lock if lock is not None else threading.Lock()
+        self._stream = None
+        self._buf_start = 0
+        self._buf = bytearray()
+
+    @classmethod
+    def open(cls, raw, path, kind, compressed_size, mtime_ns, chunks=None, progress=None, lock=None):
+        # 한 번 끝까지 풀면서 줄 인덱스와 체크포인트를 만듦 (체크포인트는 메모리에만 보관)
+        if chunks is None:
+            raw.seek(0)
+            chunks = iter_file_chunks(raw)
+        stream = DecompressStream(kind)
+        checkpoints = []
+
+        def report(data):
+            for chunk in data:
+                yield chunk
+                if progress is not None:
+                    progress(stream.cpos, compressed_size)
+
+        decompressed = iter_decompressed(chunks, kind, stream, checkpoints)
+        index = LineIndex.from_chunks(report(decompressed), 0, mtime_ns)
+        return cls(raw, path, kind, checkpoints, lock), index
+
+    def read_raw(self, cpos, size):
+        self._raw.seek(cpos)
+        return self._raw.read(size)
+
+    def read(self, begin, end):
+        with self._lock:
+            checkpoint = bisect.bisect_right(self._positions, begin) - 1
+            upos, cpos, state = self.checkpoints[checkpoint]
+            # 기억한 위치가 더 가깝지 않으면 체크포인트에서 다시 시작
+            if self._stream is None or begin < self._buf_start or upos > self._buf_start + len(self._buf):
+                self._stream = DecompressStream(self.kind, cpos, upos, state)
+                self._buf_start = upos
+                self._buf = bytearray()
+            while self._buf_start + len(self._buf) < end:
+                data = self.read_raw(self._stream.cpos, COMPRESSED_READ_BLOCK)
+                if not data:
+                    break
+                out = self._stream.feed(data)
+                if self._buf_start + len(self._buf) < begin:
+                    # 필요한 구간 앞부분은 버림
+                    self._buf_start += len(self._buf)
+                    self._buf = bytearray(out)
+                else:
+                    self._buf += out
+            result = bytes(self._buf[begin - self._buf_start:end - self._buf_start])
+            del self._buf[:max(0, begin - self._buf_start)]
+            self._buf_start = max(self._buf_start, begin)
+            return result
+
+    def read_ranges(self, ranges):
+        # 정렬된 구간이면 기억한 위치에서 이어서 풀게 됨
+        return [self.read(begin, end) for begin, end in ranges]
+
+    def close(self):
+        self._raw.close()
+
+
+class MmapReader:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def read(self, begin, end):
+        return self._mm[begin:end]
+
+    def read_ranges(self, ranges):
+        mm = self._mm
+        return [mm[begin:end] for begin, end in ranges]
+
+    def refresh(self):
+        # 파일이 커졌으면 다시 매핑. 다른 스레드가 읽는 중일 수 있으므로 이전 매핑은 참조가 없어질 때 닫힘
+        size = os.fstat(self._file.fileno()).st_size
+        if size and (self._mm is None or len(self._mm) < size):
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+class SFTPReader:
+    # 원격 파일에서 필요한 바이트 구간만 파이프라이닝된 readv로 가져옴
+    def __init__(self, sftp, path, lock=None):
+        self.path = path
+        self._lock = lock if lock is not None else threading.Lock()
+        with self._lock:
+            self._file = sftp.open(path, 'rb')
+
+    def read(self, begin, end):
+        with self._lock:
+            return b''.join(iter_sftp_chunks(self._file, begin, end))
+
+    def read_ranges(self, ranges):
+        # 여러 구간을 readv 한 번으로 요청 (왕복 지연을 한 번만 기다림)
+        with self._lock:
+            return read_ranges(self._file, [(begin, end - begin) for begin, end in ranges])
+
+    def close(self):
+        self._file.close()
+
+
+class LazyJSONLFrame:
+    # 라인 인덱스를 통해 필요한 행만 파싱하는 읽기 전용 프레임
+    def __init__(self, reader, index, columns=None):
+        self.reader = reader
+        self.path = reader.path
+        self.index = index
+        self.columns = list(columns) if columns is not None else self.infer_columns()
+
+    @classmethod
+    def open(cls, path, progress=None):
+        kind = compression_of(path)
+        if kind:
+            stat = os.stat(path)
+            raw = open(path, 'rb')
+            try:
+                reader, index = CompressedReader.open(raw, path, kind, stat.st_size, stat.st_mtime_ns,
+                                                      progress=progress)
+            except BaseException:
+                raw.close()
+                raise
+            return cls(reader, index)
+        index = LineIndex.load_or_build(path, progress)
+        return cls(MmapReader(path), index)
+
+    @classmethod
+    def open_remote(cls, sftp, creds, path, size, mtime_ns, progress=None, lock=None):
+        # 인덱스는 로컬 캐시 디렉터리에 저장하고, 페이지를 볼 때는 해당 바이트 구간만 읽음
+        kind = compression_of(path)
+        if kind:
+            # 압축 파일은 한 번 끝까지 풀면서 줄 인덱스와 체크포인트를 만들고, 페이지는 가까운 체크포인트부터 풂
+            raw = sftp.open(path, 'rb')
+            try:
+                reader, index = CompressedReader.open(raw, path, kind, size, mtime_ns,
+                                                      iter_sftp_chunks(raw, 0, size), progress, lock)
+            except BaseException:
+                raw.close()
+                raise
+            return cls(reader, index)
+        sidecar = LineIndex.remote_sidecar_path(creds, path)
+        reader = SFTPReader(sftp, path, lock)
+        try:
+            index = LineIndex.load(sidecar, size, mtime_ns)
+            if index is None:
+                index = LineIndex.from_chunks(iter_sftp_chunks(reader._file, 0, size), size, mtime_ns, progress)
+                index.save(sidecar)
+            return cls(reader, index)
+        except BaseException:
+            reader.close()
+            raise
+
+    def __len__(self):
+        return len(self.index)
+
+    def select(self, columns):
+        # 같은 reader와 인덱스를 공유하는 projection
+        frame = copy.copy(self)
+        frame.columns = list(columns)
+        return frame
+
+    def read_lines(self, start, stop):
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        begin, end = self.index.byte_range(start, stop)
+        return split_lines(self.reader.read(begin, end))
+
+    def records(self, start, stop):
+        return [json_loads(line) for line in self.read_lines(start, stop)]
+
+    def to_frame(self, records):
+        return records_frame(records, self.columns)
+
+    def page(self, start, stop):
+        return self.to_frame(self.records(start, stop))
+
+    def take(self, rows):
+        return self.to_frame(self.take_lines(rows))
+
+    def take_lines(self, rows):
+        # 임의 위치의 행들을 파일 순서로 정렬하고, 가까운 바이트 구간은 합쳐서 한 번에 읽은 뒤 원래 순서로 되돌림
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return []
+        order = np.argsort(rows, kind='stable')
+        begins, ends = self.index.row_ranges(rows[order])
+        # 앞 구간들의 끝에서 TAKE_MERGE_GAP_BYTES 넘게 떨어진 행에서 새 구간 시작
+        reach = np.maximum.accumulate(ends)
+        firsts = np.flatnonzero(np.concatenate([[True], begins[1:] - reach[:-1] > TAKE_MERGE_GAP_BYTES]))
+        lasts = np.append(firsts[1:], len(rows)) - 1
+        span_begins = begins[firsts]
+        chunks = self.reader.read_ranges(list(zip(span_begins.tolist(), reach[lasts].tolist())))
+        span_of = np.repeat(np.arange(len(firsts)), np.diff(np.append(firsts, len(rows))))
+        records = [None] * len(rows)
+        for position, span, begin, end in zip(order.tolist(), span_of.tolist(),
+                                              (begins - span_begins[span_of]).tolist(),
+                                              (ends - span_begins[span_of]).tolist()):
+            records[position] = json_loads(chunks[span][begin:end])
+        return records
+
+    # 내보내기용 레코드 (DataFrame을 거치지 않아 null이 섞인 정수 컬럼도 정수로 유지)
+    def page_records(self, start, stop):
+        return [project_record(record, self.columns) for record in self.records(start, stop)]
+
+    def take_records(self, rows):
+        return [project_record(record, self.columns) for record in self.take_lines(rows)]
+
+    def schema(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        return infer_schema(self.records(0, sample_rows))
+
+    def extend(self, starts, file_size):
+        # select()로 만든 프레임들도 같은 인덱스를 공유하므로 함께 늘어남
+        self.index.extend(starts, file_size)
+        if isinstance(self.reader, MmapReader):
+            self.reader.refresh()
+
+    def infer_columns(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        columns = {}
+        for record in self.records(0, sample_rows):
+            if isinstance(record, dict):
+                for key in record:
+                    columns.setdefault(key, None)
+        return list(columns)
+
+    def close(self):
+        self.reader.close()
+
+
+class ArrowFrame:
+    # 불변 Arrow 테이블 기반 프레임. 컬럼 선택과 페이지 slice는 복사 없이 처리
+    def __init__(self, table, path=None, columns=None):
+        self.table = table
+        self.path = path
+        self.columns = list(columns) if columns is not None else list(table.column_names)
+        self._pandas = None
+
+    @staticmethod
+    def parquet_path(path):
+        return path + ".parquet"
+
+    @classmethod
+    def open(cls, path):
+        # 원본과 크기/mtime이 같은 Parquet 캐시가 있으면 memory map으로 바로 연다
+        stat = os.stat(path)
+        source = json.dumps({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}).encode('utf-8')
+        cache = cls.parquet_path(path)
+        if os.path.exists(cache):
+            try:
+                metadata = pq.read_schema(cache).metadata or {}
+                if metadata.get(PARQUET_SOURCE_KEY) == source:
+                    return cls(pq.read_table(cache, memory_map=True), path)
+            except Exception as e:
+                print(f"Ignoring unreadable Parquet cache {cache}: {e}", file=sys.stderr)
+        table = cls.read_jsonl(path)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), PARQUET_SOURCE_KEY: source})
+        try:
+            pq.write_table(table, cache)
+        except (OSError, pa.ArrowException) as e:
+            print(f"Could not write Parquet cache {cache}: {e}", file=sys.stderr)
+            if os.path.exists(cache):
+                os.remove(cache)
+        return cls(table, path)
+
+    @staticmethod
+    def read_jsonl(path):
+        kind = compression_of(path)
+        try:
+            if kind:
+                # Arrow 입력 스트림이 확장자로 압축 형식을 판별해 스트리밍으로 풂
+                return pa_json.read_json(pa.input_stream(path, compression='detect'))
+            return pa_json.read_json(path)
+        except pa.ArrowInvalid:
+            # 레코드마다 타입이 달라 Arrow JSON 리더가 실패하면 pandas로 읽어서 변환
+            if kind:
+                with open(path, 'rb') as f:
+                    df = parse_lines(split_lines(b''.join(iter_decompressed(iter_file_chunks(f), kind))))
+            elif PARSE_WORKERS > 1:
+                df = parallel_read_jsonl(path)
+            else:
+                df = parse_byte_range(path, 0, os.path.getsize(path))
+            return ArrowFrame.table_from_pandas(df)
+
+    @staticmethod
+    def table_from_pandas(df):
+        arrays = {}
+        for col in df.columns:
+            try:
+                arrays[str(col)] = pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # 타입이 섞인 컬럼은 문자열로 저장 (문자열이 아닌 값은 JSON 텍스트)
+                arrays[str(col)] = pa.array([to_text(v) for v in df[col]], type=pa.string())
+        return pa.table(arrays)
+
+    def append(self, df):
+        # follow 모드에서 추가된 행을 청크로 덧붙인 새 프레임 (기존 테이블은 복사하지 않음)
+        table = pa.concat_tables([self.table, self.table_from_pandas(df)], promote_options='permissive')
+        return ArrowFrame(table, self.path)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def select(self, columns):
+        return ArrowFrame(self.table, self.path, columns)
+
+    def project(self, table):
+        roots = root_columns(self.columns, table.column_names)
+        return project_frame(table.select(roots).to_pandas(), self.columns)
+
+    def page(self, start, stop):
+        return self.project(self.table.slice(start, max(0, stop - start)))
+
+    def take(self, rows):
+        return self.project(self.table.take(pa.array(rows, type=pa.int64())))
+
+    def scan_records(self, start, stop, paths):
+        roots = root_columns(paths, self.table.column_names)
+        return self.table.select(roots).slice(start, max(0, stop - start)).to_pylist()
+
+    def project_records(self, table):
+        roots = root_columns(self.columns, table.column_names)
+        return [project_record(record, self.columns) for record in table.select(roots).to_pylist()]
+
+    def page_records(self, start, stop):
+        return self.project_records(self.table.slice(start, max(0, stop - start)))
+
+    def take_records(self, rows):
+        return self.project_records(self.table.take(pa.array(rows, type=pa.int64())))
+
+    def schema(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        return infer_schema(self.table.slice(0, sample_rows).to_pylist())
+
+    def to_pandas(self):
+        # pandas 명령어용. 한 번만 변환해서 재사용
+        if self._pandas is None:
+            self._pandas = self.project(self.table)
+        return self._pandas
+
+    def close(self):
+        self._pandas = None
+
+
+class PandasFrame:
+    # 메모리에 있는 DataFrame을 프레임 인터페이스로 감쌈
+    def __init__(self, df, columns=None):
+        self.df = df
+        self.columns = list(columns) if columns is not None else list(df.columns)
+
+    def __len__(self):
+        return len(self.df.index)
+
+    def select(self, columns):
+        return PandasFrame(self.df, columns)
+
+    def page(self, start, stop):
+        return project_frame(self.df.iloc[start:stop], self.columns)
+
+    def take(self, rows):
+        return project_frame(self.df.iloc[rows], self.columns)
+
+    def scan_records(self, start, stop, paths):
+        # 행을 먼저 자르고 투영: 필요한 컬럼이 하나도 없어도 행 수는 유지
+        rows = self.df.iloc[start:stop]
+        roots = root_columns(paths, self.df.columns)
+        if not roots:
+            return [{} for _ in range(len(rows))]
+        return rows[roots].to_dict('records')
+
+    def page_records(self, start, stop):
+        return frame_records(self.page(start, stop))
+
+    def take_records(self, rows):
+        return frame_records(self.take(rows))
+
+    def schema(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        return infer_schema(self.df.iloc[:sample_rows].to_dict('records'))
+
+    def to_pandas(self):
+        return project_frame(self.df, self.columns)
+
+    def close(self):
+        pass
+
+
+class RowSubsetFrame:
+    # 쿼리 결과. 원본 프레임과 결과 행 번호만 들고 있다가 페이지마다 해당 행만 읽음
+    def __init__(self, source, rows, columns=None):
+        self.source = source
+        self.frame = source.select(columns) if columns else source
+        self.rows = rows
+        self.columns = list(self.frame.columns)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def select(self, columns):
+        return RowSubsetFrame(self.source, self.rows, columns)
+
+    def page(self, start, stop):
+        return self.frame.take(self.rows[start:stop]).reset_index(drop=True)
+
+    def take(self, rows):
+        return self.frame.take(self.rows[rows])
+
+    def page_records(self, start, stop):
+        return self.frame.take_records(self.rows[start:stop])
+
+    def take_records(self, rows):
+        return self.frame.take_records(self.rows[rows])
+
+    def schema(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        return self.frame.schema(sample_rows)
+
+    def to_pandas(self):
+        return self.page(0, len(self.rows))
+
+    def close(self):
+        # 원본 프레임은 뷰어가 닫음
+        pass
+
+
+def list_shards(path, sftp=None):
+    # 디렉터리 안의 JSONL 파일 또는 glob에 맞는 JSONL 파일들을 이름 순으로 [(경로, 크기, mtime_ns)]
+    # 원격은 마지막 경로 요소에만 패턴을 쓸 수 있음 (예: /data/part-*.jsonl)
+    if sftp is None:
+        if os.path.isdir(path):
+            paths = [os.path.join(path, name) for name in os.listdir(path)]
+        else:
+            paths = glob.glob(path)
+        shards = []
+        for shard in sorted(paths):
+            if is_shard_name(os.path.basename(shard)) and os.path.isfile(shard):
+                stat = os.stat(shard)
+                shards.append((shard, stat.st_size, stat.st_mtime_ns))
+        return shards
+    if GLOB_CHARS.search(path):
+        directory, pattern = posixpath.split(path)
+    else:
+        directory, pattern = path, None
+    shards = []
+    for attr in sorted(sftp.listdir_attr(directory), key=lambda attr: attr.filename):
+        if pattern is not None and not fnmatch.fnmatchcase(attr.filename, pattern):
+            continue
+        if is_shard_name(attr.filename) and not stat_module.S_ISDIR(attr.st_mode or 0):
+            # 원격 mtime은 초 단위 (원격 인덱스 사이드카와 같은 기준)
+            shards.append((posixpath.join(directory, attr.filename), attr.st_size, int(attr.st_mtime) * 10 ** 9))
+    return shards
+
+
+class ShardedFrame:
+    # 여러 shard 파일을 이어 붙인 읽기 전용 프레임
+    # 전역 행 번호는 shard별 행 수의 누적합으로 (shard, shard 안의 행 번호)로 바꾸고, shard는 그 행을 읽을 때 엶
+    def __init__(self, path, shards, counts, creds=None, columns=None):
+        self.path = path
+        self.creds = creds
+        self.shards = [shard for shard, _, _ in shards]
+        self.sizes = [size for _, size, _ in shards]
+        self.mtimes = [mtime_ns for _, _, mtime_ns in shards]
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.offsets = np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(self.counts)])
+        # 열린 shard는 select()로 만든 프레임들과 공유. 원격 shard는 SFTP 세션 하나를 함께 쓰므로
+        # 여는 것과 읽는 것을 모두 이 lock으로 직렬화
+        self._open = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self.columns = list(columns) if columns is not None else self.infer_columns()
+
+    @staticmethod
+    def manifest_path(path, creds=None):
+        return os.path.join(CACHE_DIR, "shards", cache_key(creds, path) + ".json")
+
+    @classmethod
+    def open(cls, path, creds=None, progress=None):
+        sftp = ssh_pool.sftp(creds) if creds is not None else None
+        shards = list_shards(path, sftp)
+        if not shards:
+            raise FileNotFoundError(f"No JSONL files found for {path}")
+        # (크기, mtime)이 그대로인 shard는 저장된 행 수를 쓰고, 나머지만 병렬로 인덱싱
+        manifest = cls.manifest_path(path, creds)
+        cached = cls.load_manifest(manifest)
+        counts = []
+        for shard, size, mtime_ns in shards:
+            entry = cached.get(shard)
+            counts.append(entry[2] if entry is not None and entry[:2] == [size, mtime_ns] else None)
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            total = sum(shards[i][1] for i in missing)
+            done = 0
+            workers = SHARD_INDEX_WORKERS if creds is None else REMOTE_SHARD_INDEX_WORKERS
+            pool = concurrent.futures.ThreadPoolExecutor(max(1, workers))
+            try:
+                futures = {pool.submit(cls.count_rows, shards[i], creds): i for i in missing}
+                if progress is not None:
+                    progress(0, total)
+                for future in concurrent.futures.as_completed(futures):
+                    i = futures[future]
+                    counts[i] = future.result()
+                    done += shards[i][1]
+                    if progress is not None:
+                        progress(done, total)
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+            cls.save_manifest(manifest, shards, counts)
+        return cls(path, shards, counts, creds)
+
+    @staticmethod
+    def count_rows(shard, creds=None):
+        # shard 인덱스를 만들어 사이드카에 저장 (나중에 페이지를 볼 때는 저장된 인덱스로 바로 엶)
+        if creds is None:
+            if not compression_of(shard[0]):
+                return len(LineIndex.load_or_build(shard[0]))
+            frame = open_shard(shard)
+            try:
+                return len(frame)
+            finally:
+                frame.close()
+        # 원격 shard는 스레드마다 별도 SFTP 채널로 읽음
+        path, size, mtime_ns = shard
+        sftp = ssh_pool.open_sftp(creds)
+        try:
+            frame = LazyJSONLFrame.open_remote(sftp, creds, path, size, mtime_ns)
+            frame.close()
+            return len(frame)
+        finally:
+            sftp.close()
+
+    @staticmethod
+    def load_manifest(manifest):
+        if not os.path.exists(manifest):
+            return {}
+        try:
+            with open(manifest, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable shard manifest {manifest}: {e}", file=sys.stderr)
+            return {}
+
+    @staticmethod
+    def save_manifest(manifest, shards, counts):
+        data = {shard: [size, mtime_ns, int(count)] for (shard, size, mtime_ns), count in zip(shards, counts)}
+        try:
+            os.makedirs(os.path.dirname(manifest), exist_ok=True)
+            with open(manifest, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"Could not save shard manifest {manifest}: {e}", file=sys.stderr)
+
+    @property
+    def file_size(self):
+        return sum(self.sizes)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def select(self, columns):
+        frame = copy.copy(self)
+        frame.columns = list(columns)
+        return frame
+
+    def shard(self, i):
+        # 최근에 쓴 shard만 열어둠. 내보낸 shard는 다른 스레드가 아직 읽고 있을 수 있으므로 닫지 않고 참조만 버림
+        with self._lock:
+            frame = self._open.get(i)
+            if frame is not None:
+                self._open.move_to_end(i)
+                return frame
+            frame = open_shard((self.shards[i], self.sizes[i], self.mtimes[i]), self.creds, self._lock)
+            self._open[i] = frame
+            if len(self._open) > SHARD_OPEN_FILES:
+                self._open.popitem(last=False)
+            return frame
+
+    def spans(self, start, stop):
+        # [start, stop) 행을 shard별 (shard 번호, shard 안 시작, 끝)으로
+        stop = min(stop, len(self))
+        if start >= stop:
+            return
+        first = int(np.searchsorted(self.offsets, start, side='right')) - 1
+        for i in range(first, len(self.shards)):
+            offset = int(self.offsets[i])
+            if offset >= stop:
+                break
+            if self.counts[i]:
+                yield i, max(start - offset, 0), min(stop - offset, int(self.counts[i]))
+
+    def read_lines(self, start, stop):
+        lines = []
+        for i, begin, end in self.spans(start, stop):
+            lines.extend(self.shard(i).read_lines(begin, end))
+        return lines
+
+    def records(self, start, stop):
+        return [json_loads(line) for line in self.read_lines(start, stop)]
+
+    def take_lines(self, rows):
+        # 행 번호를 shard별로 묶어서 읽은 뒤 원래 순서로 되돌림
+        rows = np.asarray(rows, dtype=np.int64)
+        shard_ids = np.searchsorted(self.offsets, rows, side='right') - 1
+        records = [None] * len(rows)
+        for i in np.unique(shard_ids).tolist():
+            positions = np.flatnonzero(shard_ids == i)
+            taken = self.shard(i).take_lines(rows[positions] - self.offsets[i])
+            for position, record in zip(positions.tolist(), taken):
+                records[position] = record
+        return records
+
+    def page(self, start, stop):
+        return records_frame(self.records(start, stop), self.columns)
+
+    def take(self, rows):
+        return records_frame(self.take_lines(rows), self.columns)
+
+    def page_records(self, start, stop):
+        return [project_record(record, self.columns) for record in self.records(start, stop)]
+
+    def take_records(self, rows):
+        return [project_record(record, self.columns) for record in self.take_lines(rows)]
+
+    def schema(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        return infer_schema(self.records(0, sample_rows))
+
+    def infer_columns(self, sample_rows=SCHEMA_SAMPLE_ROWS):
+        columns = {}
+        for record in self.records(0, sample_rows):
+            if isinstance(record, dict):
+                for key in record:
+                    columns.setdefault(key, None)
+        return list(columns)
+
+    def close(self):
+        with self._lock:
+            frames = list(self._open.values())
+            self._open.clear()
+        for frame in frames:
+            frame.close()
+
+
+def open_shard(shard, creds=None, lock=None):
+    path, size, mtime_ns = shard
+    if creds is None:
+        return LazyJSONLFrame.open(path)
+    return LazyJSONLFrame.open_remote(ssh_pool.sftp(creds), creds, path, size, mtime_ns, lock=lock)
+
+
+class ViewHistory:
+    # 보기에 적용한 변환(컬럼 선택, 쿼리, pandas 명령어, 초기화) 목록과 현재 위치
+    # 상태는 원본에서 다시 계산할 수 있으므로 가벼운 결과(원본 참조, 쿼리 결과 행 번호)만 캐시하고
+    # pandas 명령어 결과는 현재 위치 것만 들고 있음
+    def __init__(self, sidecar=None, file_size=None):
+        self.sidecar = sidecar
+        self.file_size = file_size
+        self.entries = []
+        self.states = []
+        self.position = 0
+
+    @staticmethod
+    def sidecar_path(path, creds=None):
+        # pandas 명령어가 들어 있으므로 데이터 옆이 아니라 사용자 캐시 디렉터리에만 둠
+        # (공유 폴더에 다른 사람이 둔 기록 파일을 읽지 않도록)
+        return os.path.join(CACHE_DIR, "history", cache_key(creds, path) + ".history.json")
+
+    @classmethod
+    def load(cls, sidecar, file_size=None):
+        history = cls(sidecar, file_size)
+        if not os.path.exists(sidecar):
+            return history
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # 파일이 줄어들었으면 (덮어쓴 경우) 기록을 버림. 뒤에 추가만 된 경우는 유지
+            saved_size = data.get('file_size')
+            if file_size is not None and saved_size is not None and saved_size > file_size:
+                return history
+            history.entries = [dict(entry) for entry in data['entries']]
+            history.states = [None] * len(history.entries)
+            history.position = max(0, min(int(data['position']), len(history.entries)))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable history {sidecar}: {e}", file=sys.stderr)
+        return history
+
+    def save(self):
+        if self.sidecar is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.sidecar) or ".", exist_ok=True)
+            with open(self.sidecar, 'w', encoding='utf-8') as f:
+                json.dump({'file_size': self.file_size, 'position': self.position,
+                           'entries': self.entries}, f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            print(f"Could not save history {self.sidecar}: {e}", file=sys.stderr)
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.entries)
+
+    def push(self, entry, state):
+        # 되돌린 뒤에 새 변환을 적용하면 redo 기록은 버림
+        del self.entries[self.position:]
+        del self.states[self.position:]
+        self.entries.append(entry)
+        self.states.append(state)
+        self.move(len(self.entries))
+
+    def invalidate(self, ops=('columns', 'reset')):
+        # 원본에 행이 추가되면 원본을 그대로 참조하던 상태만 버림 (쿼리/pandas 결과는 스냅샷으로 유지)
+        for i, entry in enumerate(self.entries):
+            if entry['op'] in ops:
+                self.states[i] = None
+
+    def move(self, position):
+        self.position = position
+        for i, entry in enumerate(self.entries):
+            if entry['op'] == 'pandas' and i != position - 1:
+                self.states[i] = None
+        self.save()
+
+
+def json_text(value):
+    # 통계용 JSON 텍스트 (orjson이 있으면 공백 없는 형식으로 빠르게)
+    if orjson is not None:
+        return orjson.dumps(value, default=json_default).decode('utf-8')
+    return to_text(value)
+
+
+def reservoir_sample(sample, seen, values, size=STATS_SAMPLE_SIZE, rng=np.random):
+    # 벡터화한 reservoir sampling: 전체에서 i번째(1부터) 값은 [0, i) 난수가 size보다 작으면 그 칸을 대체
+    fill = max(0, min(size - len(sample), len(values)))
+    sample = np.concatenate([sample, values[:fill]])
+    rest = values[fill:]
+    if len(rest):
+        positions = seen + fill + np.arange(1, len(rest) + 1)
+        slots = (rng.random(len(rest)) * positions).astype(np.int64)
+        keep = slots < size
+        sample[slots[keep]] = rest[keep]
+    return sample
+
+
+def leading_zeros(values, bits=64):
+    # uint64 배열의 선행 0 비트 수. 32비트씩 나누면 frexp 지수가 정확함
+    high = np.frexp((values >> np.uint64(32)).astype(np.float64))[1]
+    low = np.frexp((values & np.uint64(0xFFFFFFFF)).astype(np.float64))[1]
+    zeros = np.where(high > 0, 32 - high, 64 - low)
+    return np.minimum(zeros, bits)
+
+
+class HyperLogLog:
+    # 64비트 해시 상위 precision 비트로 레지스터를 고르고, 나머지 비트의 (선행 0 개수 + 1) 최댓값을 기록
+    def __init__(self, precision=STATS_HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rank = leading_zeros(hashes << np.uint64(self.precision), 64 - self.precision) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty:
+            # 값이 적을 때는 빈 레지스터 비율로 계산 (linear counting)
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+class ColumnStats:
+    # 한 컬럼의 스트리밍 통계. 배치(Series)마다 벡터 연산으로 갱신
+    # null 개수와 min/max는 정확한 값, distinct·상위 값·히스토그램·길이 분위수는 근사값
+    def __init__(self, name, nulls=0):
+        self.name = name
+        self.nulls = nulls
+        self.types = collections.Counter()
+        self.distinct = HyperLogLog()
+        self.top = collections.Counter()
+        self.minimum = None
+        self.maximum = None
+        self.numbers = np.empty(0, dtype=np.float64)
+        self.numbers_seen = 0
+        self.lengths = np.empty(0, dtype=np.int64)
+        self.lengths_seen = 0
+
+    def update(self, series):
+        missing = series.isna().to_numpy()
+        self.nulls += int(missing.sum())
+        present = series[~missing]
+        if present.empty:
+            return
+        kind = present.dtype.kind
+        if kind in 'biuf':
+            # 숫자/문자열 dtype은 원소별 타입 확인 없이 처리
+            self.types[{'b': 'bool', 'f': 'float'}.get(kind, 'int')] += len(present)
+            if kind != 'b':
+                self.add_numbers(present.to_numpy(dtype=np.float64))
+        elif isinstance(present.dtype, pd.StringDtype):
+            self.types['str'] += len(present)
+            self.add_lengths(present.str.len().to_numpy(dtype=np.int64))
+        else:
+            kinds = present.map(type_name)
+            self.types.update(kinds.value_counts().to_dict())
+            numeric = kinds.isin(('int', 'float')).to_numpy()
+            if numeric.any():
+                self.add_numbers(present[numeric].to_numpy(dtype=np.float64))
+            strings = (kinds == 'str').to_numpy()
+            if strings.any():
+                self.add_lengths(present[strings].str.len().to_numpy(dtype=np.int64))
+            nested = kinds.isin(('object', 'array')).to_numpy()
+            if nested.any():
+                # 객체/배열은 해시할 수 없으므로 JSON 텍스트로 센다
+                values = present.to_numpy(dtype=object, copy=True)
+                values[nested] = [json_text(value) for value in values[nested]]
+                present = pd.Series(values)
+        # 정수는 null이 섞여 float이 된 청크와 같은 해시가 나오도록 float으로 해시
+        hashed = present.astype(np.float64) if kind in 'iu' else present
+        self.distinct.add(pd.util.hash_pandas_object(hashed, index=False).to_numpy())
+        counts = present.value_counts().iloc[:STATS_TOP_CAPACITY]
+        self.top.update(dict(zip(counts.index.tolist(), counts.tolist())))
+        if len(self.top) > 2 * STATS_TOP_CAPACITY:
+            # 후보 수를 제한하므로 드문 값의 개수는 버려질 수 있음
+            self.top = collections.Counter(dict(self.top.most_common(STATS_TOP_CAPACITY)))
+
+    def add_numbers(self, values):
+        low, high = float(np.min(values)), float(np.max(values))
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self.numbers = reservoir_sample(self.numbers, self.numbers_seen, values)
+        self.numbers_seen += len(values)
+
+    def add_lengths(self, values):
+        self.lengths = reservoir_sample(self.lengths, self.lengths_seen, values)
+        self.lengths_seen += len(values)
+
+    def summary(self, rows):
+        present = rows - self.nulls
+        summary = {
+            'name': self.name, 'rows': rows, 'nulls': self.nulls,
+            'types': self.types.most_common(),
+            'distinct': min(self.distinct.estimate(), present),
+            'top': self.top.most_common(STATS_TOP_VALUES),
+            'min': self.minimum, 'max': self.maximum, 'histogram': None, 'lengths': None,
+        }
+        if len(self.numbers) and np.isfinite([self.minimum, self.maximum]).all():
+            counts, edges = np.histogram(self.numbers, bins=STATS_HISTOGRAM_BINS,
+                                         range=(self.minimum, self.maximum))
+            # 샘플 개수를 전체 숫자 개수 기준으로 환산
+            scale = self.numbers_seen / len(self.numbers)
+            summary['histogram'] = ((counts * scale).round().astype(np.int64).tolist(), edges.tolist())
+        if len(self.lengths):
+            summary['lengths'] = np.percentile(self.lengths, [50, 90, 99]).tolist()
+        return summary
+
+
+class DatasetStats:
+    # 파일 전체의 컬럼별 통계. 앞에서부터 행 구간을 이어 붙이며 갱신하므로 추가된 행만 더 읽으면 됨
+    def __init__(self, sidecar=None):
+        self.sidecar = sidecar
+        self.file_size = None
+        self.mtime_ns = None
+        # 저장할 때 파일 앞부분의 (바이트 수, sha1)
+        self.signature = None
+        self.rows = 0
+        self.columns = {}
+
+    @staticmethod
+    def sidecar_path(path, creds=None):
+        if creds is None and not is_dataset_path(path):
+            return path + ".stats.npz"
+        return os.path.join(CACHE_DIR, "stats", cache_key(creds, path) + ".stats.npz")
+
+    def fits(self, file_size, rows, mtime_ns=None, head=None):
+        # 캐시된 통계가 현재 파일의 앞부분에 해당하는지 (파일이 줄었거나 바뀌었으면 버림. 뒤에 추가만 된 경우는 이어서 계산)
+        # head는 현재 파일의 앞부분 바이트 (source_signature)
+        if self.rows > rows:
+            return False
+        if self.file_size is None or file_size is None:
+            return True
+        if self.file_size > file_size:
+            return False
+        if self.file_size == file_size and None not in (self.mtime_ns, mtime_ns) and self.mtime_ns != mtime_ns:
+            # 크기는 같은데 수정 시각이 다르면 같은 크기로 다시 쓴 파일
+            return False
+        if self.signature is not None and head is not None:
+            length, digest = self.signature
+            return len(head) >= length and hashlib.sha1(head[:length]).hexdigest() == digest
+        return True
+
+    def update(self, df):
+        seen = set()
+        for col in df.columns:
+            name = str(col)
+            seen.add(name)
+            if name not in self.columns:
+                # 뒤쪽에서 처음 나타난 컬럼은 앞의 행들이 모두 null
+                self.columns[name] = ColumnStats(name, nulls=self.rows)
+            self.columns[name].update(df[col])
+        for name, column in self.columns.items():
+            if name not in seen:
+                column.nulls += len(df.index)
+        self.rows += len(df.index)
+
+    def update_frame(self, frame, offset=0, progress=None, batch_rows=STATS_BATCH_ROWS):
+        # frame은 전체에서 offset 행부터의 구간. 이미 반영한 앞쪽 행은 건너뜀
+        if self.rows < offset:
+            raise ValueError(f"Rows {self.rows:,}-{offset:,} are missing from the statistics")
+        total = len(frame)
+        for start in range(self.rows - offset, total, batch_rows):
+            self.update(frame.page(start, min(start + batch_rows, total)))
+            if progress is not None:
+                progress()
+
+    def summary(self):
+        return {'rows': self.rows, 'columns': [column.summary(self.rows) for column in self.columns.values()]}
+
+    @classmethod
+    def load(cls, sidecar):
+        stats = cls(sidecar)
+        if not os.path.exists(sidecar):
+            return stats
+        try:
+            with np.load(sidecar, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                registers = data['registers']
+                for i, info in enumerate(meta['columns']):
+                    column = ColumnStats(info['name'], info['nulls'])
+                    column.types = collections.Counter(dict(info['types']))
+                    column.top = collections.Counter({value: count for value, count in info['top']})
+                    column.minimum, column.maximum = info['min'], info['max']
+                    column.distinct = HyperLogLog(registers=registers[i].copy())
+                    column.numbers, column.numbers_seen = data[f'numbers_{i}'], info['numbers_seen']
+                    column.lengths, column.lengths_seen = data[f'lengths_{i}'], info['lengths_seen']
+                    stats.columns[column.name] = column
+                stats.rows = meta['rows']
+                stats.file_size = meta['file_size']
+                stats.mtime_ns = meta['mtime_ns']
+                # 앞부분 서명이 없는 예전 캐시는 같은 파일인지 알 수 없으므로 KeyError로 버림
+                stats.signature = tuple(meta['signature']) if meta['signature'] is not None else None
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Ignoring unreadable stats {sidecar}: {e}", file=sys.stderr)
+            return cls(sidecar)
+        return stats
+
+    def save(self, file_size, mtime_ns=None, head=None):
+        if self.sidecar is None:
+            return
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.signature = (len(head), hashlib.sha1(head).hexdigest()) if head is not None else None
+        columns = list(self.columns.values())
+        meta = {'file_size': file_size, 'mtime_ns': mtime_ns, 'signature': self.signature,
+                'rows': self.rows, 'columns': [{
+            'name': column.name, 'nulls': column.nulls, 'types': column.types.most_common(),
+            'top': column.top.most_common(), 'min': column.minimum, 'max': column.maximum,
+            'numbers_seen': column.numbers_seen, 'lengths_seen': column.lengths_seen,
+        } for column in columns]}
+        arrays = {'registers': np.array([column.distinct.registers for column in columns], dtype=np.uint8)
+                  .reshape(len(columns), 1 << STATS_HLL_PRECISION)}
+        for i, column in enumerate(columns):
+            arrays[f'numbers_{i}'] = column.numbers
+            arrays[f'lengths_{i}'] = column.lengths
+        try:
+            os.makedirs(os.path.dirname(self.sidecar) or ".", exist_ok=True)
+            with open(self.sidecar, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta, default=json_default)), **arrays)
+        except OSError as e:
+            print(f"Could not save stats {self.sidecar}: {e}", file=sys.stderr)
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+def trigram_hashes(data):
+    # 3바이트 조각을 SEARCH_INDEX_BITS 비트로 해시
+    a = np.frombuffer(data, dtype=np.uint8)
+    if len(a) < 3:
+        return np.zeros(0, dtype=np.uint32)
+    a = a.astype(np.uint32)
+    grams = (a[:-2] << np.uint32(16)) | (a[1:-1] << np.uint32(8)) | a[2:]
+    return (grams * np.uint32(2654435761)) >> np.uint32(32 - SEARCH_INDEX_BITS)
+
+
+def required_literals(pattern):
+    # 정규식이 매치되려면 반드시 나와야 하는 리터럴 문자열 (최상위의 연속된 LITERAL만 사용)
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []
+    literals = []
+    run = []
+    for op, arg in parsed:
+        if op is sre_constants.LITERAL:
+            run.append(chr(arg))
+            continue
+        if op is sre_constants.BRANCH:
+            return []
+        if run:
+            literals.append(''.join(run))
+            run = []
+    if run:
+        literals.append(''.join(run))
+    return literals
+
+
+# 사전 필터용 정규화: \uXXXX(서로게이트 쌍 포함)와 \/ 이스케이프는 json.dumps(ensure_ascii=False)가 쓰는 모양으로
+# 바꾸고 (나머지 짧은 이스케이프는 이미 같은 모양), 대소문자 무시 정규식이 ASCII 글자와 같게 보는 글자는 그 글자로 바꿈
+JSON_ESCAPE = re.compile(rb'\\u([0-9a-fA-F]{4})(?:\\u([dD][c-fC-F][0-9a-fA-F]{2}))?|\\(.)', re.DOTALL)
+SEARCH_FOLDED_CHARS = [(ch.encode('utf-8'), folded)
+                       for ch, folded in (('\u0130', b'i'), ('\u0131', b'i'), ('\u017f', b's'), ('\u212a', b'k'))]
+# 값을 다시 직렬화하면(중첩 값의 구분자, 문자열 안의 이스케이프) 원본 줄과 모양이 달라지는 문자들과
+# json.dumps가 그 뒤에 넣는 공백 (문자열 안의 공백은 원본과 같음)
+SEARCH_SEPARATORS = re.compile(r'[{}\[\]:,"\\]+ *')
+# 이 문자들로만 된 조각은 숫자를 다시 쓴 모양일 수 있음 (원본 1e2 → 100.0)
+NUMBER_TEXT_CHARS = set('0123456789+-.eE')
+
+
+def canonical_escape(match):
+    high, low, short = match.groups()
+    if short is not None:
+        return b'/' if short == b'/' else match.group(0)
+    code = int(high, 16)
+    if low is not None:
+        if 0xD800 <= code < 0xDC00:
+            code = 0x10000 + ((code - 0xD800) << 10) + (int(low, 16) - 0xDC00)
+        else:
+            return canonical_escape(JSON_ESCAPE.match(match.group(0), 0, 6)) + \
+                canonical_escape(JSON_ESCAPE.match(match.group(0), 6))
+    if 0xD800 <= code < 0xE000:
+        return match.group(0)
+    return json.dumps(chr(code), ensure_ascii=False)[1:-1].encode('utf-8')
+
+
+def normalize_json_bytes(data):
+    # 원본 JSON 바이트를 디코드한 값의 텍스트와 같은 모양으로 (필요 없으면 그대로)
+    # 한 바이트 검색과 isascii가 훨씬 빠르므로 먼저 확인
+    if b'\\' in data and (b'\\u' in data or b'\\/' in data):
+        data = JSON_ESCAPE.sub(canonical_escape, data)
+    if not data.isascii():
+        for ch, folded in SEARCH_FOLDED_CHARS:
+            if ch in data:
+                data = data.replace(ch, folded)
+    return data
+
+
+def search_terms(text, ignore_case=True):
+    # text가 값의 텍스트(to_text) 안에 있으면 정규화한 원본 줄에도 반드시 있는 소문자 바이트 조각들
+    # 구분자에서 자르고 숫자처럼 보이는 조각은 뺌. 대소문자 무시일 때 비ASCII 대소문자는 원본 줄의
+    # ASCII 소문자화로 맞출 수 없으므로 그 글자에서도 자름
+    if ignore_case:
+        text = ''.join(',' if ord(ch) > 127 and ch.lower() != ch.upper() else ch for ch in text)
+    terms = []
+    for piece in SEARCH_SEPARATORS.split(text.lstrip(' ')):
+        if not piece or set(piece) <= NUMBER_TEXT_CHARS or piece.lower() in 'infinity':
+            continue
+        terms.append(json.dumps(piece, ensure_ascii=False)[1:-1].encode('utf-8').lower())
+    return terms
+
+
+def contains_terms(line, terms):
+    # 정규화 없이 다 있으면 바로 통과, 아니면 정규화한 줄에서 다시 확인
+    lowered = line.lower()
+    if all(term in lowered for term in terms):
+        return True
+    normalized = normalize_json_bytes(line)
+    if normalized is line:
+        return False
+    lowered = normalized.lower()
+    return all(term in lowered for term in terms)
+
+
+class SearchQuery:
+    def __init__(self, text, regex=False, case_sensitive=False, fields=None):
+        self.text = text
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.fields = list(fields) if fields else []
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self.pattern = re.compile(text if regex else re.escape(text), flags)
+
+    def key(self):
+        return (self.text, self.regex, self.case_sensitive, tuple(self.fields))
+
+    def literal_terms(self):
+        # 매치되는 줄을 정규화하면(normalize_json_bytes) 반드시 들어 있는 소문자 바이트 조각들
+        literals = required_literals(self.text) if self.regex else [self.text]
+        ignore_case = bool(self.pattern.flags & re.IGNORECASE)
+        return [term for literal in literals for term in search_terms(literal, ignore_case)]
+
+    def index_terms(self):
+        return [np.unique(trigram_hashes(term)) for term in self.literal_terms() if len(term) >= 3]
+
+    def prefilter_lines(self, lines):
+        # JSON 파싱 전에 리터럴이 없는 줄을 걸러냄 (디코드하면 리터럴이 나올 수 있는 줄은 남김)
+        terms = self.literal_terms()
+        if not terms:
+            return list(enumerate(lines))
+        return [(i, line) for i, line in enumerate(lines) if contains_terms(line, terms)]
+
+    def match_text(self, value):
+        return not is_missing(value) and self.pattern.search(to_text(value)) is not None
+
+    def match_record(self, record):
+        if isinstance(record, dict):
+            if self.fields:
+                values = [extract_path(record, field) for field in self.fields]
+            else:
+                values = record.values()
+        else:
+            values = [record]
+        return any(self.match_text(value) for value in values)
+
+    def match_frame(self, df):
+        # DataFrame 청크에서 매치되는 행 위치 (컬럼별로 벡터화)
+        if self.fields:
+            df = project_frame(df, self.fields)
+        mask = np.zeros(len(df.index), dtype=bool)
+        for col in df.columns:
+            series = df[col]
+            if series.isna().all():
+                # 페이지에 값이 하나도 없는 컬럼 (뒤쪽 행에만 있는 키)은 float NaN이라 .str을 쓸 수 없음
+                continue
+            if not isinstance(series.dtype, pd.StringDtype):
+                # object 컬럼에도 숫자/dict/list가 섞여 있을 수 있으므로 lazy 로딩의 match_record와 같은 텍스트로 비교
+                series = series.map(to_text, na_action='ignore').astype(object)
+            mask |= series.str.contains(self.pattern, na=False).to_numpy(dtype=bool)
+        return np.flatnonzero(mask)
+
+
+class SearchIndex:
+    # 블록(SEARCH_BLOCK_ROWS 행)마다 소문자 트라이그램 해시 비트맵을 저장. 후보 블록만 실제로 검사
+    def __init__(self, bitmaps, block_rows, file_size, mtime_ns):
+        self.bitmaps = bitmaps
+        self.block_rows = block_rows
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+
+    @staticmethod
+    def sidecar_path(path):
+        return path + ".trgm.npz"
+
+    @classmethod
+    def build(cls, frame, progress=None):
+        nblocks = (len(frame) + SEARCH_BLOCK_ROWS - 1) // SEARCH_BLOCK_ROWS
+        bitmaps = np.zeros((nblocks, (1 << SEARCH_INDEX_BITS) // 8), dtype=np.uint8)
+        bits = np.zeros(1 << SEARCH_INDEX_BITS, dtype=bool)
+        for block in range(nblocks):
+            begin, end = frame.index.byte_range(block * SEARCH_BLOCK_ROWS,
+                                                min((block + 1) * SEARCH_BLOCK_ROWS, len(frame)))
+            bits[:] = False
+            data = frame.reader.read(begin, end)
+            bits[trigram_hashes(data.lower())] = True
+            normalized = normalize_json_bytes(data)
+            if normalized is not data:
+                bits[trigram_hashes(normalized.lower())] = True
+            bitmaps[block] = np.packbits(bits)
+            if progress is not None:
+                progress(end, frame.index.file_size)
+        return cls(bitmaps, SEARCH_BLOCK_ROWS, frame.index.file_size, frame.index.mtime_ns)
+
+    @classmethod
+    def load(cls, sidecar, file_size, mtime_ns):
+        if not os.path.exists(sidecar):
+            return None
+        try:
+            with np.load(sidecar) as data:
+                meta = tuple(int(v) for v in data['meta'])
+                if meta != (file_size, mtime_ns, SEARCH_BLOCK_ROWS, SEARCH_INDEX_BITS, SEARCH_INDEX_VERSION):
+                    return None
+                size, saved_mtime_ns, block_rows = meta[:3]
+                return cls(data['bitmaps'], block_rows, size, mtime_ns)
+        except Exception as e:
+            print(f"Ignoring unreadable search index {sidecar}: {e}", file=sys.stderr)
+            return None
+
+    def save(self, sidecar):
+        try:
+            with open(sidecar, 'wb') as f:
+                np.savez(f, bitmaps=self.bitmaps,
+                         meta=np.array([self.file_size, self.mtime_ns, self.block_rows, SEARCH_INDEX_BITS,
+                                        SEARCH_INDEX_VERSION], dtype=np.int64))
+        except OSError as e:
+            print(f"Could not save search index {sidecar}: {e}", file=sys.stderr)
+
+    @classmethod
+    def load_or_build(cls, frame, progress=None):
+        sidecar = cls.sidecar_path(frame.path)
+        index = cls.load(sidecar, frame.index.file_size, frame.index.mtime_ns)
+        if index is None:
+            index = cls.build(frame, progress)
+            index.save(sidecar)
+        return index
+
+    def candidate_blocks(self, query):
+        mask = np.ones(len(self.bitmaps), dtype=bool)
+        for hashes in query.index_terms():
+            for h in hashes:
+                mask &= ((self.bitmaps[:, h >> 3] >> (7 - (h & 7))) & 1).astype(bool)
+        return np.flatnonzero(mask)
+
+
+QUERY_TOKEN = re.compile(r"""\s*(?:("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')"""
+                         r"""|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)(?![\w.\[])"""
+                         r"""|(==|!=|>=|<=|=|>|<|\(|\)|,)|`([^`]+)`|([^\s=!<>(),`'"]+))""")
+QUERY_KEYWORDS = {'select', 'where', 'order', 'by', 'asc', 'desc', 'limit', 'and', 'or', 'not',
+                  'contains', 'matches', 'in', 'is', 'null', 'true', 'false'}
+QUERY_OPERATORS = {'==': operator.eq, '=': operator.eq, '!=': operator.ne,
+                   '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+
+def tokenize_query(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = QUERY_TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Unexpected character at position {pos}: {text[pos:pos + 10]!r}")
+        string, number, op, quoted, word = match.groups()
+        if string is not None:
+            tokens.append(('value', ast.literal_eval(string)))
+        elif number is not None:
+            tokens.append(('value', ast.literal_eval(number)))
+        elif op is not None:
+            tokens.append(('op', op))
+        elif quoted is not None:
+            tokens.append(('path', quoted))
+        elif word.lower() in QUERY_KEYWORDS:
+            tokens.append(('keyword', word.lower()))
+        else:
+            tokens.append(('path', word))
+        pos = match.end()
+    return tokens
+
+
+def sort_key(value):
+    # 숫자 → 문자열 → 그 외 순서로 정렬 (타입이 섞여도 비교 가능하도록)
+    if isinstance(value, (bool, int, float, np.number)):
+        return (0, value, '')
+    if isinstance(value, str):
+        return (1, 0, value)
+    return (2, 0, to_text(value))
+
+
+class TableQuery:
+    # 제한된 쿼리 문법: [select a, b.c] [where <조건>] [order by a [asc|desc]] [limit n]
+    # 조건: path (== != > >= < <=) 값, path contains "s", path matches "re", path in (v, ...),
+    #       path is [not] null 을 and/or/not, 괄호로 조합
+    def __init__(self, text):
+        self.text = text
+        self.columns = []
+        self.predicate = None
+        self.order_by = None
+        self.descending = False
+        self.limit = None
+        # 조건/정렬에 필요한 경로 (스캔 시 이 컬럼만 읽음)
+        self.paths = []
+        # 매치되는 줄을 정규화하면 반드시 들어 있는 소문자 바이트 조각들 (JSON 파싱 전 사전 필터, search_terms)
+        self.literals = []
+        self._tokens = tokenize_query(text)
+        self._pos = 0
+        self.parse()
+        del self._tokens
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def parse_text(cls, text):
+        return cls(text)
+
+    def peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def accept(self, kind, value=None):
+        token_kind, token_value = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self._pos += 1
+            return True
+        return False
+
+    def expect(self, kind, value=None):
+        token = self.peek()
+        if not self.accept(kind, value):
+            found = token[1] if token[0] is not None else "end of query"
+            raise ValueError(f"Expected {value or kind} but found {found!r}")
+        return token[1]
+
+    def parse_path(self):
+        path = self.expect('path')
+        if path not in self.paths:
+            self.paths.append(path)
+        return path
+
+    def parse(self):
+        if self.accept('keyword', 'select'):
+            self.columns.append(self.expect('path'))
+            while self.accept('op', ','):
+                self.columns.append(self.expect('path'))
+        if self.accept('keyword', 'where'):
+            self.predicate, self.literals = self.parse_or()
+        if self.accept('keyword', 'order'):
+            self.expect('keyword', 'by')
+            self.order_by = self.parse_path()
+            if self.accept('keyword', 'desc'):
+                self.descending = True
+            else:
+                self.accept('keyword', 'asc')
+        if self.accept('keyword', 'limit'):
+            limit = self.expect('value')
+            if not isinstance(limit, int) or limit < 0:
+                raise ValueError("limit must be a non-negative integer")
+            self.limit = limit
+        if self.peek()[0] is not None:
+            raise ValueError(f"Unexpected {self.peek()[1]!r} in query")
+
+    def parse_or(self):
+        branches = [self.parse_and()]
+        while self.accept('keyword', 'or'):
+            branches.append(self.parse_and())
+        if len(branches) == 1:
+            return branches[0]
+        tests = [test for test, _ in branches]
+        return (lambda record: any(test(record) for test in tests)), []
+
+    def parse_and(self):
+        parts = [self.parse_not()]
+        while self.accept('keyword', 'and'):
+            parts.append(self.parse_not())
+        if len(parts) == 1:
+            return parts[0]
+        tests = [test for test, _ in parts]
+        return (lambda record: all(test(record) for test in tests)), [lit for _, lits in parts for lit in lits]
+
+    def parse_not(self):
+        if self.accept('keyword', 'not'):
+            test, _ = self.parse_not()
+            return (lambda record: not test(record)), []
+        if self.accept('op', '('):
+            result = self.parse_or()
+            self.expect('op', ')')
+            return result
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        path = self.parse_path()
+        if self.accept('keyword', 'is'):
+            negate = self.accept('keyword', 'not')
+            self.expect('keyword', 'null')
+            return (lambda record: is_missing(extract_path(record, path)) != negate), []
+        if self.accept('keyword', 'contains'):
+            needle = self.expect('value')
+            if not isinstance(needle, str):
+                raise ValueError("contains needs a string")
+
+            def test(record):
+                value = extract_path(record, path)
+                return not is_missing(value) and needle in to_text(value)
+            return test, search_terms(needle, ignore_case=False)
+        if self.accept('keyword', 'matches'):
+            pattern = re.compile(self.expect('value'))
+
+            def test(record):
+                value = extract_path(record, path)
+                return not is_missing(value) and pattern.search(to_text(value)) is not None
+            return test, []
+        if self.accept('keyword', 'in'):
+            self.expect('op', '(')
+            values = [self.parse_value()]
+            while self.accept('op', ','):
+                values.append(self.parse_value())
+            self.expect('op', ')')
+
+            def test(record):
+                value = extract_path(record, path)
+                return not is_missing(value) and any(value == v for v in values)
+            return test, []
+        op = self.expect('op')
+        if op not in QUERY_OPERATORS:
+            raise ValueError(f"Unknown operator {op!r}")
+        compare = QUERY_OPERATORS[op]
+        expected = self.parse_value()
+
+        def test(record):
+            value = extract_path(record, path)
+            if is_missing(value):
+                value = None
+            try:
+                return bool(compare(value, expected))
+            except TypeError:
+                return False
+        if compare is not operator.eq or not isinstance(expected, str):
+            return test, []
+        return test, search_terms(expected, ignore_case=False)
+
+    def parse_value(self):
+        if self.accept('keyword', 'null'):
+            return None
+        if self.accept('keyword', 'true'):
+            return True
+        if self.accept('keyword', 'false'):
+            return False
+        return self.expect('value')
+
+    def match(self, record):
+        return self.predicate is None or self.predicate(record)
+
+    def match_records(self, records, start_row):
+        rows = []
+        keys = []
+        for i, record in enumerate(records):
+            if self.match(record):
+                rows.append(start_row + i)
+                if self.order_by is not None:
+                    keys.append(extract_path(record, self.order_by))
+        return rows, keys
+
+    def match_lines(self, lines, start_row):
+        # 리터럴이 없는 줄은 JSON 파싱 없이 건너뜀
+        rows = []
+        keys = []
+        for i, line in enumerate(lines):
+            if self.literals and not contains_terms(line, self.literals):
+                continue
+            record = json_loads(line)
+            if self.match(record):
+                rows.append(start_row + i)
+                if self.order_by is not None:
+                    keys.append(extract_path(record, self.order_by))
+        return rows, keys
+
+
+def query_byte_range(path, begin, end, start_row, text):
+    # 프로세스 풀에서 실행됨. 매치된 행 번호와 정렬 키만 돌려보냄
+    with open(path, 'rb') as f:
+        f.seek(begin)
+        data = f.read(end - begin)
+    return TableQuery.parse_text(text).match_lines(split_lines(data), start_row)
+
+
+def iter_query_parts(frame, query):
+    # (매치된 행 번호, 정렬 키, 스캔한 행 수)를 파일 순서대로 반환
+    if isinstance(frame, ShardedFrame):
+        yield from iter_shard_query_parts(frame, query)
+        return
+    total = len(frame)
+    if isinstance(frame, LazyJSONLFrame) and isinstance(frame.reader, MmapReader) \
+            and frame.index.file_size >= PARALLEL_PARSE_THRESHOLD:
+        bounds = [(start, min(start + QUERY_CHUNK_ROWS, total)) for start in range(0, total, QUERY_CHUNK_ROWS)]
+        futures = [parse_pool().submit(query_byte_range, frame.path, *frame.index.byte_range(start, stop),
+                                       start, query.text)
+                   for start, stop in bounds]
+        try:
+            for (start, stop), future in zip(bounds, futures):
+                rows, keys = future.result()
+                yield rows, keys, stop
+        finally:
+            for future in futures:
+                future.cancel()
+        return
+    for start in range(0, total, QUERY_SCAN_ROWS):
+        stop = min(start + QUERY_SCAN_ROWS, total)
+        if isinstance(frame, LazyJSONLFrame):
+            rows, keys = query.match_lines(frame.read_lines(start, stop), start)
+        else:
+            rows, keys = query.match_records(frame.scan_records(start, stop, query.paths), start)
+        yield rows, keys, stop
+
+
+def iter_shard_query_parts(frame, query):
+    # shard 순서대로 행 번호를 전역 번호로 바꿔서 반환
+    # 로컬 비압축 shard는 인덱스를 열지 않고 파일 전체를 프로세스 풀에 넘기고, 결과는 순서대로 받음
+    pending = collections.deque()
+    try:
+        for i, path in enumerate(frame.shards):
+            offset = int(frame.offsets[i])
+            count = int(frame.counts[i])
+            if not count:
+                continue
+            if frame.creds is None and not compression_of(path) and PARSE_WORKERS > 1 \
+                    and frame.sizes[i] < PARALLEL_PARSE_THRESHOLD:
+                future = parse_pool().submit(query_byte_range, path, 0, frame.sizes[i], offset, query.text)
+                pending.append((future, offset + count))
+                if len(pending) >= PARSE_WORKERS * 2:
+                    future, done = pending.popleft()
+                    yield (*future.result(), done)
+                continue
+            while pending:
+                future, done = pending.popleft()
+                yield (*future.result(), done)
+            # 큰 shard는 shard 안에서 나눠서 처리
+            for rows, keys, done in iter_query_parts(frame.shard(i), query):
+                yield [offset + row for row in rows], keys, offset + done
+        while pending:
+            future, done = pending.popleft()
+            yield (*future.result(), done)
+    finally:
+        for future, _ in pending:
+            future.cancel()
+
+
+def run_query(frame, query, progress=None):
+    # 프레임 전체를 스캔해서 조건에 맞는 행 번호를 정렬/limit 적용 후 반환 (결과 행 번호만 메모리에 남김)
+    rows = []
+    keys = []
+    for part_rows, part_keys, done in iter_query_parts(frame, query):
+        rows.extend(part_rows)
+        keys.extend(part_keys)
+        if progress is not None:
+            progress(done, len(frame))
+        if query.order_by is None and query.limit is not None and len(rows) >= query.limit:
+            break
+    if query.order_by is not None:
+        present = [i for i, key in enumerate(keys) if not is_missing(key)]
+        missing = [i for i, key in enumerate(keys) if is_missing(key)]
+        if query.limit is not None and query.limit < len(present):
+            pick = heapq.nlargest if query.descending else heapq.nsmallest
+            present = pick(query.limit, present, key=lambda i: sort_key(keys[i]))
+        else:
+            present.sort(key=lambda i: sort_key(keys[i]), reverse=query.descending)
+        # 값이 없는 행은 방향과 상관없이 뒤로
+        rows = [rows[i] for i in present + missing]
+    if query.limit is not None:
+        rows = rows[:query.limit]
+    return np.asarray(rows, dtype=np.int64)
+
+
+def iter_matching_lines(line_batches, query):
+    # 줄 묶음 스트림에서 조건에 맞는 줄을 결과 순서대로 반환
+    # order by가 있으면 정렬 때문에 매치된 줄을 모아야 하지만 limit이 있으면 상위 limit개만 유지
+    start = 0
+    present = []
+    missing = []
+    emitted = 0
+    pick = heapq.nlargest if query.descending else heapq.nsmallest
+    for lines in line_batches:
+        rows, keys = query.match_lines(lines, start)
+        if query.order_by is None:
+            for row in rows:
+                yield lines[row - start]
+                emitted += 1
+                if query.limit is not None and emitted >= query.limit:
+                    return
+        else:
+            for row, key in zip(rows, keys):
+                (missing if is_missing(key) else present).append((key, row, lines[row - start]))
+            if query.limit is not None:
+                if len(present) > 2 * query.limit:
+                    present = pick(query.limit, present, key=lambda item: sort_key(item[0]))
+                del missing[query.limit:]
+        start += len(lines)
+    if query.order_by is None:
+        return
+    if query.limit is not None and query.limit < len(present):
+        present = pick(query.limit, present, key=lambda item: sort_key(item[0]))
+    else:
+        present.sort(key=lambda item: sort_key(item[0]), reverse=query.descending)
+    # 값이 없는 행은 방향과 상관없이 뒤로
+    matches = present + missing
+    if query.limit is not None:
+        matches = matches[:query.limit]
+    for _, _, line in matches:
+        yield line
+
+
+def iter_raw_chunks(path, creds=None):
+    # 로컬 또는 원격(SFTP) 파일의 원본 바이트 청크
+    if creds is None:
+        with open(path, 'rb') as f:
+            yield from iter_file_chunks(f)
+        return
+    sftp = ssh_pool.sftp(creds)
+    with sftp.open(path, 'rb') as remote_file:
+        yield from iter_sftp_chunks(remote_file, 0, remote_file.stat().st_size)
+
+
+def source_entries(path, creds=None):
+    # 단일 파일이면 [(path, 크기, mtime_ns)], 디렉터리/glob이면 shard들 (이름 순)
+    if creds is None:
+        if not is_dataset_path(path):
+            stat = os.stat(path)
+            return [(path, stat.st_size, stat.st_mtime_ns)]
+        sftp = None
+    else:
+        sftp = ssh_pool.sftp(creds)
+        if not GLOB_CHARS.search(path):
+            stat = sftp.stat(path)
+            if not stat_module.S_ISDIR(stat.st_mode or 0):
+                return [(path, stat.st_size, int(stat.st_mtime) * 10 ** 9)]
+    shards = list_shards(path, sftp)
+    if not shards:
+        raise FileNotFoundError(f"No JSONL files found for {path}")
+    return shards
+
+
+def source_signature(path, creds=None):
+    # (mtime_ns, 앞부분 바이트). 데이터셋은 가장 최근 mtime과 첫 shard의 앞부분
+    entries = source_entries(path, creds)
+    with open_source_file(entries[0][0], creds) as f:
+        head = f.read(min(entries[0][1], STATS_SIGNATURE_BYTES))
+    return max(mtime_ns for _, _, mtime_ns in entries), head
+
+
+def source_files(path, creds=None):
+    return [source for source, _, _ in source_entries(path, creds)]
+
+
+def iter_source_lines(path, creds=None, batch_bytes=LOAD_CHUNK_BYTES):
+    # 파일을 처음부터 읽으며 줄 목록을 묶음 단위로 반환 (메모리에는 묶음 하나만 있음). 압축 파일은 풀면서 읽음
+    # 여러 shard로 된 데이터셋은 shard들을 이어서 읽음
+    for source in source_files(path, creds):
+        chunks = iter_raw_chunks(source, creds)
+        kind = compression_of(source)
+        if kind:
+            chunks = iter_decompressed(chunks, kind)
+        for lines, _ in iter_line_batches(chunks, batch_bytes):
+            if lines:
+                yield lines
+
+
+def sample_lines(line_batches, size, seed=None, rng=None):
+    # reservoir sampling으로 고른 size개의 (행 번호, 줄)을 파일 순서대로 반환 (메모리는 size개 분량)
+    # 전역 난수 상태는 건드리지 않음
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    rows = np.empty(0, dtype=np.int64)
+    chosen = {}
+    seen = 0
+    for lines in line_batches:
+        rows = reservoir_sample(rows, seen, np.arange(seen, seen + len(lines)), size, rng)
+        for row in rows[rows >= seen].tolist():
+            chosen[row] = lines[row - seen]
+        if len(chosen) > len(rows):
+            kept = set(rows.tolist())
+            chosen = {row: line for row, line in chosen.items() if row in kept}
+        seen += len(lines)
+    return sorted(chosen.items())
+
+
+def open_source_file(path, creds=None):
+    if creds is None:
+        return open(path, 'rb')
+    return ssh_pool.sftp(creds).open(path, 'rb')
+
+
+def read_ranges(f, ranges):
+    # [(시작, 길이)] 구간들을 읽음. SFTP 파일은 readv로 한 번에 요청해서 왕복 지연을 한 번만 기다림
+    if hasattr(f, 'readv'):
+        return list(f.readv(ranges))
+    result = []
+    for begin, size in ranges:
+        f.seek(begin)
+        result.append(f.read(size))
+    return result
+
+
+def iter_growing_ranges(begin, end, reverse=False):
+    # 앞에서(또는 뒤에서)부터 PREVIEW_BLOCK_BYTES, 그 두 배, ... 씩 (REMOTE_READ_WINDOW까지) 나눈 구간
+    block = PREVIEW_BLOCK_BYTES
+    while begin < end:
+        if reverse:
+            yield max(begin, end - block), end
+            end = max(begin, end - block)
+        else:
+            yield begin, min(end, begin + block)
+            begin = min(end, begin + block)
+        block = min(block * 2, REMOTE_READ_WINDOW)
+
+
+def iter_source_batches(sources, creds=None, progress=None):
+    # (경로, 크기, mtime_ns) 파일들을 이어서 줄 묶음으로 읽음. 진행률은 원본(압축) 바이트 기준
+    total = sum(size for _, size, _ in sources)
+    done = 0
+    for source, size, _ in sources:
+        with open_source_file(source, creds) as f:
+            chunks = iter_sftp_chunks(f, 0, size) if creds is not None else iter_file_chunks(f)
+            kind = compression_of(source)
+            stream = DecompressStream(kind) if kind else None
+            if kind:
+                chunks = iter_decompressed(chunks, kind, stream)
+            position = 0
+            for lines, nbytes in iter_line_batches(chunks):
+                position = stream.cpos if kind else position + nbytes
+                if progress is not None:
+                    progress(done + position, total)
+                if lines:
+                    yield lines
+        done += size
+
+
+def head_file_lines(source, size, count, creds=None):
+    with open_source_file(source, creds) as f:
+        chunks = (read_ranges(f, [(begin, end - begin)])[0] for begin, end in iter_growing_ranges(0, size))
+        kind = compression_of(source)
+        if kind:
+            chunks = iter_decompressed(chunks, kind)
+        lines = []
+        for batch, _ in iter_line_batches(chunks, PREVIEW_BLOCK_BYTES):
+            lines.extend(batch[:count - len(lines)])
+            if len(lines) >= count:
+                break
+        return lines
+
+
+def tail_file_lines(entry, count, creds=None, progress=None):
+    source, size, _ = entry
+    if compression_of(source):
+        # 압축 파일은 뒤에서부터 풀 수 없으므로 끝까지 풀면서 마지막 count줄만 유지
+        last = collections.deque(maxlen=count)
+        for lines in iter_source_batches([entry], creds, progress):
+            last.extend(lines)
+        return list(last)
+    # 끝에서부터 거꾸로 읽어 개행이 count개보다 많아지면 멈춤
+    blocks = []
+    newlines = 0
+    begin = size
+    with open_source_file(source, creds) as f:
+        for begin, end in iter_growing_ranges(0, size, reverse=True):
+            block = read_ranges(f, [(begin, end - begin)])[0]
+            blocks.append(block)
+            newlines += block.count(b'\n')
+            if newlines > count:
+                break
+    data = b''.join(reversed(blocks))
+    if begin > 0:
+        # 맨 앞은 잘린 줄
+        data = data[data.index(b'\n') + 1:]
+    return split_lines(data)[-count:] if count else []
+
+
+def probe_file_lines(f, size, offsets):
+    # 각 바이트 위치가 속한 줄의 (줄 시작 위치, 줄)을 offsets 순서대로 (개행 문자는 앞 줄에 속함)
+    # 줄이 읽은 구간보다 길면 해당 위치만 구간을 두 배로 넓혀 다시 읽음
+    found = {}
+    pending = sorted(set(offsets))
+    half = PREVIEW_PROBE_BYTES // 2
+    while pending:
+        ranges = [(max(0, offset - half), min(size, offset + half) - max(0, offset - half)) for offset in pending]
+        retry = []
+        for offset, (begin, length), data in zip(pending, ranges, read_ranges(f, ranges)):
+            at = offset - begin
+            start = data.rfind(b'\n', 0, at) + 1
+            end = data.find(b'\n', at)
+            if (start == 0 and begin > 0) or (end < 0 and begin + length < size):
+                retry.append(offset)
+                continue
+            found[offset] = (begin + start, data[start:end if end >= 0 else len(data)])
+        pending = retry
+        half *= 2
+    return [found[offset] for offset in offsets]
+
+
+def indexed_random_lines(entry, count, rng, creds=None):
+    # 이미 만든 줄 인덱스가 있으면 행 번호를 균등하게 뽑아 그 줄들만 읽음. 없으면 None
+    source, size, mtime_ns = entry
+    sidecar = LineIndex.sidecar_path(source) if creds is None else LineIndex.remote_sidecar_path(creds, source)
+    index = LineIndex.load(sidecar, size, mtime_ns)
+    if index is None or not len(index):
+        return None
+    rows = np.sort(rng.choice(len(index), min(count, len(index)), replace=False))
+    ranges = []
+    for row in rows.tolist():
+        begin, end = index.byte_range(row, row + 1)
+        ranges.append((begin, end - begin))
+    with open_source_file(source, creds) as f:
+        return [line for data in read_ranges(f, ranges) for line in split_lines(data)]
+
+
+def probe_random_lines(sources, count, rng, creds=None, progress=None):
+    # 전체(shard들을 이어 붙인) 바이트 범위에서 위치를 뽑으면 줄은 길이에 비례해서 뽑히므로
+    # (가장 짧은 줄 길이 / 그 줄 길이)의 확률로만 받아들임 (rejection sampling). 받아들인 줄은 균등한 샘플
+    # 받아들인 줄이 count개가 될 때까지 위치를 더 뽑고, PREVIEW_PROBE_ROUNDS번 안에 모자라면 None
+    sizes = np.array([size for _, size, _ in sources], dtype=np.int64)
+    ends = np.cumsum(sizes)
+    batch = count * PREVIEW_OVERSAMPLE
+    lines = {}
+    keys = []
+    lengths = []
+    draws = []
+    for round_ in range(PREVIEW_PROBE_ROUNDS):
+        offsets = rng.integers(0, ends[-1], batch, dtype=np.int64)
+        uniforms = rng.random(batch)
+        shard_of = np.searchsorted(ends, offsets, side='right')
+        found = [None] * batch
+        for i in np.unique(shard_of).tolist():
+            source, size, _ = sources[i]
+            picks = np.flatnonzero(shard_of == i)
+            with open_source_file(source, creds) as f:
+                probed = probe_file_lines(f, size, (offsets[picks] - (ends[i] - size)).tolist())
+            for j, (start, line) in zip(picks.tolist(), probed):
+                found[j] = (i, start, line)
+        for j, (i, start, line) in enumerate(found):
+            if not line.strip():
+                continue
+            lines[(i, start)] = line
+            keys.append((i, start))
+            lengths.append(len(line) + 1)
+            draws.append(uniforms[j])
+        if progress is not None:
+            progress(int(ends[-1]) * (round_ + 1) // PREVIEW_PROBE_ROUNDS, int(ends[-1]))
+        if not keys:
+            continue
+        # 기준 길이가 줄어들면 전에 받아들인 줄도 다시 판정 (각 뽑기의 난수는 그대로)
+        weight = np.array(lengths)
+        accepted = np.array(draws) < weight.min() / weight
+        # 받아들인 뽑기는 서로 독립인 균등 샘플이므로 뽑힌 순서대로 처음 나온 count개의 서로 다른 줄을 씀
+        chosen = list(dict.fromkeys(key for key, ok in zip(keys, accepted.tolist()) if ok))[:count]
+        if len(chosen) == count:
+            return [lines[key] for key in sorted(chosen)]
+    return None
+
+
+def preview_lines(path, creds=None, mode='head', count=PREVIEW_ROWS, seed=None, progress=None):
+    # 파일(또는 shard들)의 앞/뒤/임의 count줄을 파일 순서대로 반환
+    # 임의 샘플: 줄 인덱스가 있으면 정확히 균등, 압축 파일이나 작은 파일은 한 번 읽으며 reservoir sampling,
+    # 그 밖에는 바이트 위치를 뽑아 구간만 읽고 rejection sampling (원격도 readv 몇 번이면 끝남)
+    if mode not in PREVIEW_MODES:
+        raise ValueError(f"Unknown preview mode: {mode}")
+    sources = source_entries(path, creds)
+    lines = []
+    if mode == 'head':
+        for source, size, _ in sources:
+            lines += head_file_lines(source, size, count - len(lines), creds)
+            if len(lines) >= count:
+                break
+        return lines
+    if mode == 'tail':
+        for entry in reversed(sources):
+            lines = tail_file_lines(entry, count - len(lines), creds, progress) + lines
+            if len(lines) >= count:
+                break
+        return lines
+    rng = np.random.default_rng(seed)
+    if len(sources) == 1 and not compression_of(sources[0][0]):
+        lines = indexed_random_lines(sources[0], count, rng, creds)
+        if lines is not None:
+            return lines
+    total = sum(size for _, size, _ in sources)
+    if any(compression_of(source) for source, _, _ in sources) or \
+            total <= count * PREVIEW_OVERSAMPLE * PREVIEW_PROBE_BYTES:
+        return [line for _, line in sample_lines(iter_source_batches(sources, creds, progress), count, rng=rng)]
+    lines = probe_random_lines(sources, count, rng, creds, progress)
+    if lines is None:
+        # 줄 길이 차이가 너무 커서 받아들인 줄이 모자라면 한 번 읽으며 reservoir sampling
+        lines = [line for _, line in sample_lines(iter_source_batches(sources, creds, progress), count, rng=rng)]
+    return lines
+
+
+def project_record(record, paths):
+    return {path: extract_path(record, path) for path in paths}
+
+
+def frame_records(df):
+    # DataFrame 행을 레코드로 (NaN/NA는 null)
+    columns = [str(col) for col in df.columns]
+    return [{col: None if is_missing(value) else value for col, value in zip(columns, row)}
+            for row in df.itertuples(index=False, name=None)]
+
+
+def iter_view_records(frame, rows=None, batch_rows=EXPORT_BATCH_ROWS):
+    # 프레임 전체(또는 rows 행들)를 batch_rows 행씩 (레코드 목록, 끝난 행 수, 전체 행 수)로 반환
+    # 전체 행 수는 시작할 때 고정 (follow 모드로 늘어난 행은 포함하지 않음)
+    total = len(frame) if rows is None else len(rows)
+    for start in range(0, total, batch_rows):
+        stop = min(start + batch_rows, total)
+        records = frame.page_records(start, stop) if rows is None else frame.take_records(rows[start:stop])
+        yield records, stop, total
+
+
+def export_view(frame, writer, rows=None, progress=None):
+    for records, done, total in iter_view_records(frame, rows):
+        writer.write_records(records)
+        if progress is not None:
+            progress(done, total)
+    writer.close()
+
+
+def nested_as_text(df):
+    # CSV/Parquet에는 객체/배열 값을 JSON 텍스트로 저장 (배치마다 구조가 달라도 같은 컬럼 타입 유지)
+    data = {}
+    for col in df.columns:
+        series = df[col]
+        # infer_dtype로 문자열/숫자만 있는 컬럼은 원소를 확인하지 않고 넘어감
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'mixed' \
+                and series.map(lambda value: isinstance(value, (dict, list, np.ndarray))).any():
+            series = series.map(lambda value: json_text(value) if isinstance(value, (dict, list, np.ndarray)) else value)
+        data[col] = series
+    return pd.DataFrame(data, index=df.index, columns=df.columns)
+
+
+EXPORT_FORMATS = {'.jsonl': 'jsonl', '.json': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv',
+                  '.parquet': 'parquet', '.pq': 'parquet'}
+
+
+def export_format(path):
+    return EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+class JSONLWriter:
+    # 원본 줄, 레코드, DataFrame 배치를 한 줄에 하나씩 JSON으로 이어 씀
+    def __init__(self, f, columns=None):
+        self.f = f
+        self.columns = list(columns) if columns is not None else None
+
+    def write_lines(self, lines):
+        self.f.write(b''.join(line + b'\n' for line in lines))
+
+    def write_records(self, records):
+        if self.columns is not None:
+            records = [project_record(record, self.columns) for record in records]
+        self.write_lines([json_text(record).encode('utf-8') for record in records])
+
+    def write_frame(self, df):
+        self.write_lines([json_text(record).encode('utf-8') for record in frame_records(df)])
+
+    def close(self):
+        self.f.flush()
+
+
+class CSVWriter:
+    # 헤더는 첫 배치(또는 지정한 컬럼)로 고정. 뒤에서 처음 나타난 컬럼은 쓰지 않음
+    def __init__(self, f, columns=None):
+        self.f = f
+        self.columns = list(columns) if columns is not None else None
+        self.header = True
+
+    def write_records(self, records):
+        if self.columns is not None:
+            records = [project_record(record, self.columns) for record in records]
+        # object dtype로 만들어 null이 섞인 정수 컬럼이 float로 바뀌지 않게 함
+        self.write_frame(pd.DataFrame(records, columns=self.columns, dtype=object))
+
+    def write_frame(self, df):
+        if self.columns is None:
+            self.columns = [str(col) for col in df.columns]
+        df = nested_as_text(df.rename(columns=str).reindex(columns=self.columns))
+        df.to_csv(self.f, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.f.flush()
+
+
+class ParquetWriter:
+    # 첫 배치의 타입으로 스키마를 정하고 배치마다 row group으로 이어 씀
+    def __init__(self, path, columns=None):
+        if pq is None:
+            raise ImportError("pyarrow is required for Parquet export")
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.schema = None
+        self.writer = None
+
+    def write_records(self, records):
+        if self.columns is not None:
+            records = [project_record(record, self.columns) for record in records]
+        # object dtype로 만들어 null이 섞인 정수 컬럼이 float로 바뀌지 않게 함
+        self.write_frame(pd.DataFrame(records, columns=self.columns, dtype=object))
+
+    def write_frame(self, df):
+        df = df.rename(columns=str)
+        if self.columns is not None:
+            df = df.reindex(columns=self.columns)
+        df = nested_as_text(df)
+        if self.writer is None:
+            table = ArrowFrame.table_from_pandas(df)
+            # 첫 배치에서 모두 null인 컬럼은 문자열로 저장
+            self.schema = pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                                     for field in table.schema])
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+            table = table.cast(self.schema)
+        else:
+            table = self.conform(df.reindex(columns=self.schema.names))
+        self.writer.write_table(table)
+
+    def conform(self, df):
+        arrays = []
+        for field in self.schema:
+            try:
+                arrays.append(pa.array(df[field.name], type=field.type, from_pandas=True))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                if not pa.types.is_string(field.type):
+                    raise ValueError(f"Column '{field.name}' no longer fits its type {field.type} "
+                                     f"inferred from the first rows: {e}")
+                arrays.append(pa.array([to_text(value) for value in df[field.name]], type=pa.string()))
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def close(self):
+        if self.writer is None:
+            # 빈 결과도 읽을 수 있는 파일로 남김
+            self.writer = pq.ParquetWriter(self.path, pa.schema([pa.field(col, pa.string())
+                                                                 for col in self.columns or []]))
+        self.writer.close()
+
+
+def open_writer(path, fmt, columns=None):
+    # (writer, 닫을 파일) 반환. path가 None이면 표준 출력
+    if fmt == 'parquet':
+        if path is None:
+            raise ValueError("Parquet export needs an output file")
+        return ParquetWriter(path, columns), None
+    if fmt == 'csv':
+        f = open(path, 'w', encoding='utf-8', newline='') if path is not None else sys.stdout
+        return CSVWriter(f, columns), f if path is not None else None
+    if fmt == 'jsonl':
+        f = open(path, 'wb') if path is not None else sys.stdout.buffer
+        return JSONLWriter(f, columns), f if path is not None else None
+    raise ValueError(f"Unknown export format: {fmt}")
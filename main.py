@@ -1,26 +1,792 @@
+# 시작 시간 측정 기준점 (--startup-probe)
+import time
+STARTUP_TIME = time.perf_counter()
+
 import sys
 import os
-import pandas as pd
-import paramiko
+import io
+import re
+import json
+import collections
+import itertools
+import contextlib
+import importlib
+import importlib.util
+import stat as stat_module
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
     QFileDialog, QLabel, QComboBox, QListWidget, QListWidgetItem,
     QTextEdit, QMessageBox, QTableView, QAbstractItemView, QDialog,
-    QLineEdit, QFormLayout, QGroupBox, QMenu
+    QLineEdit, QFormLayout, QGroupBox, QMenu, QCheckBox, QProgressBar,
+    QSpinBox, QSplitter, QTableWidget, QTableWidgetItem, QShortcut
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QVariant, QSize, QPoint, QModelIndex, QObject,
+    QThread, QMetaObject, QTimer, QFileSystemWatcher, pyqtSignal, pyqtSlot, QT_VERSION_STR
 )
-from PyQt5.QtCore import Qt, QAbstractTableModel, QVariant, QSize, QPoint
-from PyQt5.QtGui import QTextDocument, QColor, QClipboard
+from PyQt5.QtGui import QTextDocument, QColor, QClipboard, QKeySequence, QFontDatabase
 from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle
 
 
+
+class LazyModule(object):
+    # 첫 속성 접근 때 모듈을 import (창을 먼저 띄우고 pandas/numpy/jsonl_core는 나중에 로드)
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+
+    def __getattr__(self, attr):
+        value = getattr(importlib.import_module(self._name), attr)
+        # 모듈 수준 이름만 캐시 (pa처럼 나중에 바뀌지 않는 값들)
+        self.__dict__[attr] = value
+        return value
+
+
+core = LazyModule('jsonl_core')
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+
+def ssh_auth_errors():
+    # paramiko는 원격 파일을 열 때 jsonl_core가 처음 import하므로, 아직 없으면 SSH 예외도 있을 수 없음
+    paramiko = sys.modules.get('paramiko')
+    return (paramiko.AuthenticationException,) if paramiko is not None else ()
+
+
+def ssh_errors():
+    paramiko = sys.modules.get('paramiko')
+    return (paramiko.SSHException, EOFError) if paramiko is not None else (EOFError,)
+
+
+# 이 크기 이상의 로컬 파일은 체크박스와 상관없이 인덱스 기반(lazy) 로딩을 사용
+LAZY_LOAD_THRESHOLD = 1024 * 1024 * 1024
+# 연속 스크롤 모드에서 한 번에 가져오는 행 수와 메모리에 유지하는 블록 수
+VIRTUAL_BLOCK_ROWS = 200
+VIRTUAL_CACHE_BLOCKS = 50
+# 블록을 읽는 동안 셀에 표시할 문자열
+VIRTUAL_PLACEHOLDER = "…"
+# 셀에 표시할 최대 글자 수 (전체 값은 상세 보기 창에 표시) 와 셀 레이아웃 캐시 크기
+MAX_CELL_CHARS = 2000
+LAYOUT_CACHE_SIZE = 2000
+# follow 모드: 로컬은 파일 변경 알림 + 보조 폴링, 원격은 주기적으로 stat
+FOLLOW_LOCAL_POLL_MS = 2000
+FOLLOW_REMOTE_POLL_MS = 2000
+# DataFrame으로 읽은 파일은 새 행을 이 간격보다 자주 original_df에 합치지 않음 (합칠 때마다 전체를 복사)
+FOLLOW_MERGE_INTERVAL_MS = 1000
+# 파일이 교체(rotation)되었는지 앞부분 바이트로 확인
+FOLLOW_SIGNATURE_BYTES = 4096
+# 창을 띄우기 전에 로드되면 안 되는 모듈 (--startup-probe 출력의 preloaded로 확인)
+STARTUP_HEAVY_MODULES = ('numpy', 'pandas', 'paramiko', 'pyarrow', 'jsonl_core')
+# 미리보기 선택지 (모드는 jsonl_core.PREVIEW_MODES) 와 불러온 뒤의 상태 표시
+PREVIEW_CHOICES = [("Whole file", None), ("First N rows", 'head'), ("Last N rows", 'tail'),
+                   ("Random N rows", 'random')]
+PREVIEW_STATUS = {'head': "Preview: first {:,} rows", 'tail': "Preview: last {:,} rows",
+                  'random': "Preview: random sample of {:,} rows"}
+# 디버그 오버레이 (Ctrl+Shift+D 또는 환경 변수 JSONL_VIEWER_DEBUG=1) 갱신 주기와 보고서에 적을 모듈 버전
+DEBUG_OVERLAY_REFRESH_MS = 500
+DEBUG_REPORT_MODULES = ('pandas', 'numpy', 'pyarrow', 'orjson', 'paramiko', 'zstandard')
+
+
+def peak_rss():
+    # 프로세스의 최대 메모리 사용량 (바이트). resource 모듈이 없는 플랫폼에서는 None
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_seconds(seconds):
+    if seconds < 0.001:
+        return f"{seconds * 1000000:.0f} µs"
+    return f"{seconds * 1000:.1f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+
+class PerfMonitor(object):
+    # 연산별 소요 시간 (마지막 값, 횟수, 합계, 최대). 디버그 오버레이와 벤치마크가 읽음
+    def __init__(self):
+        self.timings = collections.OrderedDict()
+        self._started = {}
+
+    def record(self, name, seconds):
+        entry = self.timings.get(name)
+        if entry is None:
+            entry = self.timings[name] = {'last': 0.0, 'count': 0, 'total': 0.0, 'max': 0.0}
+        entry['last'] = seconds
+        entry['count'] += 1
+        entry['total'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def start(self, name):
+        # 워커 스레드에서 끝나는 연산은 시작 시각을 기억했다가 finished 핸들러에서 stop
+        self._started[name] = time.perf_counter()
+
+    def stop(self, name, record=True):
+        # 취소되거나 실패한 연산은 record=False로 버림
+        start = self._started.pop(name, None)
+        if start is not None and record:
+            self.record(name, time.perf_counter() - start)
+
+    def reset(self):
+        self.timings.clear()
+
+    def summary(self):
+        parts = []
+        for name, entry in self.timings.items():
+            text = f"{name} {format_seconds(entry['last'])}"
+            if entry['count'] > 1:
+                text += (f" (avg {format_seconds(entry['total'] / entry['count'])},"
+                         f" max {format_seconds(entry['max'])}, n={entry['count']:,})")
+            parts.append(text)
+        peak = peak_rss()
+        parts.append(f"peak RSS {peak / (1024 * 1024):,.0f} MB" if peak is not None else "peak RSS n/a")
+        return " | ".join(parts)
+
+
+class ImportWorker(QObject):
+    # 창을 띄운 뒤 별도 QThread에서 데이터 관련 모듈을 import
+    ready = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            importlib.import_module('jsonl_core')
+            pandas = importlib.import_module('pandas')
+            # 뷰어의 여러 핸들러가 같은 DataFrame을 참조하므로 pandas 2에서도 copy-on-write를 켜서 복사 없이 공유
+            # (전역 설정이므로 jsonl_core를 import할 때가 아니라 뷰어에서만 켬)
+            if int(pandas.__version__.split('.')[0]) < 3:
+                pandas.set_option('mode.copy_on_write', True)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.ready.emit()
+
+
+class LoadWorker(QObject):
+    # 별도 QThread에서 파일을 읽고 청크 단위로 파싱 결과를 전달
+    chunk_loaded = pyqtSignal(object)
+    frame_ready = pyqtSignal(object)
+    progress = pyqtSignal(object, object, object)  # bytes_done, bytes_total, rows_done
+    failed = pyqtSignal(str, str)
+    finished = pyqtSignal()
+
+    def __init__(self, file_path, local=True, creds=None, lazy=False, use_cache=False, arrow=False, follow=False,
+                 dataset=False, preview=None, preview_rows=None):
+        super(LoadWorker, self).__init__()
+        self.file_path = file_path
+        self.local = local
+        self.creds = creds
+        self.lazy = lazy
+        # 디렉터리/glob 데이터셋 (원격 디렉터리는 stat 후에 알 수 있으므로 load_remote에서 설정)
+        self.dataset = dataset
+        self.use_cache = use_cache
+        self.arrow = arrow
+        # follow 모드에서는 아직 쓰는 중인 마지막 줄을 읽지 않고 다음 폴링으로 넘김
+        self.follow = follow
+        # 미리보기 ('head', 'tail', 'random')면 preview_rows 행만 읽음
+        self.preview = preview
+        self.preview_rows = preview_rows
+        self.file_size = None
+        # 읽은 파일의 (mtime_ns, 앞부분 바이트). 통계 캐시가 같은 파일의 것인지 확인하는 데 씀
+        self.signature = None
+        self.cancelled = False
+        self.error = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise core.LoadCancelled()
+
+    def fail(self, title, message):
+        self.error = True
+        self.failed.emit(title, message)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            if self.preview:
+                self.load_preview()
+            elif self.dataset:
+                self.load_dataset()
+            elif not self.local:
+                self.load_remote()
+            elif self.arrow:
+                self.load_arrow(self.file_path)
+            elif self.lazy:
+                self.load_lazy()
+            else:
+                self.load_local()
+            if not self.preview and not self.error:
+                self.signature = core.source_signature(self.file_path, None if self.local else self.creds)
+        except core.LoadCancelled:
+            pass
+        except ssh_auth_errors():
+            self.fail("Authentication Error", "SSH Authentication failed. Please check your credentials.")
+        except ssh_errors() as e:
+            # 끊어진 세션은 풀에서 제거해 다음 로드 때 다시 연결
+            core.ssh_pool.discard(self.creds)
+            self.fail("SSH Error", f"SSH connection failed:\n{str(e)}")
+        except ValueError as ve:
+            self.fail("Error", f"JSON parsing error:\n{str(ve)}")
+        except Exception as e:
+            self.fail("Error", f"Failed to load file:\n{str(e)}")
+        finally:
+            self.finished.emit()
+
+    def index_progress(self, done, total):
+        self.check_cancelled()
+        self.progress.emit(done, total, 0)
+
+    def load_preview(self):
+        # 원격도 필요한 바이트 구간만 읽으므로 캐시/인덱스 옵션과 상관없이 바로 읽음
+        try:
+            lines = core.preview_lines(self.file_path, None if self.local else self.creds, self.preview,
+                                       self.preview_rows, progress=self.index_progress)
+        except FileNotFoundError:
+            if self.local:
+                raise
+            self.fail("Error", f"Remote file does not exist: {self.file_path}")
+            return
+        self.check_cancelled()
+        if lines:
+            self.chunk_loaded.emit(core.parse_lines(lines))
+
+    def load_arrow(self, path):
+        total = os.path.getsize(path)
+        if self.file_size is None:
+            self.file_size = total
+        self.progress.emit(0, total, 0)
+        frame = core.ArrowFrame.open(path)
+        self.progress.emit(total, total, len(frame))
+        self.frame_ready.emit(frame)
+
+    def load_lazy(self):
+        frame = core.LazyJSONLFrame.open(self.file_path, progress=self.index_progress)
+        self.file_size = frame.index.file_size
+        self.frame_ready.emit(frame)
+
+    def load_dataset(self):
+        # shard마다 인덱스만 만들고 (행 수는 캐시), 페이지/쿼리에 필요한 shard만 엶
+        frame = core.ShardedFrame.open(self.file_path, None if self.local else self.creds,
+                                       progress=self.index_progress)
+        self.file_size = frame.file_size
+        self.frame_ready.emit(frame)
+
+    def load_local(self):
+        total = os.path.getsize(self.file_path)
+        with open(self.file_path, 'rb') as f:
+            kind = core.compression_of(self.file_path)
+            if kind:
+                # 디스크에 풀어놓지 않고 스트리밍으로 풀면서 파싱 (진행률은 압축 바이트 기준)
+                self.file_size = total
+                stream = core.DecompressStream(kind)
+                self.stream_lines(core.iter_decompressed(core.iter_file_chunks(f), kind, stream), total,
+                                  position=lambda: stream.cpos)
+                return
+            if self.follow:
+                total = core.complete_lines_size(f, total)
+            self.file_size = total
+            if total >= core.PARALLEL_PARSE_THRESHOLD and core.PARSE_WORKERS > 1:
+                self.load_local_parallel(total)
+                return
+            # 읽는 도중 뒤에 추가된 줄은 follow 모드에서 읽도록 크기를 고정
+            f.seek(0)
+            self.stream_lines(core.iter_file_chunks(f, limit=total), total)
+
+    def load_local_parallel(self, total):
+        rows = 0
+        chunks = core.iter_parallel_chunks(self.file_path, size=total)
+        try:
+            for df, done in chunks:
+                self.check_cancelled()
+                rows += len(df)
+                if not df.empty:
+                    self.chunk_loaded.emit(df)
+                self.progress.emit(done, total, rows)
+        finally:
+            chunks.close()
+
+    def load_remote(self):
+        sftp = core.ssh_pool.sftp(self.creds)
+        if core.GLOB_CHARS.search(self.file_path):
+            self.dataset = True
+            self.load_dataset()
+            return
+        try:
+            stat = sftp.stat(self.file_path)
+        except FileNotFoundError:
+            self.fail("Error", f"Remote file does not exist: {self.file_path}")
+            return
+        if stat_module.S_ISDIR(stat.st_mode or 0):
+            self.dataset = True
+            self.load_dataset()
+            return
+        self.file_size = stat.st_size
+        if self.use_cache:
+            self.load_remote_cached(sftp, stat)
+            return
+        if self.lazy:
+            self.load_remote_lazy(sftp, stat)
+            return
+        with sftp.open(self.file_path, 'rb') as remote_file:
+            total = stat.st_size
+            if self.follow and not core.compression_of(self.file_path):
+                total = core.complete_lines_size(remote_file, stat.st_size)
+            self.file_size = total
+            self.stream_raw(core.iter_sftp_chunks(remote_file, 0, total), total)
+
+    def load_remote_cached(self, sftp, stat):
+        total = stat.st_size
+        if self.follow and not core.compression_of(self.file_path):
+            with sftp.open(self.file_path, 'rb') as remote_file:
+                total = core.complete_lines_size(remote_file, stat.st_size)
+        self.file_size = total
+        reusable = min(core.remote_cache.reusable_bytes(sftp, self.creds, self.file_path, stat), total)
+        downloaded = core.remote_cache.fetch(sftp, self.creds, self.file_path, stat, reusable, total)
+        local_path = core.remote_cache.local_path(self.creds, self.file_path)
+        if self.arrow or self.lazy:
+            done = reusable
+            for data in downloaded:
+                done += len(data)
+                self.index_progress(done, total)
+            if self.arrow:
+                self.load_arrow(local_path)
+            else:
+                self.frame_ready.emit(core.LazyJSONLFrame.open(local_path, progress=self.index_progress))
+        else:
+            # 캐시에 있는 앞부분을 먼저 읽고 이어서 내려받는 청크를 바로 파싱
+            with open(local_path, 'rb') if reusable else io.BytesIO() as f:
+                cached = core.iter_file_chunks(f, limit=reusable)
+                self.stream_raw(itertools.chain(cached, downloaded), total)
+        print(core.remote_cache.summary(), file=sys.stderr)
+
+    def load_remote_lazy(self, sftp, stat):
+        mtime_ns = int(stat.st_mtime) * 10 ** 9
+        self.frame_ready.emit(core.LazyJSONLFrame.open_remote(sftp, self.creds, self.file_path, stat.st_size, mtime_ns,
+                                                              self.index_progress))
+
+    def stream_raw(self, chunks, total):
+        # 원본 바이트 스트림. 압축 파일이면 스트리밍으로 풀어서 파싱
+        kind = core.compression_of(self.file_path)
+        if not kind:
+            self.stream_lines(chunks, total)
+            return
+        stream = core.DecompressStream(kind)
+        self.stream_lines(core.iter_decompressed(chunks, kind, stream), total, position=lambda: stream.cpos)
+
+    def stream_lines(self, chunks, total, position=None):
+        done = 0
+        rows = 0
+        for lines, nbytes in core.iter_line_batches(chunks):
+            self.check_cancelled()
+            done = position() if position is not None else done + nbytes
+            if lines:
+                df = core.parse_lines(lines)
+                rows += len(df)
+                self.chunk_loaded.emit(df)
+            self.progress.emit(done, total, rows)
+
+
+class FollowWorker(QObject):
+    # 파일 끝에 추가된 완전한 줄만 읽어서 전달. 잘림/교체(rotation)는 감지해서 다시 로드하도록 알림
+    appended = pyqtSignal(object, object, object, object)  # 새 줄 시작 오프셋, 파싱된 DataFrame(또는 None), 새 오프셋, mtime_ns
+    reset = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    polled = pyqtSignal()
+
+    def __init__(self, file_path, offset, local=True, creds=None, parse=True, use_cache=False):
+        super(FollowWorker, self).__init__()
+        self.file_path = file_path
+        self.offset = offset
+        self.local = local
+        self.creds = creds
+        self.parse = parse
+        self.use_cache = use_cache
+        self.signature = None
+        self.identity = None
+
+    def stat(self):
+        if self.local:
+            return os.stat(self.file_path)
+        return core.ssh_pool.sftp(self.creds).stat(self.file_path)
+
+    def open_file(self):
+        if self.local:
+            return open(self.file_path, 'rb')
+        return core.ssh_pool.sftp(self.creds).open(self.file_path, 'rb')
+
+    def read_range(self, f, start, end):
+        if self.local:
+            f.seek(start)
+            return f.read(end - start)
+        return b''.join(core.iter_sftp_chunks(f, start, end))
+
+    @pyqtSlot()
+    def poll(self):
+        try:
+            self.check()
+        except FileNotFoundError:
+            # 교체 중에는 잠깐 파일이 없을 수 있으므로 다음 폴링에서 다시 확인
+            pass
+        except ssh_errors() as e:
+            core.ssh_pool.discard(self.creds)
+            self.failed.emit(f"SSH connection failed:\n{str(e)}")
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.polled.emit()
+
+    def check(self):
+        stat = self.stat()
+        identity = (stat.st_dev, stat.st_ino) if self.local else None
+        with self.open_file() as f:
+            if self.signature is None:
+                self.signature = self.read_range(f, 0, min(self.offset, FOLLOW_SIGNATURE_BYTES))
+                self.identity = identity
+            signature = self.read_range(f, 0, len(self.signature))
+            if stat.st_size < self.offset:
+                self.reset.emit("The file was truncated")
+                return
+            if signature != self.signature or identity != self.identity:
+                self.reset.emit("The file was replaced")
+                return
+            if stat.st_size == self.offset:
+                return
+            # 바로 앞 바이트가 개행인지 보려고 한 바이트 앞에서부터 읽음
+            start = self.offset - 1 if self.offset else 0
+            data = self.read_range(f, start, stat.st_size)
+        if self.offset:
+            continues_line = data[:1] != b'\n'
+            data = data[1:]
+        else:
+            continues_line = False
+        # 아직 쓰는 중인 마지막 줄은 다음 폴링에서 읽음
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return
+        data = data[:end]
+        # 이전 마지막 줄이 개행 없이 끝났다면 그 줄의 나머지는 새 줄이 아님
+        cut = data.find(b'\n') + 1 if continues_line else 0
+        body = data[cut:]
+        starts = core.LineIndex.from_chunks([body], len(body), 0).starts + np.uint64(self.offset + cut)
+        df = core.parse_lines(core.split_lines(body)) if self.parse and len(starts) else None
+        if self.use_cache and not core.remote_cache.append(self.creds, self.file_path, data, stat.st_mtime):
+            self.reset.emit("The local cache copy is out of date")
+            return
+        self.offset += end
+        if len(self.signature) < FOLLOW_SIGNATURE_BYTES:
+            # 처음에 파일이 작았다면 교체 감지용 앞부분을 새로 읽은 바이트로 채움
+            self.signature = (self.signature + data)[:FOLLOW_SIGNATURE_BYTES]
+        mtime_ns = stat.st_mtime_ns if self.local else int(stat.st_mtime) * 10 ** 9
+        self.appended.emit(starts, df, self.offset, mtime_ns)
+
+
+STATS_HEADERS = ["Column", "Types", "Nulls", "Distinct ≈", "Top values", "Min", "Max",
+                 "Histogram", "Length p50 / p90 / p99"]
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def format_number(value):
+    if value is None:
+        return ""
+    if float(value).is_integer() and abs(value) < 1e15:
+        return f"{int(value):,}"
+    return f"{value:.6g}"
+
+
+def stats_cells(column):
+    # 통계 패널 한 행의 (텍스트, 툴팁) 목록. STATS_HEADERS 순서
+    rows = column['rows']
+    present = rows - column['nulls']
+    types = ", ".join(f"{name} {count * 100 / present:.0f}%" for name, count in column['types']) if present else ""
+    nulls = f"{column['nulls']:,} ({column['nulls'] * 100 / rows:.1f}%)" if rows else ""
+    top = [f"{core.cell_text(value, 40)} ({count:,})" for value, count in column['top']]
+    cells = [(column['name'], None), (types, None), (nulls, None), (f"{column['distinct']:,}", None),
+             (", ".join(top[:3]), "\n".join(top)), (format_number(column['min']), None),
+             (format_number(column['max']), None)]
+    histogram = column['histogram']
+    if histogram:
+        counts, edges = histogram
+        peak = max(counts) or 1
+        spark = "".join(SPARK_BLOCKS[count * (len(SPARK_BLOCKS) - 1) // peak] if count else " " for count in counts)
+        tooltip = "\n".join(f"[{format_number(low)}, {format_number(high)}): ~{count:,}"
+                             for low, high, count in zip(edges, edges[1:], counts))
+        cells.append((spark, tooltip))
+    else:
+        cells.append(("", None))
+    lengths = column['lengths']
+    cells.append((" / ".join(f"{value:.0f}" for value in lengths) if lengths else "", None))
+    return cells
+
+
+class StatsWorker(QObject):
+    # 대기 중인 (프레임, 시작 행 번호) 구간을 순서대로 읽으며 컬럼 통계를 갱신
+    # 로딩/follow 중에 GUI 스레드가 구간을 계속 추가하므로 큐가 빌 때까지 처리
+    updated = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, stats, jobs):
+        super(StatsWorker, self).__init__()
+        self.stats = stats
+        self.jobs = jobs
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report_progress(self):
+        if self.cancelled:
+            raise core.LoadCancelled()
+        self.updated.emit(self.stats.summary())
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            while self.jobs and not self.cancelled:
+                frame, offset = self.jobs.popleft()
+                self.stats.update_frame(frame, offset, self.report_progress)
+        except core.LoadCancelled:
+            pass
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+
+class SearchWorker(QObject):
+    # 현재 보기에서 매치되는 행 번호를 찾는 대로 전달
+    hits_found = pyqtSignal(object)
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, frame, query):
+        super(SearchWorker, self).__init__()
+        self.frame = frame
+        self.query = query
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise core.LoadCancelled()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            if isinstance(self.frame, core.ShardedFrame):
+                self.search_shards()
+            else:
+                self.search(self.frame, 0, self.progress.emit)
+        except core.LoadCancelled:
+            pass
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    def search(self, frame, offset, progress):
+        # offset: frame의 첫 행의 전역 행 번호 (shard 검색용)
+        if isinstance(frame, core.LazyJSONLFrame) and isinstance(frame.reader, core.MmapReader):
+            self.search_indexed(frame, offset, progress)
+        else:
+            self.search_frame(frame, offset, progress)
+
+    def search_shards(self):
+        # shard마다 따로 검색 (로컬 shard는 각자의 트라이그램 인덱스 사용). 진행률은 전체 행 기준
+        frame = self.frame
+        total = len(frame)
+        for i in range(len(frame.shards)):
+            offset = int(frame.offsets[i])
+            count = int(frame.counts[i])
+            if not count:
+                continue
+
+            def progress(done, shard_total, offset=offset, count=count):
+                self.progress.emit(offset + (count * done // shard_total if shard_total else count), total)
+            self.search(frame.shard(i).select(frame.columns), offset, progress)
+
+    def index_progress(self, progress):
+        def report(done, total):
+            self.check_cancelled()
+            progress(done, total)
+        return report
+
+    def search_indexed(self, frame, offset, progress):
+        index = core.SearchIndex.load_or_build(frame, self.index_progress(progress))
+        blocks = index.candidate_blocks(self.query)
+        for i, block in enumerate(blocks):
+            self.check_cancelled()
+            start = int(block) * index.block_rows
+            lines = frame.read_lines(start, start + index.block_rows)
+            hits = [offset + start + row for row, line in self.query.prefilter_lines(lines)
+                    if self.query.match_record(core.json_loads(line))]
+            if hits:
+                self.hits_found.emit(hits)
+            progress(i + 1, len(blocks))
+
+    def search_frame(self, frame, offset, progress):
+        total = len(frame)
+        for start in range(0, total, core.SEARCH_SCAN_ROWS):
+            self.check_cancelled()
+            df = frame.page(start, start + core.SEARCH_SCAN_ROWS)
+            hits = self.query.match_frame(df) + start + offset
+            if len(hits):
+                self.hits_found.emit(hits.tolist())
+            progress(min(start + core.SEARCH_SCAN_ROWS, total), total)
+
+
+class QueryWorker(QObject):
+    # 원본 프레임을 스캔해서 결과 행 번호를 전달
+    result_ready = pyqtSignal(object)
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, frame, query, replay=None):
+        super(QueryWorker, self).__init__()
+        self.frame = frame
+        self.query = query
+        # 기록을 다시 적용하다 만난 쿼리면 (기록, 쿼리 위치, 이동할 위치, pandas 실행 여부). 결과는 기록에 넣고 나머지를 이어서 적용
+        self.replay = replay
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report_progress(self, done, total):
+        if self.cancelled:
+            raise core.LoadCancelled()
+        self.progress.emit(done, total)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.result_ready.emit(core.run_query(self.frame, self.query, self.report_progress))
+        except core.LoadCancelled:
+            pass
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+
+class ExportWorker(QObject):
+    # 현재 보기(또는 선택한 행)를 배치 단위로 읽어서 파일에 쓰거나, path가 None이면 JSONL 텍스트로 모음
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, frame, path=None, fmt='jsonl', rows=None):
+        super(ExportWorker, self).__init__()
+        self.frame = frame
+        self.path = path
+        self.fmt = fmt
+        self.rows = rows
+        self.text = None
+        self.cancelled = False
+        self.error = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report_progress(self, done, total):
+        if self.cancelled:
+            raise core.LoadCancelled()
+        self.progress.emit(done, total)
+
+    @pyqtSlot()
+    def run(self):
+        f = None
+        try:
+            if self.path is None:
+                buffer = io.BytesIO()
+                core.export_view(self.frame, core.JSONLWriter(buffer), self.rows, self.report_progress)
+                self.text = buffer.getvalue().decode('utf-8')
+            else:
+                writer, f = core.open_writer(self.path, self.fmt)
+                core.export_view(self.frame, writer, self.rows, self.report_progress)
+        except core.LoadCancelled:
+            self.remove_partial(f)
+        except Exception as e:
+            self.error = True
+            self.remove_partial(f)
+            self.failed.emit(str(e))
+        finally:
+            if f is not None:
+                f.close()
+            self.finished.emit()
+
+    def remove_partial(self, f):
+        # 중간에 멈춘 파일은 남기지 않음
+        if self.path is None:
+            return
+        if f is not None:
+            f.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
 class MultiLineDelegate(QStyledItemDelegate):
-    def __init__(self, parent=None):
+    # 셀마다 QTextDocument 레이아웃을 (row, column, width, font) 키로 캐시
+    def __init__(self, parent=None, cache_size=LAYOUT_CACHE_SIZE):
         super(MultiLineDelegate, self).__init__(parent)
-
-    def paint(self, painter, option, index):
+        self.cache_size = cache_size
+        self._documents = collections.OrderedDict()
+        # 디버그 오버레이가 켜져 있을 때만 PerfMonitor가 설정되어 셀마다 그리는 시간을 기록
+        self.perf = None
+
+    def clear_cache(self, *args):
+        self._documents.clear()
+
+    def evict_column(self, column):
+        # 폭이 바뀐 컬럼의 레이아웃만 버림 (다른 컬럼은 그대로 재사용)
+        for key in [key for key in self._documents if key[1] == column]:
+            del self._documents[key]
+
+    @staticmethod
+    def text_rect(option):
+        # 셀 안에서 글자를 그리는 영역. paint와 sizeHint가 같은 폭으로 캐시를 공유
+        return option.rect.adjusted(4, 2, -4, -2)
+
+    def document(self, index, font, width):
+        key = (index.row(), index.column(), width, font.key())
+        doc = self._documents.get(key)
+        if doc is not None:
+            self._documents.move_to_end(key)
+            return doc
         text = index.data(Qt.DisplayRole)
         if text is None:
             text = ""
+        doc = QTextDocument()
+        doc.setDefaultFont(font)
+        doc.setPlainText(text)
+        doc.setTextWidth(width)
+        if self.cache_size:
+            self._documents[key] = doc
+            if len(self._documents) > self.cache_size:
+                self._documents.popitem(last=False)
+        return doc
+
+    def paint(self, painter, option, index):
+        start = time.perf_counter() if self.perf is not None else None
         painter.save()
 
         # Initialize the style option and prevent default text drawing
@@ -29,14 +795,9 @@ class MultiLineDelegate(QStyledItemDelegate):
         style = option.widget.style()
         style.drawControl(QStyle.CE_ItemViewItem, option, painter)
 
-        # Set up the QTextDocument
-        doc = QTextDocument()
-        doc.setDefaultFont(option.font)
-        doc.setPlainText(text)
-
         # Calculate the rect for text
-        text_rect = option.rect.adjusted(4, 2, -4, -2)
-        doc.setTextWidth(text_rect.width() if text_rect.width() > 0 else 1)
+        text_rect = self.text_rect(option)
+        doc = self.document(index, option.font, max(text_rect.width(), 1))
 
         # Translate painter to the text rect top-left
         painter.translate(text_rect.topLeft())
@@ -45,30 +806,37 @@ class MultiLineDelegate(QStyledItemDelegate):
         doc.drawContents(painter)
 
         painter.restore()
+        if start is not None:
+            self.perf.record('paint cell', time.perf_counter() - start)
 
     def sizeHint(self, option, index):
-        text = index.data(Qt.DisplayRole)
-        if text is None:
-            text = ""
-        doc = QTextDocument()
-        doc.setDefaultFont(option.font)
         # 최소 너비 설정 (0이면 오류 발생)
-        text_width = option.rect.width() if option.rect.width() > 0 else 1
-        doc.setTextWidth(text_width)
-        doc.setPlainText(text)
-        return QSize(int(doc.idealWidth()), int(doc.size().height()) + 4)  # 추가 여유 공간
+        doc = self.document(index, option.font, max(self.text_rect(option).width(), 1))
+        return QSize(int(doc.idealWidth()) + 8, int(doc.size().height()) + 4)  # 글자 영역 바깥 여백
 
 
 class DataFrameModel(QAbstractTableModel):
-    def __init__(self, df=pd.DataFrame()):
+    def __init__(self, df=None):
         super(DataFrameModel, self).__init__()
-        self._df = df
+        self._df = df if df is not None else pd.DataFrame()
+        self.max_chars = MAX_CELL_CHARS
 
     def setDataFrame(self, df):
         self.beginResetModel()
-        self._df = df.copy()
+        self._df = df
         self.endResetModel()
 
+    def appendDataFrame(self, df):
+        if df.empty:
+            return
+        if len(self._df.columns) == 0:
+            self.setDataFrame(df)
+            return
+        first = len(self._df.index)
+        self.beginInsertRows(QModelIndex(), first, first + len(df.index) - 1)
+        self._df = pd.concat([self._df, df.reindex(columns=self._df.columns)], ignore_index=True)
+        self.endInsertRows()
+
     def rowCount(self, parent=None):
         return len(self._df.index)
 
@@ -81,10 +849,9 @@ class DataFrameModel(QAbstractTableModel):
         if not index.isValid():
             return QVariant()
         if role == Qt.DisplayRole:
-            value = self._df.iloc[index.row(), index.column()]
-            if isinstance(value, str):
-                return value
-            return str(value)
+            return core.cell_text(self._df.iloc[index.row(), index.column()], self.max_chars)
+        elif role == Qt.UserRole:
+            return self._df.iloc[index.row(), index.column()]
         elif role == Qt.BackgroundRole:
             if index.row() % 2 == 1:  # 짝수 행 (0부터 시작하므로 인덱스가 1,3,5,...)
                 return QColor(240, 240, 240)  # 연한 회색
@@ -103,6 +870,182 @@ class DataFrameModel(QAbstractTableModel):
         return QVariant()
 
 
+class BlockWorker(QObject):
+    # 연속 스크롤 모델이 요청한 블록을 읽음 (원격 lazy/shard 프레임은 느리므로 GUI 스레드 밖에서)
+    # 스크롤하는 동안 GUI 스레드가 요청을 계속 추가하므로 큐가 빌 때까지 처리, 가장 최근 요청부터
+    block_ready = pyqtSignal(object, int, object)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, frame, block_rows, jobs):
+        super(BlockWorker, self).__init__()
+        self.frame = frame
+        self.block_rows = block_rows
+        self.jobs = jobs
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            while self.jobs and not self.cancelled:
+                number = self.jobs.pop()
+                start = number * self.block_rows
+                self.block_ready.emit(self.frame, number, self.frame.page(start, start + self.block_rows))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+
+class VirtualFrameModel(QAbstractTableModel):
+    # 연속 스크롤용 모델: 전체 행 수를 보고하고 셀 데이터는 블록 단위로 필요할 때만 가져옴
+    # 블록은 워커 스레드에서 읽고, 도착하기 전에는 자리표시 문자열을 보여준 뒤 dataChanged로 다시 그림
+    fetch_failed = pyqtSignal(str)
+
+    def __init__(self, block_rows=VIRTUAL_BLOCK_ROWS, max_blocks=VIRTUAL_CACHE_BLOCKS):
+        super(VirtualFrameModel, self).__init__()
+        self.block_rows = block_rows
+        self.max_blocks = max_blocks
+        self._frame = None
+        self._columns = []
+        self._rows = 0
+        self._blocks = collections.OrderedDict()
+        # 요청했지만 아직 도착하지 않은 블록 번호와 워커와 공유하는 요청 큐 (오래된 요청은 max_blocks개를 넘으면 버림)
+        self._requested = set()
+        self._jobs = collections.deque()
+        self._thread = QThread(self)
+        self._worker = None
+        self._fetching = False
+        self.max_chars = MAX_CELL_CHARS
+
+    def setFrame(self, frame):
+        self.beginResetModel()
+        self.cancel_fetch()
+        self._frame = frame
+        self._columns = list(frame.columns) if frame is not None else []
+        self._rows = len(frame) if frame is not None else 0
+        self._blocks.clear()
+        self.endResetModel()
+
+    def frame(self):
+        return self._frame
+
+    def block(self, number):
+        # 캐시에 있으면 블록, 없으면 읽기를 요청하고 None
+        df = self._blocks.get(number)
+        if df is not None:
+            self._blocks.move_to_end(number)
+            return df
+        if number in self._requested:
+            # 다시 화면에 들어온 블록은 가장 최근 요청으로 (워커가 이미 꺼내 읽는 중이면 그대로)
+            try:
+                if self._jobs[-1] != number:
+                    self._jobs.remove(number)
+                    self._jobs.append(number)
+            except (IndexError, ValueError):
+                pass
+        else:
+            self._requested.add(number)
+            self._jobs.append(number)
+            while len(self._jobs) > self.max_blocks:
+                try:
+                    self._requested.discard(self._jobs.popleft())
+                except IndexError:
+                    break
+            if not self._fetching:
+                self.start_fetch()
+        return None
+
+    def start_fetch(self):
+        worker = BlockWorker(self._frame, self.block_rows, self._jobs)
+        self._worker = worker
+        self._fetching = True
+        worker.moveToThread(self._thread)
+        worker.block_ready.connect(lambda frame, number, df: self.on_block_ready(worker, frame, number, df))
+        worker.failed.connect(lambda message: self.on_fetch_failed(worker, message))
+        worker.finished.connect(lambda: self.on_fetch_finished(worker))
+        worker.finished.connect(self._thread.quit)
+        self._thread.start()
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def cancel_fetch(self, wait=False):
+        # 돌고 있는 워커는 예전 큐를 가진 채로 끝나고, 새 요청은 새 큐에 쌓임
+        self._jobs = collections.deque()
+        self._requested.clear()
+        if self._fetching:
+            self._worker.cancel()
+        if wait:
+            self._thread.quit()
+            self._thread.wait()
+
+    def on_block_ready(self, worker, frame, number, df):
+        if worker is not self._worker or worker.cancelled or frame is not self._frame:
+            return
+        self._requested.discard(number)
+        self._blocks[number] = df
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        start = number * self.block_rows
+        end = min(start + self.block_rows, self._rows) - 1
+        if end >= start and self._columns:
+            self.dataChanged.emit(self.index(start, 0), self.index(end, len(self._columns) - 1))
+
+    def on_fetch_failed(self, worker, message):
+        if worker is not self._worker or worker.cancelled:
+            return
+        # 실패한 블록은 프레임이 바뀔 때까지 다시 요청하지 않음
+        self._jobs.clear()
+        self.fetch_failed.emit(message)
+
+    def on_fetch_finished(self, worker):
+        worker.disconnect()
+        if worker is not self._worker:
+            return
+        if self._jobs:
+            # 워커가 끝나는 사이에 추가된 요청 (다른 프레임으로 바뀐 경우 포함)
+            # 이 워커가 보낸 스레드 종료 요청이 처리된 뒤에 다시 시작해야 새 워커가 멈추지 않음
+            QTimer.singleShot(0, self.start_fetch)
+            return
+        self._fetching = False
+
+    def rowCount(self, parent=None):
+        return self._rows
+
+    def columnCount(self, parent=None):
+        return len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        if role in (Qt.DisplayRole, Qt.UserRole):
+            row = index.row()
+            df = self.block(row // self.block_rows)
+            if df is None:
+                return VIRTUAL_PLACEHOLDER if role == Qt.DisplayRole else None
+            offset = row % self.block_rows
+            if offset >= len(df.index):
+                return "" if role == Qt.DisplayRole else None
+            value = df.iloc[offset, index.column()]
+            if role == Qt.UserRole:
+                return value
+            return core.cell_text(value, self.max_chars)
+        elif role == Qt.BackgroundRole:
+            if index.row() % 2 == 1:
+                return QColor(240, 240, 240)
+            return QVariant()
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return str(self._columns[section]) if section < len(self._columns) else QVariant()
+            return str(section + 1)
+        return QVariant()
+
+
 class JSONLViewer(QWidget):
     def __init__(self):
         super().__init__()
@@ -124,10 +1067,26 @@ class JSONLViewer(QWidget):
         self.local_browse_button.clicked.connect(self.browse_file)
         self.local_layout.addWidget(self.local_browse_button)
 
+        # 폴더 안의 JSONL 파일들을 하나의 데이터셋으로 열기
+        self.local_browse_folder_button = QPushButton("Browse Folder")
+        self.local_browse_folder_button.clicked.connect(self.browse_folder)
+        self.local_layout.addWidget(self.local_browse_folder_button)
+
         self.local_path_input = QLineEdit()
-        self.local_path_input.setPlaceholderText("Enter local file path here...")
+        self.local_path_input.setPlaceholderText("Enter a local file, folder or glob (data/part-*.jsonl)...")
         self.local_layout.addWidget(self.local_path_input)
 
+        self.lazy_load_checkbox = QCheckBox("Indexed (lazy) loading")
+        self.lazy_load_checkbox.setToolTip("Build a line offset index and parse only the rows shown on the current page")
+        self.local_layout.addWidget(self.lazy_load_checkbox)
+
+        self.arrow_checkbox = QCheckBox("Arrow / Parquet cache")
+        self.arrow_checkbox.setToolTip("Load into an Arrow table and keep a Parquet copy next to the file for instant reopening")
+        if importlib.util.find_spec('pyarrow') is None:
+            self.arrow_checkbox.setEnabled(False)
+            self.arrow_checkbox.setToolTip("pyarrow is not installed")
+        self.local_layout.addWidget(self.arrow_checkbox)
+
         self.local_load_button = QPushButton("Load Local File")
         self.local_load_button.clicked.connect(self.load_local_file)
         self.local_layout.addWidget(self.local_load_button)
@@ -160,22 +1119,117 @@ class JSONLViewer(QWidget):
         self.remote_layout.addLayout(form_layout)
 
         self.remote_path_input = QLineEdit()
-        self.remote_path_input.setPlaceholderText("Enter remote file path here...")
+        self.remote_path_input.setPlaceholderText("Enter a remote file, folder or glob (/data/part-*.jsonl)...")
         self.remote_layout.addWidget(self.remote_path_input)
 
+        self.remote_lazy_checkbox = QCheckBox("Indexed (lazy) loading")
+        self.remote_lazy_checkbox.setToolTip("Index the remote file once and fetch only the byte ranges of the rows being viewed")
+        self.remote_layout.addWidget(self.remote_lazy_checkbox)
+
+        self.remote_cache_checkbox = QCheckBox("Cache remote file locally")
+        self.remote_cache_checkbox.setToolTip("Keep a local copy and only download files that changed (or just the appended tail).\n"
+                                              "Indexed loading reads only the rows being viewed and skips the copy "
+                                              "unless Arrow is selected")
+        self.remote_cache_checkbox.setChecked(True)
+        self.remote_layout.addWidget(self.remote_cache_checkbox)
+
+        self.cache_stats_label = QLabel("")
+        self.remote_layout.addWidget(self.cache_stats_label)
+
         self.remote_load_button = QPushButton("Load Remote File")
         self.remote_load_button.clicked.connect(self.load_remote_file)
         self.remote_layout.addWidget(self.remote_load_button)
 
         self.top_layout.addWidget(self.remote_group)
 
+        # 미리보기: 큰 파일(원격 포함)의 앞/뒤/임의 N행만 읽기
+        self.preview_group = QGroupBox("Preview")
+        self.preview_layout = QVBoxLayout()
+        self.preview_group.setLayout(self.preview_layout)
+
+        self.preview_combo = QComboBox()
+        for text, mode in PREVIEW_CHOICES:
+            self.preview_combo.addItem(text, mode)
+        self.preview_combo.setToolTip("Read only part of the file. A random sample jumps to random byte offsets "
+                                      "(or uses the line index if one exists) instead of reading everything")
+        self.preview_combo.currentIndexChanged.connect(
+            lambda: self.preview_rows_input.setEnabled(self.preview_combo.currentData() is not None))
+        self.preview_layout.addWidget(self.preview_combo)
+
+        self.preview_rows_input = QSpinBox()
+        self.preview_rows_input.setRange(1, 1000000)
+        self.preview_rows_input.setSingleStep(100)
+        self.preview_rows_input.setSuffix(" rows")
+        self.preview_rows_input.setEnabled(False)
+        self.preview_layout.addWidget(self.preview_rows_input)
+        self.preview_layout.addStretch()
+
+        self.top_layout.addWidget(self.preview_group)
+
         self.layout.addLayout(self.top_layout)
 
+        # 검색 바 (전체 행 대상 부분 문자열/정규식 검색)
+        self.search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search all rows (substring or regex)...")
+        self.search_input.returnPressed.connect(self.start_search)
+        self.search_layout.addWidget(self.search_input, stretch=3)
+
+        self.search_fields_input = QLineEdit()
+        self.search_fields_input.setPlaceholderText("Fields (comma separated, empty = all)")
+        self.search_layout.addWidget(self.search_fields_input, stretch=1)
+
+        self.search_regex_checkbox = QCheckBox("Regex")
+        self.search_layout.addWidget(self.search_regex_checkbox)
+
+        self.search_case_checkbox = QCheckBox("Case sensitive")
+        self.search_layout.addWidget(self.search_case_checkbox)
+
+        self.search_button = QPushButton("Search")
+        self.search_button.clicked.connect(self.start_search)
+        self.search_layout.addWidget(self.search_button)
+
+        self.search_prev_button = QPushButton("Previous Hit")
+        self.search_prev_button.clicked.connect(lambda: self.goto_hit(-1))
+        self.search_layout.addWidget(self.search_prev_button)
+
+        self.search_next_button = QPushButton("Next Hit")
+        self.search_next_button.clicked.connect(lambda: self.goto_hit(1))
+        self.search_layout.addWidget(self.search_next_button)
+
+        self.search_status_label = QLabel("")
+        self.search_layout.addWidget(self.search_status_label)
+
+        self.layout.addLayout(self.search_layout)
+
+        # 쿼리 바 (파일/컬럼 캐시를 스캔하며 필터·projection 적용, 결과 행 번호만 보관)
+        self.query_layout = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText('Query: select id, meta.source where score > 0.5 and label == "valid" order by score desc limit 1000')
+        self.query_input.returnPressed.connect(self.start_query)
+        self.query_layout.addWidget(self.query_input, stretch=1)
+
+        self.query_button = QPushButton("Run Query")
+        self.query_button.clicked.connect(self.start_query)
+        self.query_layout.addWidget(self.query_button)
+
+        self.cancel_query_button = QPushButton("Cancel Query")
+        self.cancel_query_button.clicked.connect(lambda: self.cancel_query())
+        self.cancel_query_button.setVisible(False)
+        self.query_layout.addWidget(self.cancel_query_button)
+
+        self.query_status_label = QLabel("")
+        self.query_layout.addWidget(self.query_status_label)
+
+        self.layout.addLayout(self.query_layout)
+
         # 중간 테이블 뷰 (더 넓게 설정)
         self.table_view = QTableView()
         self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table_view.setWordWrap(True)
-        self.table_view.setItemDelegate(MultiLineDelegate(self.table_view))
+        self.delegate = MultiLineDelegate(self.table_view)
+        self.table_view.setItemDelegate(self.delegate)
+        self.table_view.horizontalHeader().sectionResized.connect(self.on_column_resized)
         self.table_view.horizontalHeader().setStretchLastSection(True)
         self.table_view.verticalHeader().setDefaultSectionSize(50)  # 초기 행 높이 설정
         self.table_view.setAlternatingRowColors(False)  # 직접 배경색 설정하므로 비활성화
@@ -185,7 +1239,17 @@ class JSONLViewer(QWidget):
         self.table_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table_view.customContextMenuRequested.connect(self.open_context_menu)
 
-        self.layout.addWidget(self.table_view, stretch=8)  # 테이블 뷰에 더 많은 공간 할당
+        # 선택한 셀의 전체 값 (잘리지 않은 텍스트, JSON은 들여쓰기)
+        self.detail_view = QTextEdit()
+        self.detail_view.setReadOnly(True)
+        self.detail_view.setPlaceholderText("Select a cell to see its full value")
+
+        self.table_splitter = QSplitter(Qt.Vertical)
+        self.table_splitter.addWidget(self.table_view)
+        self.table_splitter.addWidget(self.detail_view)
+        self.table_splitter.setStretchFactor(0, 4)
+        self.table_splitter.setStretchFactor(1, 1)
+        self.layout.addWidget(self.table_splitter, stretch=8)  # 테이블 뷰에 더 많은 공간 할당
 
         # 페이징 레이아웃
         self.pagination_layout = QHBoxLayout()
@@ -210,6 +1274,67 @@ class JSONLViewer(QWidget):
         self.rows_per_page_combo.currentIndexChanged.connect(self.update_pagination)
         self.pagination_layout.addWidget(self.rows_per_page_combo)
 
+        # 연속 스크롤 모드 및 행 이동
+        self.continuous_checkbox = QCheckBox("Continuous scroll")
+        self.continuous_checkbox.toggled.connect(self.set_continuous_mode)
+        self.pagination_layout.addWidget(self.continuous_checkbox)
+
+        self.follow_checkbox = QCheckBox("Follow")
+        self.follow_checkbox.setToolTip("Watch the file and add appended lines as they are written")
+        self.follow_checkbox.toggled.connect(self.set_follow_mode)
+        self.pagination_layout.addWidget(self.follow_checkbox)
+
+        self.goto_row_input = QSpinBox()
+        self.goto_row_input.setRange(1, 1)
+        self.goto_row_input.setPrefix("Row ")
+        self.goto_row_input.setMinimumWidth(120)
+        self.pagination_layout.addWidget(self.goto_row_input)
+
+        self.max_chars_input = QSpinBox()
+        self.max_chars_input.setRange(0, 1000000)
+        self.max_chars_input.setSingleStep(500)
+        self.max_chars_input.setValue(MAX_CELL_CHARS)
+        self.max_chars_input.setPrefix("Max cell chars ")
+        self.max_chars_input.setSpecialValueText("Max cell chars: no limit")
+        self.max_chars_input.setToolTip("Longer values are cut off in the table; the full value is shown below it")
+        self.max_chars_input.valueChanged.connect(self.set_max_cell_chars)
+        self.pagination_layout.addWidget(self.max_chars_input)
+
+        self.goto_row_button = QPushButton("Go")
+        self.goto_row_button.clicked.connect(lambda: self.goto_row(self.goto_row_input.value() - 1))
+        self.pagination_layout.addWidget(self.goto_row_button)
+
+        # 현재 보기 전체 내보내기 (쿼리/컬럼 선택/pandas 명령어 결과)
+        self.export_button = QPushButton("Export View...")
+        self.export_button.setToolTip("Write every row of the current view to JSONL, CSV or Parquet")
+        self.export_button.clicked.connect(self.export_view)
+        self.pagination_layout.addWidget(self.export_button)
+
+        self.cancel_export_button = QPushButton("Cancel Export")
+        self.cancel_export_button.clicked.connect(lambda: self.cancel_export())
+        self.cancel_export_button.setVisible(False)
+        self.pagination_layout.addWidget(self.cancel_export_button)
+
+        self.export_status_label = QLabel("")
+        self.pagination_layout.addWidget(self.export_status_label)
+
+        # 로딩 진행 상황
+        self.pagination_layout.addStretch()
+        self.load_status_label = QLabel("")
+        self.pagination_layout.addWidget(self.load_status_label)
+
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 1000)
+        self.load_progress.setTextVisible(False)
+        self.load_progress.setMaximumWidth(300)
+        self.load_progress.setVisible(False)
+        self.pagination_layout.addWidget(self.load_progress)
+
+        self.cancel_load_button = QPushButton("Cancel")
+        self.cancel_load_button.clicked.connect(lambda: self.cancel_loading())
+        self.cancel_load_button.setVisible(False)
+        self.pagination_layout.addWidget(self.cancel_load_button)
+
         self.layout.addLayout(self.pagination_layout)
 
         # 하단 레이아웃 (컬럼 선택 및 pandas 명령어 입력) 축소
@@ -217,8 +1342,18 @@ class JSONLViewer(QWidget):
 
         # 컬럼 선택
         self.columns_layout = QVBoxLayout()
+        self.columns_header_layout = QHBoxLayout()
         self.columns_label = QLabel("Select Columns:")
-        self.columns_layout.addWidget(self.columns_label)
+        self.columns_header_layout.addWidget(self.columns_label)
+        self.columns_header_layout.addStretch()
+        # 스키마(중첩 경로 포함)는 앞쪽 샘플 행에서만 추론
+        self.schema_sample_input = QSpinBox()
+        self.schema_sample_input.setRange(1, 1000000)
+        self.schema_sample_input.setPrefix("Schema sample ")
+        self.schema_sample_input.setSuffix(" rows")
+        self.schema_sample_input.editingFinished.connect(self.setup_columns)
+        self.columns_header_layout.addWidget(self.schema_sample_input)
+        self.columns_layout.addLayout(self.columns_header_layout)
 
         self.columns_list = QListWidget()
         self.columns_list.setSelectionMode(QAbstractItemView.MultiSelection)
@@ -231,6 +1366,29 @@ class JSONLViewer(QWidget):
 
         self.bottom_layout.addLayout(self.columns_layout)
 
+        # 컬럼 통계 (한 번의 스트리밍 패스로 계산, 파일별로 캐시하고 추가된 행만 이어서 계산)
+        self.stats_layout = QVBoxLayout()
+        self.stats_header_layout = QHBoxLayout()
+        self.stats_label = QLabel("Column Stats:")
+        self.stats_header_layout.addWidget(self.stats_label)
+        self.stats_header_layout.addStretch()
+        self.stats_checkbox = QCheckBox("Compute")
+        self.stats_checkbox.setToolTip("Compute null counts, distinct estimates, top values and distributions "
+                                       "for every column in the background")
+        self.stats_checkbox.toggled.connect(self.set_stats_enabled)
+        self.stats_header_layout.addWidget(self.stats_checkbox)
+        self.stats_layout.addLayout(self.stats_header_layout)
+
+        self.stats_table = QTableWidget(0, len(STATS_HEADERS))
+        self.stats_table.setHorizontalHeaderLabels(STATS_HEADERS)
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.horizontalHeader().setStretchLastSection(True)
+        self.stats_table.setMaximumHeight(180)
+        self.stats_layout.addWidget(self.stats_table)
+
+        self.bottom_layout.addLayout(self.stats_layout, stretch=2)
+
         # pandas 명령어 입력
         self.pandas_layout = QVBoxLayout()
         self.pandas_label = QLabel("Pandas Commands:")
@@ -246,34 +1404,197 @@ class JSONLViewer(QWidget):
         self.apply_pandas_button.clicked.connect(self.apply_pandas_commands)
         self.pandas_buttons_layout.addWidget(self.apply_pandas_button)
 
-        self.reset_pandas_button = QPushButton("Reset Commands")
-        self.reset_pandas_button.clicked.connect(self.reset_pandas_commands)
-        self.pandas_buttons_layout.addWidget(self.reset_pandas_button)
+        # 적용한 변환 기록을 따라 앞뒤로 이동 (파일별로 저장되어 다시 열어도 유지)
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.clicked.connect(self.undo)
+        self.undo_button.setEnabled(False)
+        self.pandas_buttons_layout.addWidget(self.undo_button)
+
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.clicked.connect(self.redo)
+        self.redo_button.setEnabled(False)
+        self.pandas_buttons_layout.addWidget(self.redo_button)
 
         self.pandas_layout.addLayout(self.pandas_buttons_layout)
 
-        self.bottom_layout.addLayout(self.pandas_layout)
+        self.bottom_layout.addLayout(self.pandas_layout, stretch=1)
 
         self.layout.addLayout(self.bottom_layout, stretch=2)  # 하단 레이아웃의 공간 축소
 
-        # 데이터 관련 변수
-        self.original_df = pd.DataFrame()
-        self.display_df = pd.DataFrame()
-        self.previous_display_df = pd.DataFrame()  # 이전 상태 저장용
-        self.model = DataFrameModel(self.display_df)
-        self.table_view.setModel(self.model)
+        # 디버그 오버레이: 연산별 소요 시간과 최대 메모리 (버그 리포트에 붙여 넣을 수 있도록 복사 버튼 제공)
+        self.perf = PerfMonitor()
+        self.debug_widget = QWidget()
+        self.debug_layout = QHBoxLayout(self.debug_widget)
+        self.debug_layout.setContentsMargins(0, 0, 0, 0)
+        self.debug_label = QLabel("")
+        self.debug_label.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.debug_label.setWordWrap(True)
+        self.debug_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.debug_layout.addWidget(self.debug_label, stretch=1)
+        self.debug_copy_button = QPushButton("Copy Report")
+        self.debug_copy_button.clicked.connect(self.copy_debug_report)
+        self.debug_layout.addWidget(self.debug_copy_button)
+        self.debug_reset_button = QPushButton("Reset Timings")
+        self.debug_reset_button.clicked.connect(self.reset_debug_timings)
+        self.debug_layout.addWidget(self.debug_reset_button)
+        self.debug_widget.setVisible(False)
+        self.layout.addWidget(self.debug_widget)
+        self.debug_timer = QTimer(self)
+        self.debug_timer.setInterval(DEBUG_OVERLAY_REFRESH_MS)
+        self.debug_timer.timeout.connect(self.update_debug_overlay)
+        self.debug_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.debug_shortcut.activated.connect(lambda: self.set_debug_overlay_visible(not self.debug_widget.isVisible()))
+        if os.environ.get('JSONL_VIEWER_DEBUG'):
+            self.set_debug_overlay_visible(True)
+
+        # 데이터 관련 변수 (pandas/jsonl_core가 필요한 것들은 import가 끝난 뒤 init_data에서 생성)
+        self.data_ready = False
+        self.original_df = None
+        self.display_df = None
+        self.history = None
+        # 인덱스 기반 로딩 시 사용 (전체 로딩 시에는 None)
+        self.original_frame = None
+        self.display_frame = None
+        self.model = None
+        self.virtual_model = None
+
+        # 연속 스크롤 모드에서는 화면에 보이는 행만 높이를 계산
+        self._sized_rows = set()
+        self._virtual_columns_sized = False
+        self.resize_rows_timer = QTimer(self)
+        self.resize_rows_timer.setSingleShot(True)
+        self.resize_rows_timer.setInterval(30)
+        self.resize_rows_timer.timeout.connect(self.resize_visible_rows)
+        self.table_view.verticalScrollBar().valueChanged.connect(self.schedule_resize_visible_rows)
 
         # 페이징 관련 변수
         self.current_page = 1
         self.rows_per_page = 10
         self.total_pages = 1
 
+        # 백그라운드 로딩 관련 변수
+        self.load_thread = QThread(self)
+        self.load_worker = None
+        self.loading = False
+        self._pending_chunks = []
+        self._loaded_rows = 0
+        # follow 모드에서 받았지만 아직 original_df에 합치지 않은 행 (DataFrame으로 읽은 경우)
+        self._followed_chunks = []
+        self._followed_merged_at = 0.0
+
+        # 검색 관련 변수
+        self.search_thread = QThread(self)
+        self.search_worker = None
+        self.searching = False
+        self.search_hits = []
+        self.search_pos = -1
+        self.search_target = None
+        self._search_cache = {}
+
+        # follow 모드 관련 변수 (마지막으로 읽은 바이트 오프셋부터 추가된 줄만 읽음)
+        self.loaded_source = None
+        self.follow_thread = QThread(self)
+        self.follow_worker = None
+        self.follow_polling = False
+        self.follow_pending = False
+        self.follow_timer = QTimer(self)
+        self.follow_timer.timeout.connect(self.poll_follow)
+        self.follow_watcher = QFileSystemWatcher(self)
+        self.follow_watcher.fileChanged.connect(self.poll_follow)
+
+        # 쿼리 관련 변수
+        self.query_thread = QThread(self)
+        self.query_worker = None
+        self.querying = False
+
+        # 내보내기/클립보드 복사 관련 변수
+        self.export_thread = QThread(self)
+        self.export_worker = None
+        self.exporting = False
+
+        # 컬럼 통계 관련 변수 (워커는 큐에 쌓인 구간을 순서대로 처리)
+        self.stats = None
+        self.stats_jobs = collections.deque()
+        self.stats_thread = QThread(self)
+        self.stats_worker = None
+        self.stats_running = False
+        # 전체 로딩 중에는 받은 청크를 바로 통계에 넣음
+        self.stats_streaming = False
+
+        # 창을 먼저 띄우고 데이터 스택(pandas, numpy, jsonl_core)은 백그라운드에서 import
+        self.startup_times = {'imports': time.perf_counter() - STARTUP_TIME,
+                              'preloaded': [name for name in STARTUP_HEAVY_MODULES if name in sys.modules]}
+        self.set_data_widgets_enabled(False)
+        self.import_thread = QThread(self)
+        self.import_worker = ImportWorker()
+        self.import_worker.moveToThread(self.import_thread)
+        self.import_worker.ready.connect(self.init_data)
+        self.import_worker.failed.connect(self.on_import_failed)
+        self.import_thread.start()
+        QMetaObject.invokeMethod(self.import_worker, "run", Qt.QueuedConnection)
+
+    def data_widgets(self):
+        # 데이터가 준비되기 전에는 쓸 수 없는 위젯들
+        widgets = [self.local_browse_button, self.local_browse_folder_button, self.local_load_button,
+                   self.remote_load_button]
+        layouts = [self.search_layout, self.query_layout, self.pagination_layout, self.bottom_layout]
+        while layouts:
+            layout = layouts.pop()
+            for i in range(layout.count()):
+                item = layout.itemAt(i)
+                if item.widget() is not None:
+                    widgets.append(item.widget())
+                elif item.layout() is not None:
+                    layouts.append(item.layout())
+        widgets.append(self.table_splitter)
+        return widgets
+
+    def set_data_widgets_enabled(self, enabled):
+        for widget in self.data_widgets():
+            # 상황에 따라 따로 켜고 끄는 버튼은 update_history_buttons가 관리
+            if widget not in (self.undo_button, self.redo_button):
+                widget.setEnabled(enabled)
+
+    def init_data(self):
+        self.original_df = pd.DataFrame()
+        self.display_df = pd.DataFrame()
+        self.history = core.ViewHistory()
+        self.stats = core.DatasetStats()
+        self.model = DataFrameModel(self.display_df)
+        self.virtual_model = VirtualFrameModel()
+        self.virtual_model.dataChanged.connect(self.on_virtual_block_loaded)
+        self.virtual_model.fetch_failed.connect(self.on_virtual_fetch_failed)
+        for model in (self.model, self.virtual_model):
+            # 데이터가 바뀌면 캐시된 셀 레이아웃을 버림
+            for signal in (model.modelReset, model.rowsInserted, model.rowsRemoved,
+                           model.dataChanged, model.layoutChanged):
+                signal.connect(self.delegate.clear_cache)
+        self.set_table_model(self.model)
+        self.schema_sample_input.setValue(core.SCHEMA_SAMPLE_ROWS)
+        self.preview_rows_input.setValue(core.PREVIEW_ROWS)
+        self.data_ready = True
+        self.set_data_widgets_enabled(True)
+        self.update_history_buttons()
+        self.startup_times['data_ready'] = time.perf_counter() - STARTUP_TIME
+        self.import_thread.quit()
+
+    def on_import_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Failed to load the data libraries:\n{message}")
+        print(f"Import error: {message}", file=sys.stderr)
+        self.import_thread.quit()
+
     def browse_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSONL File", "", "JSONL Files (*.jsonl)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSONL File", "", "JSONL Files (*.jsonl *.jsonl.gz *.jsonl.bz2 *.jsonl.zst);;All Files (*)")
         if file_path:
             self.local_path_input.setText(file_path)
             self.load_local_file()
 
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Open JSONL Folder")
+        if folder:
+            self.local_path_input.setText(folder)
+            self.load_local_file()
+
     def load_local_file(self):
         file_path = self.local_path_input.text().strip()
         if not file_path:
@@ -308,151 +1629,918 @@ class JSONLViewer(QWidget):
         self.load_file(file_path, local=False, creds=creds)
 
     def load_file(self, file_path, local=True, creds=None):
-        try:
-            if local:
-                if not os.path.exists(file_path):
-                    QMessageBox.critical(self, "Error", f"File does not exist: {file_path}")
-                    return
-                # 파일이 비어있는지 확인
-                if os.path.getsize(file_path) == 0:
-                    QMessageBox.warning(self, "Warning", "The selected file is empty.")
-                    return
-                df = pd.read_json(file_path, lines=True)
-            else:
-                df = self.read_remote_jsonl(file_path, creds)
-                if df.empty:
-                    QMessageBox.warning(self, "Warning", "The remote file is empty or could not be parsed.")
-                    return
+        lazy = False
+        preview = self.preview_combo.currentData()
+        if preview is not None:
+            dataset = local and core.is_dataset_path(file_path)
+            if local and not dataset and not os.path.exists(file_path):
+                QMessageBox.critical(self, "Error", f"File does not exist: {file_path}")
+                return
+            self.start_loading(LoadWorker(file_path, local=local, creds=creds, dataset=dataset, preview=preview,
+                                          preview_rows=self.preview_rows_input.value()))
+            return
+        if local and core.is_dataset_path(file_path):
+            # 여러 shard는 항상 인덱스 기반으로 읽음 (Arrow/전체 로딩 옵션은 단일 파일에만 적용)
+            self.start_loading(LoadWorker(file_path, local=True, lazy=True, dataset=True))
+            return
+        if local:
+            if not os.path.exists(file_path):
+                QMessageBox.critical(self, "Error", f"File does not exist: {file_path}")
+                return
+            # 파일이 비어있는지 확인
+            file_size = os.path.getsize(file_path)
+            if file_size == 0:
+                QMessageBox.warning(self, "Warning", "The selected file is empty.")
+                return
+            lazy = self.lazy_load_checkbox.isChecked() or file_size >= LAZY_LOAD_THRESHOLD
+        else:
+            lazy = self.remote_lazy_checkbox.isChecked()
+        # 인덱스 기반 원격 로딩은 보는 행의 구간만 읽으므로 파일 전체를 내려받지 않음
+        # 원격 파일은 로컬 캐시가 있어야 Parquet로 변환할 수 있으므로 Arrow를 고르면 캐시를 씀
+        use_cache = not local and self.remote_cache_checkbox.isChecked() and (self.arrow_checkbox.isChecked() or not lazy)
+        arrow = self.arrow_checkbox.isChecked() and (local or use_cache)
+        self.start_loading(LoadWorker(file_path, local=local, creds=creds, lazy=lazy,
+                                      use_cache=use_cache, arrow=arrow,
+                                      follow=self.follow_checkbox.isChecked()))
+
+    def start_loading(self, worker):
+        self.cancel_loading(wait=True)
+        self.cancel_search(wait=True)
+        self.cancel_query(wait=True)
+        # 내보내는 중인 프레임은 새 파일을 열면서 닫히므로 먼저 멈춤
+        self.cancel_export(wait=True)
+        self.virtual_model.setFrame(None)
+        self.virtual_model.cancel_fetch(wait=True)
+        self.stop_follow()
+        # 미리보기의 통계는 파일 전체의 통계가 아니므로 저장하지 않음
+        self.reset_stats(None if worker.preview else
+                         core.DatasetStats.sidecar_path(worker.file_path, None if worker.local else worker.creds))
+        self.stats_streaming = self.stats_checkbox.isChecked() and not (worker.lazy or worker.arrow)
+        self.loaded_source = None
+        self.query_status_label.setText("")
+        self.search_hits = []
+        self.search_target = None
+        self._search_cache = {}
+        self.search_status_label.setText("")
+        self.close_frames()
+        self.original_df = pd.DataFrame()
+        self.display_df = pd.DataFrame()
+        self.history = core.ViewHistory()
+        self.update_history_buttons()
+        self._pending_chunks = []
+        self._loaded_rows = 0
+        self._followed_chunks = []
+        self.model.setDataFrame(self.display_df)
+        self.columns_list.clear()
+        self.current_page = 1
+        self.pandas_text.clear()  # 데이터 로드 시 pandas 명령어 초기화
+
+        self.load_worker = worker
+        self.loading = True
+        worker.moveToThread(self.load_thread)
+        worker.chunk_loaded.connect(lambda df: self.on_chunk_loaded(worker, df))
+        worker.frame_ready.connect(lambda frame: self.on_frame_ready(worker, frame))
+        worker.progress.connect(lambda done, total, rows: self.on_load_progress(worker, done, total, rows))
+        worker.failed.connect(lambda title, message: self.on_load_failed(worker, title, message))
+        worker.finished.connect(lambda: self.on_load_finished(worker))
+        worker.finished.connect(self.load_thread.quit)
+
+        self.set_loading_controls_enabled(False)
+        self.load_progress.setValue(0)
+        self.load_status_label.setText("Loading...")
+        self.perf.start('load')
+        self.load_thread.start()
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def cancel_loading(self, wait=False):
+        if self.loading:
+            self.load_worker.cancel()
+        if wait:
+            self.load_thread.quit()
+            self.load_thread.wait()
+
+    def set_loading_controls_enabled(self, enabled):
+        self.local_load_button.setEnabled(enabled)
+        self.remote_load_button.setEnabled(enabled)
+        self.apply_columns_button.setEnabled(enabled)
+        self.apply_pandas_button.setEnabled(enabled)
+        self.update_history_buttons(enabled)
+        self.query_button.setEnabled(enabled)
+        self.export_button.setEnabled(enabled and not self.exporting)
+        self.load_progress.setVisible(not enabled)
+        self.cancel_load_button.setVisible(not enabled)
+
+    def on_load_progress(self, worker, bytes_done, bytes_total, rows_done):
+        if worker is not self.load_worker:
+            return
+        if bytes_total:
+            self.load_progress.setValue(int(bytes_done * 1000 / bytes_total))
+        text = f"{core.format_bytes(bytes_done)} / {core.format_bytes(bytes_total)}"
+        if rows_done:
+            text = f"{rows_done:,} rows, " + text
+        self.load_status_label.setText(text)
+
+    def on_chunk_loaded(self, worker, df):
+        if worker is not self.load_worker:
+            return
+        first_chunk = self._loaded_rows == 0
+        if self.stats_streaming:
+            self.queue_stats(core.PandasFrame(df), self._loaded_rows)
+        self._pending_chunks.append(df)
+        self._loaded_rows += len(df)
+        if first_chunk:
+            self.display_df = df
+            self.setup_columns()
+        # 첫 페이지가 찰 때까지는 모델에 행을 점진적으로 추가
+        rows_per_page = int(self.rows_per_page_combo.currentText())
+        shown = self.model.rowCount()
+        if self.continuous_checkbox.isChecked():
+            if first_chunk:
+                self.show_page()
+        elif self.current_page == 1 and shown < rows_per_page:
+            self.model.appendDataFrame(df.iloc[:rows_per_page - shown])
+            if first_chunk:
+                self.table_view.resizeColumnsToContents()
+                self.table_view.horizontalHeader().setStretchLastSection(True)
+            self.table_view.resizeRowsToContents()
+        self.rows_per_page = rows_per_page
+        self.total_pages = max(1, (self._loaded_rows + rows_per_page - 1) // rows_per_page)
+        self.page_label.setText(f"Page {self.current_page} of {self.total_pages} (loading...)")
+
+    def on_frame_ready(self, worker, frame):
+        if worker is not self.load_worker:
+            frame.close()
+            return
+        self.original_frame = frame
+        self.display_frame = frame
+        self.setup_columns()
+        self.update_pagination()
 
-            self.original_df = df
-            self.display_df = self.original_df.copy()
-            self.previous_display_df = self.display_df.copy()  # 초기 상태 저장
+    def flush_pending_chunks(self):
+        # 로딩 중 받은 청크를 original_df/display_df에 합침
+        self.merge_followed_rows()
+        if not self._pending_chunks:
+            return
+        frames = [self.original_df] if not self.original_df.empty else []
+        self.original_df = pd.concat(frames + self._pending_chunks, ignore_index=True)
+        self._pending_chunks = []
+        self.display_df = self.original_df
+
+    def on_load_failed(self, worker, title, message):
+        if worker is not self.load_worker:
+            return
+        QMessageBox.critical(self, title, message)
+        print(f"{title}: {message}", file=sys.stderr)
+
+    def on_load_finished(self, worker):
+        # finished는 워커가 마지막으로 보내는 시그널이므로 여기서 연결을 끊어 워커를 해제
+        worker.disconnect()
+        if worker is not self.load_worker:
+            return
+        self.loading = False
+        self.perf.stop('load', record=not (worker.cancelled or worker.error))
+        self.set_loading_controls_enabled(True)
+        if worker.use_cache:
+            self.cache_stats_label.setText(core.remote_cache.summary())
+        self.stats_streaming = False
+        if worker.error:
+            self.load_status_label.setText("")
+            self.update_pagination()
+            return
+        following = self.follow_checkbox.isChecked()
+        if not worker.cancelled:
+            # follow 모드는 여기까지 읽은 바이트 오프셋부터 이어서 읽음
+            self.loaded_source = {
+                'path': worker.file_path, 'local': worker.local, 'creds': worker.creds,
+                'lazy': worker.lazy, 'use_cache': worker.use_cache, 'arrow': worker.arrow,
+                'size': worker.file_size, 'dataset': worker.dataset, 'preview': worker.preview,
+                'mtime_ns': worker.signature[0] if worker.signature else None,
+                'head': worker.signature[1] if worker.signature else None,
+            }
+            self.start_follow()
+        if self.original_frame is not None:
+            verb = "Indexed" if isinstance(self.original_frame, (core.LazyJSONLFrame, core.ShardedFrame)) else "Loaded"
+            shards = len(self.original_frame.shards) if isinstance(self.original_frame, core.ShardedFrame) else 0
+            self.load_status_label.setText(f"{verb} {len(self.original_frame):,} rows"
+                                           + (f" from {shards:,} files" if shards else ""))
+            self.update_stats()
+            if len(self.original_frame) == 0:
+                if not following:
+                    QMessageBox.warning(self, "Warning", "The selected file has no records.")
+            elif not worker.cancelled:
+                self.restore_history(worker)
+            return
+        columns = list(self.display_df.columns)
+        self.flush_pending_chunks()
+        self.update_stats()
+        if worker.cancelled:
+            self.load_status_label.setText(f"Loading cancelled after {len(self.original_df):,} rows")
+        elif worker.preview:
+            self.load_status_label.setText(PREVIEW_STATUS[worker.preview].format(len(self.original_df)))
+        else:
+            self.load_status_label.setText(f"Loaded {len(self.original_df):,} rows")
+        if self.original_df.empty:
+            self.update_pagination()
+            if not worker.cancelled and not following:
+                QMessageBox.warning(self, "Warning", "The file is empty or could not be parsed.")
+            return
+        if list(self.display_df.columns) != columns or self.continuous_checkbox.isChecked():
+            # 뒤쪽 청크에서 새 컬럼이 나타난 경우
             self.setup_columns()
-            self.current_page = 1
             self.update_pagination()
-            self.pandas_text.clear()  # 데이터 로드 시 pandas 명령어 초기화
-        except ValueError as ve:
-            QMessageBox.critical(self, "Error", f"JSON parsing error:\n{str(ve)}")
-            print(f"JSON parsing error: {ve}", file=sys.stderr)
-        except Exception as e:
-            # 에러 메시지를 더 명확히 표시하고 로그에 출력
-            QMessageBox.critical(self, "Error", f"Failed to load file:\n{str(e)}")
-            print(f"Error loading file: {e}", file=sys.stderr)
+        else:
+            rows_per_page = int(self.rows_per_page_combo.currentText())
+            if self.model.rowCount() < min(rows_per_page, len(self.display_df)):
+                self.update_pagination()
+            else:
+                self.total_pages = max(1, (len(self.display_df) + rows_per_page - 1) // rows_per_page)
+                self.page_label.setText(f"Page {self.current_page} of {self.total_pages}")
+        if not worker.cancelled:
+            self.restore_history(worker)
+
+    def close_frames(self):
+        if self.original_frame is not None:
+            self.original_frame.close()
+        self.original_frame = None
+        self.display_frame = None
+
+    def closeEvent(self, event):
+        if not self.data_ready:
+            # import가 끝나기 전에 닫은 경우 (로드된 데이터나 연결이 아직 없음)
+            self.import_thread.quit()
+            self.import_thread.wait()
+            super().closeEvent(event)
+            return
+        self.cancel_loading(wait=True)
+        self.cancel_search(wait=True)
+        self.cancel_query(wait=True)
+        self.cancel_stats(wait=True)
+        self.cancel_export(wait=True)
+        self.virtual_model.cancel_fetch(wait=True)
+        self.stop_follow()
+        self.close_frames()
+        core.ssh_pool.close_all()
+        core.shutdown_parse_pool()
+        super().closeEvent(event)
+
+    def search_target_object(self):
+        return self.display_frame if self.display_frame is not None else self.display_df
+
+    def start_search(self):
+        text = self.search_input.text()
+        if not text:
+            QMessageBox.warning(self, "Warning", "Please enter a search term.")
+            return
+        fields = [field.strip() for field in self.search_fields_input.text().split(',') if field.strip()]
+        try:
+            query = core.SearchQuery(text, regex=self.search_regex_checkbox.isChecked(),
+                                case_sensitive=self.search_case_checkbox.isChecked(), fields=fields)
+        except re.error as e:
+            QMessageBox.warning(self, "Warning", f"Invalid regular expression:\n{str(e)}")
+            return
+        self.cancel_search(wait=True)
+        self.flush_pending_chunks()
+        target = self.search_target_object()
+        if target is not self.search_target:
+            self._search_cache = {}
+            self.search_target = target
+        self.search_hits = []
+        self.search_pos = -1
+
+        # 같은 보기에서 같은 검색을 반복하면 저장된 결과를 바로 사용
+        cached = self._search_cache.get(query.key())
+        if cached is not None:
+            self.search_hits = cached
+            self.goto_hit(1)
+            return
 
-    def read_remote_jsonl(self, path, creds):
+        worker = SearchWorker(self.current_frame(), query)
+        self.search_worker = worker
+        self.searching = True
+        worker.moveToThread(self.search_thread)
+        worker.hits_found.connect(lambda hits: self.on_search_hits(worker, hits))
+        worker.progress.connect(lambda done, total: self.on_search_progress(worker, done, total))
+        worker.failed.connect(lambda message: self.on_search_failed(worker, message))
+        worker.finished.connect(lambda: self.on_search_finished(worker))
+        worker.finished.connect(self.search_thread.quit)
+        self.search_status_label.setText("Searching...")
+        self.perf.start('search')
+        self.search_thread.start()
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def cancel_search(self, wait=False):
+        if self.searching:
+            self.search_worker.cancel()
+        if wait:
+            self.search_thread.quit()
+            self.search_thread.wait()
+
+    def on_search_hits(self, worker, hits):
+        if worker is not self.search_worker:
+            return
+        self.search_hits.extend(hits)
+        if self.search_pos == -1:
+            self.goto_hit(1)
+
+    def on_search_progress(self, worker, done, total):
+        if worker is not self.search_worker:
+            return
+        percent = int(done * 100 / total) if total else 100
+        self.search_status_label.setText(f"Searching... {percent}% ({len(self.search_hits):,} hits)")
+
+    def on_search_failed(self, worker, message):
+        if worker is not self.search_worker:
+            return
+        self.perf.stop('search', record=False)
+        QMessageBox.critical(self, "Error", f"Search failed:\n{message}")
+        print(f"Search failed: {message}", file=sys.stderr)
+
+    def on_search_finished(self, worker):
+        worker.disconnect()
+        if worker is not self.search_worker:
+            return
+        self.searching = False
+        self.perf.stop('search', record=not worker.cancelled)
+        if not worker.cancelled:
+            self._search_cache[worker.query.key()] = self.search_hits
+        if not self.search_hits:
+            self.search_status_label.setText("No matches")
+        elif self.search_pos >= 0:
+            self.search_status_label.setText(f"Hit {self.search_pos + 1} of {len(self.search_hits):,}")
+
+    def start_query(self):
+        text = self.query_input.text().strip()
+        if not text:
+            QMessageBox.warning(self, "Warning", "Please enter a query.")
+            return
         try:
-            hostname = creds['hostname']
-            port = creds['port']
-            username = creds['username']
-            password = creds['password']
+            query = core.TableQuery(text)
+        except (ValueError, SyntaxError, re.error) as e:
+            QMessageBox.warning(self, "Warning", f"Invalid query:\n{str(e)}")
+            return
+        if self.original_frame is None and self.original_df.empty and not self._pending_chunks:
+            QMessageBox.warning(self, "Warning", "No data loaded.")
+            return
+        self.start_query_worker(query)
+
+    def start_query_worker(self, query, replay=None):
+        self.cancel_query(wait=True)
+        self.flush_pending_chunks()
+        # 항상 원본(파일/Arrow 테이블/전체 DataFrame)을 대상으로 실행
+        source = self.original_frame if self.original_frame is not None else core.PandasFrame(self.original_df)
+
+        worker = QueryWorker(source, query, replay)
+        self.query_worker = worker
+        self.querying = True
+        worker.moveToThread(self.query_thread)
+        worker.result_ready.connect(lambda rows: self.on_query_result(worker, rows))
+        worker.progress.connect(lambda done, total: self.on_query_progress(worker, done, total))
+        worker.failed.connect(lambda message: self.on_query_failed(worker, message))
+        worker.finished.connect(lambda: self.on_query_finished(worker))
+        worker.finished.connect(self.query_thread.quit)
+        self.query_status_label.setText("Running query...")
+        self.query_button.setEnabled(False)
+        self.cancel_query_button.setVisible(True)
+        self.perf.start('query')
+        self.query_thread.start()
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def cancel_query(self, wait=False):
+        if self.querying:
+            self.query_worker.cancel()
+        if wait:
+            self.query_thread.quit()
+            self.query_thread.wait()
+
+    def on_query_progress(self, worker, done, total):
+        if worker is not self.query_worker:
+            return
+        percent = int(done * 100 / total) if total else 100
+        self.query_status_label.setText(f"Running query... {percent}%")
 
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(hostname, port=port, username=username, password=password)
+    def on_query_result(self, worker, rows):
+        if worker is not self.query_worker or worker.cancelled:
+            return
+        state = (core.RowSubsetFrame(worker.frame, rows, worker.query.columns), self.original_df)
+        if worker.replay is not None:
+            history, index, _, _ = worker.replay
+            history.states[index] = state
+            return
+        self.push_history({'op': 'query', 'text': worker.query.text}, state)
 
-            sftp = ssh.open_sftp()
-            try:
-                with sftp.file(path, 'r') as remote_file:
-                    lines = remote_file.readlines()
-            except FileNotFoundError:
-                QMessageBox.critical(self, "Error", f"Remote file does not exist: {path}")
-                return pd.DataFrame()
-            finally:
-                sftp.close()
-                ssh.close()
-
-            # Decode bytes to string if necessary
-            if lines and isinstance(lines[0], bytes):
-                lines = [line.decode('utf-8') for line in lines]
-
-            if not lines:
-                # 파일이 비어있는 경우
-                return pd.DataFrame()
-
-            from io import StringIO
-            data = ''.join(lines)
-            df = pd.read_json(StringIO(data), lines=True)
-            return df
-        except paramiko.AuthenticationException:
-            QMessageBox.critical(self, "Authentication Error", "SSH Authentication failed. Please check your credentials.")
-            return pd.DataFrame()
-        except paramiko.SSHException as e:
-            QMessageBox.critical(self, "SSH Error", f"SSH connection failed:\n{str(e)}")
-            return pd.DataFrame()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read remote file:\n{str(e)}")
-            return pd.DataFrame()
+    def on_query_failed(self, worker, message):
+        if worker is not self.query_worker:
+            return
+        self.query_status_label.setText("Query failed")
+        self.perf.stop('query', record=False)
+        QMessageBox.critical(self, "Error", f"Query failed:\n{message}")
+        print(f"Query failed: {message}", file=sys.stderr)
+
+    def on_query_finished(self, worker):
+        worker.disconnect()
+        if worker is not self.query_worker:
+            return
+        self.querying = False
+        self.perf.stop('query', record=not worker.cancelled)
+        self.query_button.setEnabled(not self.loading)
+        self.cancel_query_button.setVisible(False)
+        if worker.cancelled:
+            self.query_status_label.setText("Query cancelled")
+        elif worker.replay is not None:
+            # 이 워커가 보낸 스레드 종료 요청이 처리된 뒤에 이어서 재생 (바로 시작하면 다음 쿼리의 스레드가 멈춤)
+            QTimer.singleShot(0, lambda: self.continue_replay(worker.replay))
+
+    def continue_replay(self, replay):
+        history, index, position, run_pandas = replay
+        # 그 사이에 다른 파일을 열었거나 보기를 바꿨으면 이어서 적용하지 않음
+        if history is self.history and history.position == index and history.states[index] is not None \
+                and not self.querying:
+            self.move_history(position, run_pandas)
+
+    def set_stats_enabled(self, enabled):
+        if not enabled:
+            # 계산한 부분까지는 남겨두고 다시 켜면 이어서 계산
+            self.cancel_stats(wait=True)
+            self.stats_jobs.clear()
+            self.update_stats_label()
+            return
+        if not self.stats.rows and self.stats.sidecar is not None:
+            self.stats = core.DatasetStats.load(self.stats.sidecar)
+            self.show_stats(self.stats.summary())
+        self.update_stats()
+
+    def reset_stats(self, sidecar=None, cached=True):
+        self.cancel_stats(wait=True)
+        self.stats_jobs.clear()
+        if cached and sidecar is not None and self.stats_checkbox.isChecked():
+            self.stats = core.DatasetStats.load(sidecar)
+        else:
+            self.stats = core.DatasetStats(sidecar)
+        self.show_stats(self.stats.summary())
+
+    def stats_source(self):
+        return self.original_frame if self.original_frame is not None else core.PandasFrame(self.original_df)
+
+    def update_stats(self):
+        # 원본에서 아직 통계에 반영하지 않은 뒤쪽 행만 계산 (캐시된 통계나 이전 계산에 이어서)
+        if not self.stats_checkbox.isChecked() or self.loading:
+            return
+        source = self.stats_source()
+        loaded = self.loaded_source or {}
+        if not self.stats.fits(loaded.get('size'), len(source), loaded.get('mtime_ns'), loaded.get('head')):
+            self.reset_stats(self.stats.sidecar, cached=False)
+        if self.stats.rows < len(source):
+            self.queue_stats(source, 0)
+        else:
+            self.update_stats_label()
+
+    def queue_stats(self, frame, offset):
+        self.stats_jobs.append((frame, offset))
+        if not self.stats_running:
+            self.start_stats_worker()
+
+    def start_stats_worker(self):
+        worker = StatsWorker(self.stats, self.stats_jobs)
+        self.stats_worker = worker
+        self.stats_running = True
+        worker.moveToThread(self.stats_thread)
+        worker.updated.connect(lambda summary: self.on_stats_updated(worker, summary))
+        worker.failed.connect(lambda message: self.on_stats_failed(worker, message))
+        worker.finished.connect(lambda: self.on_stats_finished(worker))
+        worker.finished.connect(self.stats_thread.quit)
+        self.update_stats_label()
+        self.perf.start('stats')
+        self.stats_thread.start()
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def cancel_stats(self, wait=False):
+        if self.stats_running:
+            self.stats_worker.cancel()
+        if wait:
+            self.stats_thread.quit()
+            self.stats_thread.wait()
+
+    def on_stats_updated(self, worker, summary):
+        if worker is not self.stats_worker or worker.cancelled:
+            return
+        self.show_stats(summary)
+
+    def on_stats_failed(self, worker, message):
+        if worker is not self.stats_worker:
+            return
+        self.stats_jobs.clear()
+        self.perf.stop('stats', record=False)
+        self.stats_label.setText("Column Stats: failed")
+        QMessageBox.critical(self, "Error", f"Column statistics failed:\n{message}")
+        print(f"Column statistics failed: {message}", file=sys.stderr)
+
+    def on_stats_finished(self, worker):
+        worker.disconnect()
+        if worker is not self.stats_worker:
+            return
+        self.perf.stop('stats', record=not worker.cancelled)
+        if self.stats_jobs:
+            # 워커가 끝나는 사이에 추가된 구간 (캐시가 맞지 않아 취소하고 처음부터 다시 계산하는 경우 포함)
+            # 이 워커가 보낸 스레드 종료 요청이 처리된 뒤에 다시 시작해야 새 워커가 멈추지 않음
+            QTimer.singleShot(0, self.start_stats_worker)
+            return
+        self.stats_running = False
+        if worker.cancelled:
+            self.update_stats_label()
+            return
+        self.show_stats(self.stats.summary())
+        if self.loaded_source is not None and not self.loading and self.stats.rows == len(self.stats_source()):
+            source = self.loaded_source
+            self.stats.save(source['size'], source['mtime_ns'], source['head'])
+
+    def update_stats_label(self):
+        text = f"Column Stats: {self.stats.rows:,} rows" if self.stats.rows else "Column Stats:"
+        if self.stats_running:
+            text += " (computing...)"
+        self.stats_label.setText(text)
+
+    def show_stats(self, summary):
+        columns = summary['columns']
+        self.stats_table.setRowCount(len(columns))
+        for row, column in enumerate(columns):
+            for col, (text, tooltip) in enumerate(stats_cells(column)):
+                item = QTableWidgetItem(text)
+                if tooltip:
+                    item.setToolTip(tooltip)
+                self.stats_table.setItem(row, col, item)
+        self.update_stats_label()
+
+    def goto_hit(self, step):
+        if not self.search_hits:
+            return
+        if self.search_target_object() is not self.search_target:
+            self.search_status_label.setText("The view has changed; search again")
+            return
+        self.search_pos = (self.search_pos + step) % len(self.search_hits)
+        self.goto_row(self.search_hits[self.search_pos])
+        suffix = " (searching...)" if self.searching else ""
+        self.search_status_label.setText(f"Hit {self.search_pos + 1} of {len(self.search_hits):,}{suffix}")
 
     def setup_columns(self):
         self.columns_list.clear()
-        for col in self.display_df.columns:
-            item = QListWidgetItem(col)
-            item.setSelected(True)
+        frame = self.current_frame()
+        try:
+            with self.perf.measure('schema'):
+                schema = frame.schema(self.schema_sample_input.value())
+        except Exception as e:
+            print(f"Error inferring schema: {e}", file=sys.stderr)
+            schema = {}
+        selected = set(frame.columns)
+        # 샘플에 없는 선택 컬럼(예: 뒤쪽에만 나타나는 키)도 목록에 유지
+        paths = list(schema) + [col for col in frame.columns if col not in schema]
+        for path in paths:
+            item = QListWidgetItem(str(path))
+            types = schema.get(path)
+            if types:
+                item.setToolTip(", ".join(sorted(types)))
             self.columns_list.addItem(item)
+            item.setSelected(path in selected)
 
     def apply_columns(self):
         selected_items = self.columns_list.selectedItems()
         selected_columns = [item.text() for item in selected_items]
         if not selected_columns:
             QMessageBox.warning(self, "Warning", "No columns selected. Displaying all columns.")
-            self.display_df = self.original_df.copy()
-        else:
+        elif self.original_frame is None and not isinstance(self.display_frame, core.RowSubsetFrame):
             # 존재하지 않는 컬럼을 선택한 경우 예외 처리
-            invalid_cols = [col for col in selected_columns if col not in self.original_df.columns]
+            invalid_cols = [col for col in selected_columns
+                            if not core.root_columns([col], self.original_df.columns)]
             if invalid_cols:
                 QMessageBox.warning(self, "Warning", f"The following columns do not exist and will be ignored:\n{', '.join(invalid_cols)}")
-                selected_columns = [col for col in selected_columns if col in self.original_df.columns]
-            self.display_df = self.original_df[selected_columns].copy()
-        self.previous_display_df = self.display_df.copy()  # 상태 저장
-        self.current_page = 1
-        self.update_pagination()
+                selected_columns = [col for col in selected_columns if col not in invalid_cols]
+        entry = {'op': 'columns', 'columns': selected_columns}
+        with self.perf.measure('columns'):
+            state = self.replay_entry(self.current_state(), entry)
+        self.push_history(entry, state)
+
+    def select_columns(self, state, columns):
+        frame, _ = state
+        if isinstance(frame, core.RowSubsetFrame):
+            # 쿼리 결과는 유지하고 컬럼만 바꿈
+            return frame.select(columns or None), self.original_df
+        if self.original_frame is not None:
+            return (self.original_frame.select(columns) if columns else self.original_frame), self.original_df
+        columns = [col for col in columns if core.root_columns([col], self.original_df.columns)]
+        if not columns:
+            return None, self.original_df
+        if all(col in self.original_df.columns for col in columns):
+            return None, self.original_df[columns]
+        # 중첩 경로는 페이지 단위로 꺼내도록 프레임으로 감쌈
+        return core.PandasFrame(self.original_df).select(columns), self.original_df
 
     def apply_pandas_commands(self):
         commands = self.pandas_text.toPlainText()
         if not commands.strip():
             QMessageBox.warning(self, "Warning", "No commands entered.")
             return
+        if isinstance(self.display_frame, (core.LazyJSONLFrame, core.ShardedFrame)):
+            QMessageBox.warning(self, "Warning", "Pandas commands need the whole file in memory. Run a query to narrow the rows first, or reload it without indexed loading.")
+            return
+        entry = {'op': 'pandas', 'commands': commands}
         try:
-            # pandas 명령어 적용 전 현재 상태 저장
-            self.previous_display_df = self.display_df.copy()
-
-            # 안전한 eval 환경 설정
-            allowed_names = {"df": self.display_df, "pd": pd}
-            result = eval(commands, {"__builtins__": {}}, allowed_names)
-            if isinstance(result, pd.DataFrame):
-                self.display_df = result
-                self.setup_columns()
-                self.current_page = 1
-                self.update_pagination()
-            else:
-                QMessageBox.warning(self, "Warning", "The command did not return a DataFrame.")
+            with self.perf.measure('pandas'):
+                state = self.replay_entry(self.current_state(), entry)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to execute commands:\n{str(e)}")
             print(f"Error executing pandas commands: {e}", file=sys.stderr)
-
-    def reset_pandas_commands(self):
-        if not self.previous_display_df.empty:
-            self.display_df = self.previous_display_df.copy()
-            self.setup_columns()
-            self.current_page = 1
-            self.update_pagination()
-            self.pandas_text.clear()  # pandas 명령어 입력창 초기화
-            QMessageBox.information(self, "Info", "Pandas commands have been reset to the previous state.")
+            return
+        self.push_history(entry, state)
+
+    def run_pandas_commands(self, state, commands):
+        frame, df = state
+        if frame is not None:
+            df = frame.to_pandas()
+        # 안전한 eval 환경 설정
+        allowed_names = {"df": df, "pd": importlib.import_module('pandas')}
+        result = eval(commands, {"__builtins__": {}}, allowed_names)
+        if not isinstance(result, pd.DataFrame):
+            raise ValueError("The command did not return a DataFrame.")
+        return None, result
+
+    def replay_entry(self, state, entry):
+        # 이전 상태 (display_frame, display_df)에 변환 하나를 적용한 상태
+        op = entry['op']
+        if op == 'columns':
+            return self.select_columns(state, entry['columns'])
+        if op == 'pandas':
+            return self.run_pandas_commands(state, entry['commands'])
+        if op == 'reset':
+            return self.original_frame, self.original_df
+        raise ValueError(f"Unknown history entry: {op}")
+
+    def current_state(self):
+        self.flush_pending_chunks()
+        return self.display_frame, self.display_df
+
+    def history_state(self, position, run_pandas=True):
+        # position 앞에서 가장 가까운 캐시된 상태부터 변환을 다시 적용해서 (상태, 도달한 위치)를 반환
+        # 결과가 없는 쿼리는 QueryWorker로 실행해야 하므로 그 앞에서 멈춤. run_pandas가 False면 pandas 명령어 앞에서도 멈춤
+        start = position
+        while start > 0 and self.history.states[start - 1] is None:
+            start -= 1
+        state = self.history.states[start - 1] if start > 0 else (self.original_frame, self.original_df)
+        for i in range(start, position):
+            entry = self.history.entries[i]
+            if entry['op'] == 'query' or (entry['op'] == 'pandas' and not run_pandas):
+                return state, i
+            state = self.replay_entry(state, entry)
+            self.history.states[i] = state
+        return state, position
+
+    def set_state(self, state):
+        self.display_frame, self.display_df = state
+        if isinstance(self.display_frame, core.RowSubsetFrame):
+            self.query_status_label.setText(f"{len(self.display_frame):,} of {len(self.display_frame.source):,} rows")
         else:
-            QMessageBox.warning(self, "Warning", "No previous state to revert to.")
-
-    def reset_data(self):
-        self.display_df = self.original_df.copy()
-        self.previous_display_df = self.display_df.copy()  # 상태 저장
+            self.query_status_label.setText("")
         self.setup_columns()
         self.current_page = 1
         self.update_pagination()
+        self.update_history_buttons()
+
+    def push_history(self, entry, state):
+        self.history.push(entry, state)
+        self.set_state(state)
+
+    def move_history(self, position, run_pandas=True):
+        if self.querying and self.query_worker.replay is not None:
+            # 앞선 이동에서 시작한 쿼리는 더 이상 필요 없음
+            self.cancel_query(wait=True)
+        try:
+            state, reached = self.history_state(position, run_pandas)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to replay history:\n{str(e)}")
+            print(f"Error replaying history: {e}", file=sys.stderr)
+            return
+        self.history.move(reached)
+        self.set_state(state)
+        if reached == position:
+            return
+        entry = self.history.entries[reached]
+        if entry['op'] == 'query':
+            # 결과가 끝나면 on_query_finished에서 나머지 기록을 이어서 적용
+            self.start_query_worker(core.TableQuery(entry['text']), replay=(self.history, reached, position, run_pandas))
+        else:
+            self.load_status_label.setText("Saved pandas commands were not re-run; press Redo to run them")
+
+    def undo(self):
+        if self.history.can_undo():
+            self.move_history(self.history.position - 1)
+
+    def redo(self):
+        if self.history.can_redo():
+            self.move_history(self.history.position + 1)
+
+    def set_follow_mode(self, enabled):
+        if enabled:
+            self.start_follow()
+        else:
+            self.stop_follow()
+
+    def start_follow(self):
+        self.stop_follow()
+        source = self.loaded_source
+        if source is None or self.loading or not self.follow_checkbox.isChecked():
+            return
+        if core.compression_of(source['path']):
+            self.load_status_label.setText("Follow mode is not available for compressed files")
+            return
+        if source['dataset']:
+            self.load_status_label.setText("Follow mode is not available for multi-file datasets")
+            return
+        if source['preview']:
+            self.load_status_label.setText("Follow mode is not available for previews")
+            return
+        # 인덱스 기반 프레임은 줄 오프셋만, 나머지는 파싱한 행을 받음
+        worker = FollowWorker(source['path'], source['size'], local=source['local'], creds=source['creds'],
+                              parse=not isinstance(self.original_frame, core.LazyJSONLFrame),
+                              use_cache=source['use_cache'])
+        self.follow_worker = worker
+        worker.moveToThread(self.follow_thread)
+        worker.appended.connect(lambda starts, df, offset, mtime_ns:
+                                self.on_follow_appended(worker, starts, df, offset, mtime_ns))
+        worker.reset.connect(lambda reason: self.on_follow_reset(worker, reason))
+        worker.failed.connect(lambda message: self.on_follow_failed(worker, message))
+        worker.polled.connect(lambda: self.on_follow_polled(worker))
+        self.follow_thread.start()
+        if source['local']:
+            # inotify 등 파일 변경 알림. 교체되면 감시가 풀리므로 보조 폴링도 함께 사용
+            self.follow_watcher.addPath(source['path'])
+            self.follow_timer.start(FOLLOW_LOCAL_POLL_MS)
+        else:
+            self.follow_timer.start(FOLLOW_REMOTE_POLL_MS)
+        self.poll_follow()
+
+    def stop_follow(self):
+        self.follow_timer.stop()
+        if self.follow_watcher.files():
+            self.follow_watcher.removePaths(self.follow_watcher.files())
+        if self.follow_worker is not None:
+            self.follow_worker = None
+            self.follow_thread.quit()
+            self.follow_thread.wait()
+        self.follow_polling = False
+        self.follow_pending = False
+
+    def poll_follow(self):
+        worker = self.follow_worker
+        if worker is None:
+            return
+        if self.follow_polling:
+            # 읽는 중에 들어온 변경 알림은 끝나고 한 번 더 확인
+            self.follow_pending = True
+            return
+        self.follow_polling = True
+        self.follow_pending = False
+        if self.loaded_source['local'] and not self.follow_watcher.files() and os.path.exists(worker.file_path):
+            self.follow_watcher.addPath(worker.file_path)
+        QMetaObject.invokeMethod(worker, "poll", Qt.QueuedConnection)
+
+    def on_follow_polled(self, worker):
+        if worker is not self.follow_worker:
+            return
+        self.follow_polling = False
+        if self._followed_chunks and not self.followed_snapshot() and self.viewing_end():
+            # 모아둔 행이 있는 상태에서 끝으로 옮겼으면 보여줌
+            self.refresh_followed_view(0)
+        if self.follow_pending:
+            self.poll_follow()
+
+    def on_follow_appended(self, worker, starts, df, offset, mtime_ns):
+        if worker is not self.follow_worker:
+            return
+        self.loaded_source['size'] = offset
+        self.loaded_source['mtime_ns'] = mtime_ns
+        rows = len(starts)
+        if not rows:
+            return
+        frame = self.original_frame
+        if isinstance(frame, core.LazyJSONLFrame):
+            frame.extend(starts, offset)
+            if not frame.columns:
+                # 빈 파일에서 시작한 경우 첫 행들로 컬럼을 정함
+                frame.columns = frame.infer_columns()
+        elif isinstance(frame, core.ArrowFrame):
+            try:
+                self.original_frame = frame.append(df)
+            except (core.pa.ArrowInvalid, core.pa.ArrowTypeError) as e:
+                self.on_follow_reset(worker, f"The new rows do not fit the Arrow schema ({e})")
+                return
+            frame.close()
+        else:
+            # 폴링마다 전체를 다시 합치지 않고 모아뒀다가 새 행이 보여야 할 때 한 번에 합침
+            self._followed_chunks.append(df)
+        self.refresh_followed_view(rows)
+        self.update_stats()
+
+    def followed_snapshot(self):
+        # 쿼리/pandas 결과는 원본에 행이 추가되어도 그대로 두는 스냅샷
+        position = self.history.position
+        return isinstance(self.display_frame, core.RowSubsetFrame) or \
+            bool(position and self.history.entries[position - 1]['op'] == 'pandas')
+
+    def merge_followed_rows(self):
+        # 모아둔 follow 행을 original_df에 합치고, 원본을 그대로 보여주던 보기는 다시 만듦
+        if not self._followed_chunks:
+            return
+        self.original_df = pd.concat([self.original_df] + self._followed_chunks, ignore_index=True)
+        self._followed_chunks = []
+        self._followed_merged_at = time.monotonic()
+        self.history.invalidate()
+        if self.followed_snapshot():
+            return
+        state, reached = self.history_state(self.history.position)
+        if reached == self.history.position:
+            self.display_frame, self.display_df = state
+
+    def viewing_end(self):
+        scrollbar = self.table_view.verticalScrollBar()
+        if self.continuous_checkbox.isChecked():
+            return scrollbar.value() >= scrollbar.maximum()
+        return self.current_page >= self.total_pages
+
+    def refresh_followed_view(self, rows):
+        self._search_cache = {}
+        self.history.invalidate()
+        position = self.history.position
+        if self.followed_snapshot():
+            # 쿼리/pandas 결과는 그대로 두고 새 행이 있다는 것만 알림
+            self.load_status_label.setText(f"+{rows:,} new rows (re-run the query or commands to include them)")
+            return
+        at_end = self.viewing_end()
+        recent = time.monotonic() - self._followed_merged_at < FOLLOW_MERGE_INTERVAL_MS / 1000
+        if self._followed_chunks and (not at_end or recent):
+            # 새 행이 화면에 보이지 않거나 방금 합쳤으면 모아둠 (끝으로 가거나 페이지를 옮기거나 검색/쿼리할 때 합침)
+            pending = sum(len(df) for df in self._followed_chunks)
+            self.load_status_label.setText(f"Following: +{pending:,} new rows at the end")
+            return
+        columns = list(self.current_frame().columns)
+        self.merge_followed_rows()
+        state, reached = self.history_state(position)
+        if reached < position:
+            # 다시 실행해야 하는 쿼리가 남아 있으면 지금 보기를 유지
+            self.load_status_label.setText(f"+{rows:,} new rows (re-run the query or commands to include them)")
+            return
+        self.display_frame, self.display_df = state
+        if list(self.current_frame().columns) != columns:
+            self.setup_columns()
+        if at_end:
+            # 끝을 보고 있었다면 새 행을 따라감
+            self.current_page = sys.maxsize
+        self.update_pagination()
+        if at_end and self.continuous_checkbox.isChecked():
+            self.table_view.scrollToBottom()
+        self.load_status_label.setText(f"Following: {self.total_rows():,} rows")
+
+    def on_follow_reset(self, worker, reason):
+        if worker is not self.follow_worker:
+            return
+        # 잘리거나 교체된 파일은 처음부터 다시 로드하고, 로드가 끝나면 다시 follow
+        print(f"{reason}; reloading {worker.file_path}", file=sys.stderr)
+        source = self.loaded_source
+        self.start_loading(LoadWorker(source['path'], local=source['local'], creds=source['creds'],
+                                      lazy=source['lazy'], use_cache=source['use_cache'], arrow=source['arrow'],
+                                      follow=True))
+
+    def on_follow_failed(self, worker, message):
+        if worker is not self.follow_worker:
+            return
+        self.follow_checkbox.setChecked(False)
+        QMessageBox.critical(self, "Error", f"Follow mode stopped:\n{message}")
+        print(f"Follow failed: {message}", file=sys.stderr)
+
+    def restore_history(self, worker):
+        # 같은 파일을 다시 열면 저장된 기록을 불러와 마지막 위치의 보기를 재현
+        # 미리보기에 적용한 변환은 파일 전체의 기록에 섞이지 않도록 저장하지 않음
+        if worker.preview:
+            return
+        sidecar = core.ViewHistory.sidecar_path(worker.file_path, None if worker.local else worker.creds)
+        self.history = core.ViewHistory.load(sidecar, worker.file_size)
+        if self.history.position:
+            # 저장된 pandas 명령어(eval)는 파일을 열 때 자동으로 실행하지 않음 (Redo로 직접 실행)
+            self.move_history(self.history.position, run_pandas=False)
+        self.update_history_buttons()
+
+    def update_history_buttons(self, enabled=True):
+        enabled = enabled and not self.loading
+        self.undo_button.setEnabled(enabled and self.history.can_undo())
+        self.redo_button.setEnabled(enabled and self.history.can_redo())
+
+    def reset_data(self):
         self.pandas_text.clear()
+        self.flush_pending_chunks()
+        self.push_history({'op': 'reset'}, (self.original_frame, self.original_df))
 
     def update_pagination(self):
         try:
+            self.flush_pending_chunks()
             self.rows_per_page = int(self.rows_per_page_combo.currentText())
-            total_rows = len(self.display_df)
+            total_rows = self.total_rows()
             self.total_pages = max(1, (total_rows + self.rows_per_page - 1) // self.rows_per_page)
             self.current_page = min(self.current_page, self.total_pages)
             self.show_page()
@@ -463,16 +2551,144 @@ class JSONLViewer(QWidget):
             QMessageBox.critical(self, "Pagination Error", f"Pagination error:\n{str(e)}")
             print(f"Pagination error: {e}", file=sys.stderr)
 
-    def show_page(self):
-        try:
-            start = (self.current_page - 1) * self.rows_per_page
-            end = start + self.rows_per_page
-            page_df = self.display_df.iloc[start:end]
-            self.model.setDataFrame(page_df)
+    def current_frame(self):
+        if self.display_frame is not None:
+            return self.display_frame
+        return core.PandasFrame(self.display_df)
+
+    def total_rows(self):
+        if self.display_frame is not None:
+            return len(self.display_frame)
+        return len(self.display_df)
+
+    def set_table_model(self, model):
+        self.table_view.setModel(model)
+        self.delegate.clear_cache()
+        self.table_view.selectionModel().currentChanged.connect(self.show_cell_detail)
+        self.detail_view.clear()
+
+    def show_cell_detail(self, current, previous=None):
+        if not current.isValid():
+            self.detail_view.clear()
+            return
+        value = current.model().data(current, Qt.UserRole)
+        self.detail_view.setPlainText(core.detail_text(value))
+
+    def on_column_resized(self, column, old_size, new_size):
+        # 폭이 바뀐 컬럼은 캐시 키가 달라지므로 오래된 레이아웃만 쌓이지 않도록 정리
+        self.delegate.evict_column(column)
+
+    def set_max_cell_chars(self, value):
+        self.model.max_chars = value
+        self.virtual_model.max_chars = value
+        self.delegate.clear_cache()
+        self._sized_rows.clear()
+        self.show_page()
+
+    def set_continuous_mode(self, enabled):
+        for widget in (self.prev_button, self.next_button, self.rows_per_page_combo):
+            widget.setEnabled(not enabled)
+        if enabled:
+            # 현재 페이지의 첫 행 위치를 유지
+            top_row = (self.current_page - 1) * self.rows_per_page
+            self.set_table_model(self.virtual_model)
+            self.show_page()
+            self.goto_row(top_row, select=False)
+        else:
+            top_row = max(0, self.table_view.rowAt(0))
+            self.virtual_model.setFrame(None)
+            self.set_table_model(self.model)
+            self.current_page = top_row // self.rows_per_page + 1
+            self.show_page()
+            self.goto_row(top_row, select=False)
+
+    def show_continuous(self):
+        top_row = self.table_view.rowAt(0)
+        self.virtual_model.setFrame(self.current_frame())
+        self._sized_rows.clear()
+        # 컬럼 폭은 첫 블록이 도착하면 맞춤
+        self._virtual_columns_sized = False
+        self.table_view.resizeColumnsToContents()
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.page_label.setText(f"{self.virtual_model.rowCount():,} rows")
+        if top_row > 0:
+            self.table_view.scrollTo(self.virtual_model.index(top_row, 0), QAbstractItemView.PositionAtTop)
+        self.schedule_resize_visible_rows()
+
+    def on_virtual_block_loaded(self, top_left, bottom_right):
+        # 자리표시 문자열로 높이를 맞춘 행은 실제 값으로 다시 맞춤
+        self._sized_rows.difference_update(range(top_left.row(), bottom_right.row() + 1))
+        current = self.table_view.currentIndex()
+        if current.isValid() and current.model() is self.virtual_model and \
+                top_left.row() <= current.row() <= bottom_right.row():
+            self.show_cell_detail(current)
+        if not self._virtual_columns_sized and self.table_view.model() is self.virtual_model:
+            self._virtual_columns_sized = True
             self.table_view.resizeColumnsToContents()
-            self.page_label.setText(f"Page {self.current_page} of {self.total_pages}")
             self.table_view.horizontalHeader().setStretchLastSection(True)
-            self.table_view.resizeRowsToContents()  # 행 높이를 내용에 맞게 자동 조정
+        self.schedule_resize_visible_rows()
+
+    def on_virtual_fetch_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Failed to read rows:\n{message}")
+        print(f"Failed to read rows: {message}", file=sys.stderr)
+
+    def schedule_resize_visible_rows(self):
+        if self.table_view.model() is self.virtual_model:
+            self.resize_rows_timer.start()
+
+    def resize_visible_rows(self):
+        first = self.table_view.rowAt(0)
+        if first < 0:
+            return
+        last = self.table_view.rowAt(self.table_view.viewport().height() - 1)
+        if last < 0:
+            last = self.virtual_model.rowCount() - 1
+        for row in range(first, last + 1):
+            if row not in self._sized_rows:
+                self._sized_rows.add(row)
+                self.table_view.resizeRowToContents(row)
+        # 높이가 바뀌면 화면에 들어오는 행 수도 바뀌므로 한 번 더 확인
+        if self.table_view.rowAt(self.table_view.viewport().height() - 1) not in (last, -1):
+            self.schedule_resize_visible_rows()
+
+    def goto_row(self, row, select=True):
+        total = self.total_rows()
+        if total == 0:
+            return
+        row = max(0, min(row, total - 1))
+        if self.table_view.model() is self.virtual_model:
+            index = self.virtual_model.index(row, 0)
+        else:
+            page = row // self.rows_per_page + 1
+            if page != self.current_page:
+                self.current_page = page
+                self.show_page()
+            index = self.model.index(row - (self.current_page - 1) * self.rows_per_page, 0)
+        self.table_view.scrollTo(index, QAbstractItemView.PositionAtTop)
+        if select:
+            self.table_view.selectRow(index.row())
+
+    def show_page(self):
+        try:
+            with self.perf.measure('page'):
+                self.flush_pending_chunks()
+                self.goto_row_input.setMaximum(max(1, self.total_rows()))
+                if self.continuous_checkbox.isChecked():
+                    self.show_continuous()
+                    return
+                start = (self.current_page - 1) * self.rows_per_page
+                end = start + self.rows_per_page
+                # 원격/인덱스 프레임에서는 행을 읽어오는 시간이 대부분
+                with self.perf.measure('page fetch'):
+                    if self.display_frame is not None:
+                        page_df = self.display_frame.page(start, end)
+                    else:
+                        page_df = self.display_df.iloc[start:end]
+                self.model.setDataFrame(page_df)
+                self.table_view.resizeColumnsToContents()
+                self.page_label.setText(f"Page {self.current_page} of {self.total_pages}")
+                self.table_view.horizontalHeader().setStretchLastSection(True)
+                self.table_view.resizeRowsToContents()  # 행 높이를 내용에 맞게 자동 조정
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to display page:\n{str(e)}")
             print(f"Error displaying page: {e}", file=sys.stderr)
@@ -488,42 +2704,167 @@ class JSONLViewer(QWidget):
             self.show_page()
 
     def open_context_menu(self, position: QPoint):
-        indexes = self.table_view.selectedIndexes()
-        if not indexes:
-            return
-
-        # Get selected rows and columns
-        selected_rows = sorted(set(index.row() for index in indexes))
-        selected_columns = sorted(set(index.column() for index in indexes))
-
-        # Build JSON data
-        json_data = []
-        for row in selected_rows:
-            row_data = {}
-            for col in selected_columns:
-                index = self.model.index(row, col)
-                header = self.model.headerData(col, Qt.Horizontal, Qt.DisplayRole)
-                value = self.model.data(index, Qt.DisplayRole)
-                row_data[header] = value
-            json_data.append(row_data)
-
-        # Convert to JSON string
-        # json_str = pd.json.dumps(json_data, ensure_ascii=False, indent=4)
-        import json
-        # json_str = json.dumps(json_data, ensure_ascii=False, indent=4)
-        json_str = '\n'.join([json.dumps(item, ensure_ascii=False) for item in json_data])
+        selection = self.table_view.selectionModel().selection()
+        if selection.isEmpty():
+            return
+
+        # 선택 범위에서 행/컬럼 번호를 모음 (연속 스크롤 모드에서는 여러 페이지에 걸친 선택도 가능)
+        offset = 0 if self.table_view.model() is self.virtual_model else (self.current_page - 1) * self.rows_per_page
+        rows = np.unique(np.concatenate([np.arange(r.top(), r.bottom() + 1) for r in selection])) + offset
+        selected_columns = sorted(set(col for r in selection for col in range(r.left(), r.right() + 1)))
 
         # Create context menu
         menu = QMenu()
         copy_action = menu.addAction("Copy as JSON")
+        export_action = menu.addAction("Export View...")
         action = menu.exec_(self.table_view.viewport().mapToGlobal(position))
         if action == copy_action:
-            clipboard = QApplication.clipboard()
-            clipboard.setText(json_str)
+            # 표시 문자열이 아니라 원래 값(숫자, 객체)을 내보내기와 같은 방식으로 JSONL로 복사
+            frame = self.current_frame()
+            frame = frame.select([frame.columns[col] for col in selected_columns])
+            self.start_export(frame, None, 'jsonl', rows.astype(np.int64))
+        elif action == export_action:
+            self.export_view()
+
+    def export_view(self):
+        if not self.data_ready:
+            return
+        if self.loading:
+            QMessageBox.warning(self, "Warning", "Please wait until loading has finished.")
+            return
+        if self.total_rows() == 0:
+            QMessageBox.warning(self, "Warning", "No data to export.")
+            return
+        filters = ["JSONL Files (*.jsonl)", "CSV Files (*.csv)"]
+        if core.pq is not None:
+            filters.append("Parquet Files (*.parquet)")
+        path, chosen = QFileDialog.getSaveFileName(self, "Export View", "", ";;".join(filters))
+        if not path:
+            return
+        fmt = core.export_format(path)
+        if fmt is None:
+            # 확장자가 없거나 모르는 확장자면 선택한 필터의 형식으로 저장
+            fmt = {'JSONL': 'jsonl', 'CSV': 'csv', 'Parquet': 'parquet'}[chosen.split()[0]]
+            path += '.' + fmt
+        self.flush_pending_chunks()
+        self.start_export(self.current_frame(), path, fmt)
+
+    def start_export(self, frame, path, fmt, rows=None):
+        if self.exporting:
+            QMessageBox.warning(self, "Warning", "An export is already running.")
+            return
+        worker = ExportWorker(frame, path, fmt, rows)
+        self.export_worker = worker
+        self.exporting = True
+        worker.moveToThread(self.export_thread)
+        worker.progress.connect(lambda done, total: self.on_export_progress(worker, done, total))
+        worker.failed.connect(lambda message: self.on_export_failed(worker, message))
+        worker.finished.connect(lambda: self.on_export_finished(worker))
+        worker.finished.connect(self.export_thread.quit)
+        self.export_status_label.setText("Copying..." if path is None else "Exporting...")
+        self.export_button.setEnabled(False)
+        self.cancel_export_button.setVisible(True)
+        self.perf.start('copy' if path is None else 'export')
+        self.export_thread.start()
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def cancel_export(self, wait=False):
+        if self.exporting:
+            self.export_worker.cancel()
+        if wait:
+            self.export_thread.quit()
+            self.export_thread.wait()
+
+    def on_export_progress(self, worker, done, total):
+        if worker is not self.export_worker:
+            return
+        verb = "Copying" if worker.path is None else "Exporting"
+        percent = int(done * 100 / total) if total else 100
+        self.export_status_label.setText(f"{verb}... {percent}% ({done:,} / {total:,} rows)")
+
+    def on_export_failed(self, worker, message):
+        if worker is not self.export_worker:
+            return
+        self.export_status_label.setText("Export failed")
+        QMessageBox.critical(self, "Error", f"Export failed:\n{message}")
+        print(f"Export failed: {message}", file=sys.stderr)
+
+    def on_export_finished(self, worker):
+        worker.disconnect()
+        if worker is not self.export_worker:
+            return
+        self.exporting = False
+        self.perf.stop('copy' if worker.path is None else 'export', record=not (worker.cancelled or worker.error))
+        self.export_button.setEnabled(not self.loading)
+        self.cancel_export_button.setVisible(False)
+        if worker.cancelled:
+            self.export_status_label.setText("Export cancelled")
+        elif worker.error:
+            # 실패 메시지는 on_export_failed에서 표시
+            pass
+        elif worker.path is None:
+            QApplication.clipboard().setText(worker.text)
+            self.export_status_label.setText(f"Copied {len(worker.rows):,} rows")
+        else:
+            self.export_status_label.setText(f"Exported to {os.path.basename(worker.path)}")
+
+    def set_debug_overlay_visible(self, visible):
+        self.debug_widget.setVisible(visible)
+        # 셀 그리기 시간은 오버레이가 켜져 있을 때만 잼 (셀마다 호출되므로)
+        self.delegate.perf = self.perf if visible else None
+        if visible:
+            self.update_debug_overlay()
+            self.debug_timer.start()
+        else:
+            self.debug_timer.stop()
+
+    def update_debug_overlay(self):
+        self.debug_label.setText(self.perf.summary())
+
+    def reset_debug_timings(self):
+        self.perf.reset()
+        self.update_debug_overlay()
+
+    def debug_report(self):
+        versions = [f"Python {sys.version.split()[0]}", f"Qt {QT_VERSION_STR}"]
+        versions += [f"{name} {getattr(sys.modules[name], '__version__', '?')}"
+                     for name in DEBUG_REPORT_MODULES if name in sys.modules]
+        lines = [f"Platform: {sys.platform}; " + ", ".join(versions)]
+        if self.loaded_source is not None:
+            source = self.loaded_source
+            mode = [name for name in ('lazy', 'arrow', 'use_cache', 'dataset', 'preview') if source.get(name)]
+            lines.append(f"Source: {'local' if source['local'] else 'remote'} {', '.join(mode) or 'eager'}, "
+                         f"{source['size'] or 0:,} bytes, {self.total_rows():,} rows in view")
+        lines.append(f"Timings: {self.perf.summary()}")
+        return "\n".join(lines)
+
+    def copy_debug_report(self):
+        QApplication.clipboard().setText(self.debug_report())
+
+
+def startup_probe(app, viewer):
+    # 창이 처음 그려진 시점과 데이터 스택 import가 끝난 시점(초, 프로세스 시작 기준)을 JSON으로 출력하고 종료
+    times = viewer.startup_times
+
+    def window_shown():
+        times['window_shown'] = time.perf_counter() - STARTUP_TIME
+        finish()
+
+    def finish():
+        if 'window_shown' in times and viewer.data_ready:
+            print(json.dumps(times))
+            app.quit()
+
+    QTimer.singleShot(0, window_shown)
+    # init_data 다음에 연결되므로 data_ready가 설정된 뒤 호출됨
+    viewer.import_worker.ready.connect(finish)
+    viewer.import_worker.failed.connect(lambda message: app.exit(1))
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     viewer = JSONLViewer()
     viewer.show()
+    if '--startup-probe' in sys.argv[1:]:
+        startup_probe(app, viewer)
     sys.exit(app.exec_())
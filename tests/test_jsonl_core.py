@@ -0,0 +1,438 @@
+import bz2
+import gzip
+import io
+import json
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import jsonl_core  # noqa: E402
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return str(path)
+
+
+def test_search_sparse_numeric_column(tmp_path):
+    # 마지막 행에만 있는 숫자 필드: 앞쪽 페이지에서는 컬럼 전체가 NaN
+    path = write_jsonl(tmp_path / 'sparse.jsonl', [{'id': i} for i in range(5)] + [{'id': 5, 'score': 0.75}])
+    query = jsonl_core.SearchQuery('0.75')
+    assert list(query.match_frame(pd.DataFrame({'id': [1, 2], 'score': [np.nan, np.nan]}))) == []
+    frame = jsonl_core.LazyJSONLFrame.open(path)
+    try:
+        assert list(query.match_frame(frame.page(0, 6))) == [5]
+        assert list(query.match_frame(frame.select(['score']).page(0, 5))) == []
+    finally:
+        frame.close()
+
+
+def test_query_missing_column_same_on_every_frame(tmp_path):
+    # 파일에 없는 컬럼만 select 해도 limit 만큼 행이 나와야 함 (프레임 종류와 무관)
+    records = [{'id': i, 'name': f'n{i}'} for i in range(5)]
+    path = write_jsonl(tmp_path / 'rows.jsonl', records)
+    query = jsonl_core.TableQuery('select a limit 2')
+    frames = [jsonl_core.PandasFrame(pd.DataFrame(records)), jsonl_core.LazyJSONLFrame.open(path)]
+    if jsonl_core.pa is not None:
+        frames.append(jsonl_core.ArrowFrame.open(path))
+    try:
+        for frame in frames:
+            assert list(jsonl_core.run_query(frame, query)) == [0, 1], type(frame).__name__
+    finally:
+        for frame in frames:
+            frame.close()
+
+
+def test_truncated_compressed_file_is_an_error(tmp_path):
+    # 잘린 압축 파일은 0행이나 JSON 파싱 오류 대신 잘렸다는 오류를 내야 함
+    data = ''.join(json.dumps({'id': i, 'text': 'x' * 50}) + '\n' for i in range(2000)).encode()
+    for suffix, compress in (('.gz', gzip.compress), ('.bz2', bz2.compress)):
+        packed = compress(data)
+        path = tmp_path / f'cut.jsonl{suffix}'
+        path.write_bytes(packed[:len(packed) // 2])
+        with pytest.raises(ValueError, match='truncated'):
+            list(jsonl_core.iter_source_lines(str(path)))
+        path.write_bytes(packed)
+        assert sum(len(lines) for lines in jsonl_core.iter_source_lines(str(path))) == 2000
+
+
+def test_stats_cache_rejects_rewritten_file(tmp_path):
+    # 뒤에 추가된 파일은 캐시를 이어 쓰고, 같은 크기로 다시 쓴 파일은 버림
+    path = write_jsonl(tmp_path / 'stats.jsonl', [{'id': i} for i in range(3)])
+    sidecar = str(tmp_path / 'stats.npz')
+    stats = jsonl_core.DatasetStats(sidecar)
+    stats.update(pd.DataFrame({'id': [0, 1, 2]}))
+    mtime_ns, head = jsonl_core.source_signature(path)
+    stats.save(os.path.getsize(path), mtime_ns, head)
+    cached = jsonl_core.DatasetStats.load(sidecar)
+    assert cached.rows == 3 and cached.fits(os.path.getsize(path), 3, mtime_ns, head)
+    write_jsonl(path, [{'id': i} for i in range(5)])
+    assert cached.fits(os.path.getsize(path), 5, *jsonl_core.source_signature(path))
+    write_jsonl(path, [{'id': i} for i in (7, 8, 9)])
+    os.utime(path, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+    assert not cached.fits(os.path.getsize(path), 3, *jsonl_core.source_signature(path))
+    write_jsonl(path, [{'id': i} for i in (7, 8, 9, 10, 11)])
+    assert not cached.fits(os.path.getsize(path), 5, *jsonl_core.source_signature(path))
+
+
+def test_line_index_skips_the_same_blank_lines_as_split_lines():
+    # 공백뿐인 줄은 인덱스에서도 행이 아님. 청크 경계에 걸친 줄도 같은 결과
+    data = b'{"a": 1}\n\n  \n\t\r\n {"b": 2}\r\n{"c": 3}  \n   '
+    rows = jsonl_core.split_lines(data)
+    for size in (1, 2, 5, len(data)):
+        chunks = [data[i:i + size] for i in range(0, len(data), size)]
+        index = jsonl_core.LineIndex.from_chunks(chunks, len(data), 0)
+        assert len(index) == len(rows) == 3
+        assert [data[int(start):].split(b'\n', 1)[0].strip() for start in index.starts] == \
+            [row.strip() for row in rows]
+
+
+def test_random_preview_is_not_skewed_toward_long_lines(tmp_path, monkeypatch):
+    # 임의 위치를 뽑으면 긴 줄이 더 자주 걸리지만, 샘플 속 긴 줄 비율은 파일 속 비율(25%)과 같아야 함
+    rng = np.random.default_rng(0)
+    long_rows = set(rng.choice(4000, 1000, replace=False).tolist())
+    records = [{'id': i, 'text': 'x' * (1000 if i in long_rows else 4)} for i in range(4000)]
+    path = write_jsonl(tmp_path / 'mixed.jsonl', records)
+    monkeypatch.setattr(jsonl_core, 'PREVIEW_PROBE_BYTES', 64)
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("expected the offset probe, not a full scan")
+
+    monkeypatch.setattr(jsonl_core, 'sample_lines', no_scan)
+    picked = 0
+    for seed in range(10):
+        lines = jsonl_core.preview_lines(path, mode='random', count=200, seed=seed)
+        ids = [json.loads(line)['id'] for line in lines]
+        assert len(set(ids)) == 200 and ids == sorted(ids)
+        picked += sum(i in long_rows for i in ids)
+    assert 0.21 < picked / 2000 < 0.29
+
+
+def test_random_preview_falls_back_to_scan_when_probing_stalls(tmp_path, monkeypatch):
+    # 줄 길이 차이가 너무 커서 받아들인 줄이 모자라면 한 번 읽어서라도 count줄을 채움
+    records = [{'id': i, 'text': 'x' * (20000 if i % 2 else 0)} for i in range(400)]
+    path = write_jsonl(tmp_path / 'skewed.jsonl', records)
+    monkeypatch.setattr(jsonl_core, 'PREVIEW_PROBE_BYTES', 64)
+    monkeypatch.setattr(jsonl_core, 'PREVIEW_PROBE_ROUNDS', 1)
+    lines = jsonl_core.preview_lines(path, mode='random', count=100, seed=1)
+    ids = [json.loads(line)['id'] for line in lines]
+    assert len(set(ids)) == 100 and ids == sorted(ids)
+
+
+def test_take_keeps_the_requested_order(tmp_path):
+    # 정렬해서 묶어 읽어도 요청한 순서(중복 포함)대로 돌려줘야 함
+    records = [{'id': i, 'text': 'x' * (i % 7)} for i in range(3000)]
+    path = write_jsonl(tmp_path / 'rows.jsonl', records)
+    rows = [2999, 5, 1500, 6, 5, 0, 2000, 1501]
+    frame = jsonl_core.LazyJSONLFrame.open(path)
+    try:
+        assert [record['id'] for record in frame.take_lines(rows)] == rows
+        assert list(frame.take(rows)['id']) == rows
+        assert frame.take_lines([]) == []
+    finally:
+        frame.close()
+
+
+def test_indexed_search_agrees_with_in_memory_search(tmp_path):
+    # 원본 바이트로 거르는 사전 필터/트라이그램 인덱스가 디코드한 값 기준 검색보다 엄격하면 안 됨
+    # (\u 이스케이프, \/, 비ASCII, 숫자 표기, 다시 직렬화한 중첩 값)
+    lines = [
+        r'{"text": "caf\u00e9 au lait", "n": 1e2, "meta": {"a":1,"b":[1,2]}}',
+        '{"text": "CAFÉ noir", "n": 1.50, "meta": {"a":2,"b":[]}}',
+        r'{"text": "path \/usr\/bin and \"quoted\"", "n": 7, "meta": {"a":3,"b":[3]}}',
+        r'{"text": "\ud55c\uad6d\uc5b4 \ud83d\ude00 tab\there", "n": -0.0, "meta": {"a":4,"b":[4]}}',
+        '{"text": "한국어 plain", "n": 2, "meta": {"a":5,"b":[5]}}',
+        r'{"text": "KELVIN \u212a and stra\u017fse", "n": 3, "meta": {"a":6,"b":[6]}}',
+    ]
+    path = tmp_path / 'escaped.jsonl'
+    path.write_text('\n'.join(lines * 700) + '\n', encoding='utf-8')
+    searches = [('café', False, False), ('CAFÉ', False, True), ('/usr/bin', False, False),
+                ('"quoted"', False, False), ('한국어', False, False), ('😀', False, False),
+                ('100', False, False), ('1.5', False, False), ('"a": 1', False, False), ('1, 2', False, False),
+                ('tab\there', False, False), ('kelvin', False, False), ('strasse', False, False),
+                (r'caf.\s+au', True, False), (r'/usr/\w+', True, False)]
+    frame = jsonl_core.LazyJSONLFrame.open(str(path))
+    df = jsonl_core.parse_lines(jsonl_core.split_lines(path.read_bytes()))
+    try:
+        index = jsonl_core.SearchIndex.build(frame)
+        for text, regex, case_sensitive in searches:
+            query = jsonl_core.SearchQuery(text, regex=regex, case_sensitive=case_sensitive)
+            expected = list(query.match_frame(df))
+            found = []
+            for block in index.candidate_blocks(query).tolist():
+                start = block * index.block_rows
+                block_lines = frame.read_lines(start, start + index.block_rows)
+                found += [start + row for row, line in query.prefilter_lines(block_lines)
+                          if query.match_record(jsonl_core.json_loads(line))]
+            assert expected, text
+            assert found == expected, text
+    finally:
+        frame.close()
+
+
+def test_query_prefilter_keeps_escaped_and_reformatted_values(tmp_path):
+    # contains/== 사전 필터도 이스케이프된 문자열, 숫자 표기, 다시 직렬화한 중첩 값 때문에 행을 놓치면 안 됨
+    lines = [
+        r'{"id": 0, "path": "\/usr\/bin", "tags": ["a","b"], "n": 1e2}',
+        r'{"id": 1, "path": "/usr/lib", "tags": ["c"], "n": 5}',
+    ]
+    path = tmp_path / 'escaped.jsonl'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    cases = {'where path == "/usr/bin"': [0], 'where path contains "/usr/"': [0, 1],
+             'where tags contains "\\"a\\", \\"b\\""': [0], 'where n contains "100"': [0]}
+    for text, expected in cases.items():
+        query = jsonl_core.TableQuery(text)
+        assert query.match_lines(jsonl_core.split_lines(path.read_bytes()), 0)[0] == expected, text
+
+
+def test_query_grammar():
+    records = [{'id': 0, 'name': 'alpha', 'score': 3.5, 'tags': ['x'], 'meta': {'kind': 'a'}},
+               {'id': 1, 'name': 'beta', 'score': None, 'tags': [], 'meta': {'kind': 'b'}},
+               {'id': 2, 'name': 'gamma', 'score': 1, 'meta': {'kind': 'a'}},
+               {'id': 3, 'name': 'delta', 'score': 7, 'tags': ['x', 'y'], 'meta': {}}]
+    cases = {
+        'where id >= 2': [2, 3],
+        'where meta.kind == "a" and not id = 0': [2],
+        'where (name contains "ta" or name matches "^g") and score is not null': [2, 3],
+        'where id in (0, 3, 9)': [0, 3],
+        'where score is null': [1],
+        'where `meta.kind` != "a"': [1, 3],
+        'where tags[1] == "y"': [3],
+        'order by score desc': [3, 0, 2, 1],
+        'order by name desc limit 2': [2, 3],
+        'where id < 3 limit 1': [0],
+        'select name, meta.kind limit 0': [],
+    }
+    frame = jsonl_core.PandasFrame(pd.DataFrame(records))
+    for text, expected in cases.items():
+        assert list(jsonl_core.run_query(frame, jsonl_core.TableQuery(text))) == expected, text
+    query = jsonl_core.TableQuery('select name, meta.kind where score > 2 order by id desc limit 5')
+    assert (query.columns, query.order_by, query.descending, query.limit) == (['name', 'meta.kind'], 'id', True, 5)
+    for bad in ('where id >', 'where id ~ 3', 'limit -1', 'where name contains 3', 'select name where'):
+        with pytest.raises(ValueError):
+            jsonl_core.TableQuery(bad)
+
+
+def test_query_order_and_limit_across_shards(tmp_path, monkeypatch):
+    # shard를 넘나드는 정렬/limit 결과가 한 파일로 읽었을 때와 같아야 함 (값이 없는 행은 항상 뒤로)
+    monkeypatch.setattr(jsonl_core, 'CACHE_DIR', str(tmp_path / 'cache'))
+    rng = np.random.default_rng(3)
+    records = [{'id': i, 'score': int(rng.integers(0, 50))} if i % 7 else {'id': i} for i in range(300)]
+    folder = tmp_path / 'shards'
+    folder.mkdir()
+    for k in range(3):
+        write_jsonl(folder / f'part-{k}.jsonl', records[k * 100:(k + 1) * 100])
+    sharded = jsonl_core.ShardedFrame.open(str(folder))
+    single = jsonl_core.PandasFrame(pd.DataFrame(records))
+    try:
+        for text in ('order by score desc limit 10', 'order by score', 'where score < 10 order by score limit 5',
+                     'where score >= 40 limit 3', 'order by score desc'):
+            query = jsonl_core.TableQuery(text)
+            rows = list(jsonl_core.run_query(sharded, query))
+            assert rows == list(jsonl_core.run_query(single, query)), text
+        rows = jsonl_core.run_query(sharded, jsonl_core.TableQuery('order by score desc'))
+        scores = [records[row].get('score') for row in rows]
+        assert scores[-43:] == [None] * 43
+        assert scores[:-43] == sorted(scores[:-43], reverse=True)
+    finally:
+        sharded.close()
+
+
+def test_compressed_random_access_through_checkpoints(tmp_path):
+    # 체크포인트(gzip 압축 해제기 상태, 멤버/스트림 경계)에서 다시 풀어 임의 위치의 행을 읽음
+    # 체크포인트는 압축 청크를 읽을 때마다 확인하므로 잘 압축되지 않는 값으로 채움
+    rng = np.random.default_rng(5)
+    text = rng.bytes(40 * 150000).hex()
+    records = [{'id': i, 'text': text[i * 80:(i + 1) * 80]} for i in range(150000)]
+    data = ''.join(f'{{"id": {i}, "text": "{record["text"]}"}}\n' for i, record in enumerate(records)).encode()
+    # 여러 멤버/스트림을 이어 붙인 파일은 경계마다 체크포인트 (bz2는 경계에서만 다시 시작할 수 있음)
+    small = data[:data.index(b'\n', 3000000) + 1]
+    thirds = [small.index(b'\n', len(small) * k // 3) + 1 for k in (1, 2)]
+    parts = [small[:thirds[0]], small[thirds[0]:thirds[1]], small[thirds[1]:]]
+    files = {'one.jsonl.gz': (gzip.compress(data, compresslevel=1), len(records)),
+             'members.jsonl.gz': (b''.join(gzip.compress(part, compresslevel=1) for part in parts), small.count(b'\n')),
+             'streams.jsonl.bz2': (b''.join(bz2.compress(part, compresslevel=1) for part in parts), small.count(b'\n'))}
+    for name, (packed, count) in files.items():
+        path = tmp_path / name
+        path.write_bytes(packed)
+        frame = jsonl_core.LazyJSONLFrame.open(str(path))
+        try:
+            assert len(frame) == count
+            assert len(frame.reader.checkpoints) >= 3, name
+            # 뒤쪽, 앞쪽, 다시 뒤쪽으로 건너뛰며 읽어도 같은 행
+            for start in (count - 5, 10, count // 2, count // 2 - 10, count * 9 // 10, count // 3):
+                assert frame.records(start, start + 5) == records[start:start + 5], (name, start)
+            rows = rng.choice(count, 40, replace=False).tolist()
+            assert frame.take_lines(rows) == [records[row] for row in rows], name
+        finally:
+            frame.close()
+
+
+def test_shard_folder_and_glob_loading(tmp_path, monkeypatch):
+    # 폴더/glob 모두 이름 순으로 JSONL shard만 모으고, shard 경계를 넘는 page/take도 한 파일처럼 동작
+    monkeypatch.setattr(jsonl_core, 'CACHE_DIR', str(tmp_path / 'cache'))
+    folder = tmp_path / 'parts'
+    (folder / 'nested.jsonl').mkdir(parents=True)
+    write_jsonl(folder / 'part-2.jsonl', [{'id': i} for i in range(3, 5)])
+    write_jsonl(folder / 'part-0.jsonl', [{'id': i, 'first': True} for i in range(3)])
+    write_jsonl(folder / 'part-1.jsonl', [])
+    with gzip.open(folder / 'part-3.jsonl.gz', 'wt', encoding='utf-8') as f:
+        f.writelines(json.dumps({'id': i}) + '\n' for i in range(5, 8))
+    (folder / 'README.txt').write_text('{"id": -1}\n')
+    write_jsonl(folder / 'other.jsonl', [{'id': -2}])
+
+    frame = jsonl_core.ShardedFrame.open(str(folder))
+    try:
+        assert [os.path.basename(shard) for shard in frame.shards] == [
+            'other.jsonl', 'part-0.jsonl', 'part-1.jsonl', 'part-2.jsonl', 'part-3.jsonl.gz']
+        assert len(frame) == 9 and frame.counts.tolist() == [1, 3, 0, 2, 3]
+        assert frame.columns == ['id', 'first']
+    finally:
+        frame.close()
+
+    frame = jsonl_core.ShardedFrame.open(str(folder / 'part-*'))
+    try:
+        assert len(frame) == 8 and frame.columns == ['id', 'first']
+        assert frame.page(2, 7)['id'].tolist() == [2, 3, 4, 5, 6]
+        assert [record['id'] for record in frame.records(0, 100)] == list(range(8))
+        assert frame.take([7, 0, 4, 3, 7])['id'].tolist() == [7, 0, 4, 3, 7]
+        assert frame.select(['first']).page_records(2, 4) == [{'first': True}, {'first': None}]
+    finally:
+        frame.close()
+
+    # 바뀌지 않은 shard는 manifest의 행 수를 그대로 쓰고, 다시 쓴 shard만 다시 셈
+    recounted = []
+    count_rows = jsonl_core.ShardedFrame.count_rows
+    monkeypatch.setattr(jsonl_core.ShardedFrame, 'count_rows',
+                        staticmethod(lambda shard, creds=None: recounted.append(shard[0]) or count_rows(shard, creds)))
+    frame = jsonl_core.ShardedFrame.open(str(folder / 'part-*'))
+    frame.close()
+    assert recounted == []
+    write_jsonl(folder / 'part-1.jsonl', [{'id': 2.5}, {'id': 2.75}])
+    os.utime(folder / 'part-1.jsonl', ns=(0, 10 ** 9))
+    frame = jsonl_core.ShardedFrame.open(str(folder / 'part-*'))
+    try:
+        assert recounted == [str(folder / 'part-1.jsonl')]
+        assert len(frame) == 10 and frame.page(2, 6)['id'].tolist() == [2, 2.5, 2.75, 3]
+    finally:
+        frame.close()
+
+    with pytest.raises(FileNotFoundError):
+        jsonl_core.ShardedFrame.open(str(folder / 'missing-*.jsonl'))
+
+
+def test_head_tail_and_random_previews(tmp_path, monkeypatch):
+    # 앞/뒤/임의 미리보기: 파일 하나, gzip, shard 폴더 모두 같은 줄을 파일 순서대로 돌려줌
+    monkeypatch.setattr(jsonl_core, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(jsonl_core, 'PREVIEW_PROBE_BYTES', 64)
+    lines = [json.dumps({'id': i, 'text': 'x' * (i % 37)}) for i in range(3000)]
+    single = tmp_path / 'rows.jsonl'
+    # 빈 줄은 건너뛰고, 마지막 줄에 개행이 없어도 한 줄
+    single.write_text('\n'.join(lines[:10] + [''] + lines[10:]), encoding='utf-8')
+    with gzip.open(tmp_path / 'rows.jsonl.gz', 'wt', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    folder = tmp_path / 'parts'
+    folder.mkdir()
+    for n, start in enumerate(range(0, 3000, 700)):
+        (folder / f'part-{n}.jsonl').write_text(''.join(line + '\n' for line in lines[start:start + 700]))
+
+    for path in [str(single), str(tmp_path / 'rows.jsonl.gz'), str(folder)]:
+        assert [json.loads(line)['id'] for line in jsonl_core.preview_lines(path, mode='head', count=5)] == list(range(5))
+        tail = jsonl_core.preview_lines(path, mode='tail', count=750)
+        assert [json.loads(line)['id'] for line in tail] == list(range(2250, 3000))
+        everything = jsonl_core.preview_lines(path, mode='tail', count=5000)
+        assert [json.loads(line)['id'] for line in everything] == list(range(3000))
+        assert jsonl_core.preview_lines(path, mode='head', count=0) == []
+
+        samples = [jsonl_core.preview_lines(path, mode='random', count=50, seed=seed) for seed in (1, 1, 2)]
+        ids = [[json.loads(line)['id'] for line in sample] for sample in samples]
+        assert ids[0] == ids[1] and ids[0] != ids[2]
+        for sample in ids:
+            assert len(set(sample)) == 50 and sample == sorted(sample) and 0 <= sample[0] and sample[-1] < 3000
+        assert len(jsonl_core.preview_lines(path, mode='random', count=5000, seed=0)) == 3000
+
+    # 줄 인덱스가 이미 있으면 그 인덱스로 뽑음
+    jsonl_core.LineIndex.load_or_build(str(single))
+    monkeypatch.setattr(jsonl_core, 'probe_random_lines', None)
+    indexed = jsonl_core.preview_lines(str(single), mode='random', count=50, seed=3)
+    assert indexed == jsonl_core.preview_lines(str(single), mode='random', count=50, seed=3)
+    assert len(set(indexed)) == 50 and set(indexed) <= set(line.encode() for line in lines)
+
+    with pytest.raises(ValueError):
+        jsonl_core.preview_lines(str(single), mode='middle')
+
+
+class LocalSFTP:
+    # 로컬 파일을 원격 파일처럼 읽는 SFTP 대역 (open/stat/readv만)
+    class RemoteFile(io.FileIO):
+        def readv(self, ranges):
+            for offset, size in ranges:
+                self.seek(offset)
+                yield self.read(size)
+
+    def __init__(self):
+        self.reads = 0
+
+    def open(self, path, mode='rb'):
+        self.reads += 1
+        return self.RemoteFile(path, 'rb')
+
+    def stat(self, path):
+        stat = os.stat(path)
+        return types.SimpleNamespace(st_size=stat.st_size, st_mtime=int(stat.st_mtime))
+
+
+def test_remote_cache_downloads_only_the_appended_tail(tmp_path):
+    # 뒤에 추가만 된 원격 파일은 캐시된 앞부분을 재사용하고 꼬리만 받음. 내용이 바뀐 파일은 전부 다시 받음
+    creds = {'username': 'u', 'hostname': 'h', 'port': 22}
+    remote = tmp_path / 'remote.jsonl'
+    sftp = LocalSFTP()
+    cache = jsonl_core.RemoteFileCache(str(tmp_path / 'files'))
+
+    def fetch(mtime, size=None):
+        os.utime(remote, (mtime, mtime))
+        stat = sftp.stat(str(remote))
+        reusable = cache.reusable_bytes(sftp, creds, str(remote), stat)
+        downloaded = b''.join(cache.fetch(sftp, creds, str(remote), stat, reusable, size))
+        with open(cache.local_path(creds, str(remote)), 'rb') as f:
+            return reusable, downloaded, f.read()
+
+    first = b''.join(b'{"id": %d}\n' % i for i in range(1000))
+    remote.write_bytes(first)
+    assert fetch(1000) == (0, first, first)
+    assert fetch(1000) == (len(first), b'', first)
+
+    tail = b''.join(b'{"id": %d}\n' % i for i in range(1000, 1200))
+    with open(remote, 'ab') as f:
+        f.write(tail)
+    assert fetch(2000) == (len(first), tail, first + tail)
+    assert (cache.hits, cache.appends, cache.misses) == (1, 1, 1)
+    assert cache.bytes_saved == 2 * len(first) and cache.bytes_downloaded == len(first) + len(tail)
+
+    # follow 모드: 쓰는 중인 마지막 줄은 캐시에 두지 않음
+    partial = b'{"id": 1200}\n{"id": 12'
+    with open(remote, 'ab') as f:
+        f.write(partial)
+    size = len(first + tail) + partial.index(b'\n') + 1
+    reusable, downloaded, cached = fetch(3000, size)
+    assert reusable == len(first + tail) and cached == (first + tail + partial)[:size]
+    assert cache.append(creds, str(remote), partial[len(downloaded):], 3000)
+    assert cache.reusable_bytes(sftp, creds, str(remote), sftp.stat(str(remote))) == remote.stat().st_size
+
+    # 크기가 늘었어도 앞부분이 바뀌었으면 전체 다운로드
+    rewritten = first.replace(b'"id"', b'"ID"') + tail + tail
+    remote.write_bytes(rewritten)
+    assert fetch(4000) == (0, rewritten, rewritten)
+    assert cache.misses == 2
+
+    # 새 인스턴스도 manifest로 같은 캐시를 재사용
+    cache = jsonl_core.RemoteFileCache(str(tmp_path / 'files'))
+    reads = sftp.reads
+    assert fetch(4000) == (len(rewritten), b'', rewritten) and sftp.reads == reads